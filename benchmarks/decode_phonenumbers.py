@@ -0,0 +1,72 @@
+"""
+    Rows/sec for PhoneNumber decoding: the compiled decoder against the hand-written loop it replaced.
+
+    python -m benchmarks.decode_phonenumbers [rows]
+"""
+import gc
+import json
+import sys
+import time
+
+from skyetel import responses, decoders
+from .fixtures import phonenumber_row
+
+
+def legacy_decode(response):
+    for x in range(0, len(response)):
+        response[x]['number'] = int(response[x]['number'])
+        if response[x]['forward']:
+            response[x]['forward'] = int(response[x]['forward'])
+        if response[x]['failover']:
+            response[x]['failover'] = int(response[x]['failover'])
+        if response[x]['endpoint_group']:
+            response[x]['endpoint_group'] = responses.EndpointGroup(**response[x]['endpoint_group'])
+        if response[x]['tenant']:
+            response[x]['tenant'] = responses.Tenant(**response[x]['tenant'])
+        if response[x]['origination']:
+            response[x]['origination'] = responses.Origination(**response[x]['origination'])
+        if response[x]['e911address']:
+            response[x]['e911address'] = responses.E911Address(**response[x]['e911address'])
+        response[x]['intl_balance'] = float(response[x]['intl_balance'])
+        response[x]['intl_reserve'] = float(response[x]['intl_reserve'])
+        response[x]['org']['account_number'] = int(response[x]['org']['account_number'])
+        response[x]['org']['support_pin'] = int(response[x]['org']['support_pin'])
+        response[x]['org']['balance'] = float(response[x]['org']['balance'])
+        response[x]['org']['auto_recharge_reserve'] = float(response[x]['org']['auto_recharge_reserve'])
+        response[x]['org'] = responses.ExtendedOrganization(**response[x]['org'])
+        response[x] = responses.PhoneNumber(**response[x])
+    return response
+
+
+def measure(decode, body, repeat=3):
+    """
+        Best of several runs, each on freshly parsed JSON and with the previous run's objects already collected
+    """
+    best = None
+    for _ in range(repeat):
+        rows = json.loads(body)
+        gc.collect()
+        start = time.perf_counter()
+        decode(rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del rows
+    return best
+
+
+def main(count=100000):
+    body = json.dumps([phonenumber_row(i) for i in range(count)])
+    sample = json.dumps([phonenumber_row(i) for i in range(100)])
+    assert legacy_decode(json.loads(sample)) == decoders.decode_page(responses.PhoneNumber, json.loads(sample))
+
+    compiled_seconds = measure(lambda rows: decoders.decode_page(responses.PhoneNumber, rows), body)
+    legacy_seconds = measure(legacy_decode, body)
+
+    print('rows: {}'.format(count))
+    print('legacy:   {:>12,.0f} rows/sec'.format(count / legacy_seconds))
+    print('compiled: {:>12,.0f} rows/sec'.format(count / compiled_seconds))
+    print('speedup:  {:.2f}x'.format(legacy_seconds / compiled_seconds))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
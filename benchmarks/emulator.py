@@ -0,0 +1,511 @@
+"""
+    Local emulator of the Skyetel API for capacity planning without spending the account's budget. It serves the
+    routes in skyetel.urls.URLs from generated fixtures with page[limit]/page[offset], filter[...] and sort
+    semantics, throttles each SID to 120 requests a minute, answers errors with {"ERROR": ...} bodies, and can add
+    latency, jitter, failures and dropped connections.
+
+    In process:
+        with Emulator(latency=0.05) as emulator:
+            client = Skyetel('sid', 'secret', base_url=emulator.base_url)
+
+    As a subprocess:
+        python -m benchmarks.emulator [--port 8080] [--rows 1000] [--latency 0.05] [--jitter 0.02] [--failure-rate 0.01]
+"""
+import argparse
+import collections
+import fnmatch
+import json
+import random
+import re
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from skyetel import responses, urls, limiter
+from skyetel.decoders import SKYETEL_DATESTRING
+from . import fixtures
+
+API_PREFIX = '/v1'
+
+# Route pattern to record type and fixture row for the collections served with pagination, filters and sort
+COLLECTIONS = {
+    '/audio_recordings': (responses.AudioRecording, None),
+    '/audio_transcriptions': (responses.AudioTranscription, None),
+    '/endpoints': (responses.Endpoint, None),
+    '/phonenumbers': (responses.PhoneNumber, fixtures.phonenumber_row),
+    '/phonenumbers/order/rate_centers': (responses.RateCenter, None),
+    '/smsreceipts': (responses.SMSMessage, fixtures.sms_row),
+    '/stats/iphealth': (responses.EndpointHealth, None),
+    '/stats/org/traffic/total-counts': (responses.TrafficCount, None),
+    '/stats/org/traffic/channels': (responses.ChannelCount, None),
+    '/stats/org/traffic/most-active-hour': (responses.CallCount, None),
+    '/stats/org/tenant-statements': (responses.TenantStatement, fixtures.tenant_statement_row),
+    '/tenants/billing': (responses.TenantInvoice, None),
+    '/tenants/billing-products': (responses.TenantBillingProduct, None),
+    '/tenants': (responses.ExtendedTenant, None),
+    '/tenants/endpoints': (responses.Endpoint, None),
+    '/tenants/users': (None, lambda i: {'id': i, 'tenant_id': i % fixtures.TENANTS,
+                                        'email': 'user{}@example.com'.format(i), 'active': True}),
+    '/vfaxes': (None, lambda i: {'id': i, 'from': str(15550000000 + i), 'to': str(15560000000 + i), 'pages': i % 9,
+                                 'time': (fixtures.EPOCH + timedelta(hours=i)).strftime(SKYETEL_DATESTRING)}),
+}
+
+# Collections narrowed to one tenant by the {id} in their route
+_TENANT_SCOPED = {
+    '/tenants/{id}/endpoints': '/tenants/endpoints',
+    '/tenants/{id}/users': '/tenants/users',
+}
+
+_ERRORS = {400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+           429: 'Too Many Requests', 500: 'Internal Server Error'}
+
+_ORDER_FIELD = re.compile(r'numbers\[(\d+)\]\[mou\]')
+
+
+class EmulatorError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or _ERRORS.get(status, 'Error'))
+        self.status = status
+
+
+def _matches(value, wanted):
+    if isinstance(value, str):
+        if '*' in wanted:
+            return fnmatch.fnmatchcase(value.lower(), wanted.lower())
+        return wanted.lower() in value.lower()
+    if isinstance(value, bool):
+        return str(value).lower() == wanted.lower()
+    return str(value) == wanted
+
+
+_MISSING = object()
+
+
+def _field(row, name):
+    """
+        Read a filter or sort field: a top-level key, a dotted path into nested objects, or <object>_id for the id of
+        a nested object, as with tenant_id on phone numbers
+    """
+    if name in row:
+        return row[name]
+    if name.endswith('_id') and isinstance(row.get(name[:-3]), dict):
+        return row[name[:-3]].get('id')
+    value = row
+    for key in name.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _sort_key(field, row):
+    value = _field(row, field)
+    # None first, then numbers before strings so mixed columns still order
+    return (value is not None, isinstance(value, str), value if value is not None else 0)
+
+
+class _Collection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_id = {row['id']: row for row in rows if 'id' in row}
+        self.next_id = max(self.by_id, default=0) + 1
+
+    def add(self, row):
+        row['id'] = self.next_id
+        self.next_id += 1
+        self.rows.append(row)
+        self.by_id[row['id']] = row
+        return row
+
+    def remove(self, row_id):
+        row = self.by_id.pop(row_id)
+        self.rows.remove(row)
+
+
+class Emulator:
+    """
+        Threaded HTTP server emulating the API. State lives in memory and writes are visible to later reads.
+    """
+    def __init__(self, host='127.0.0.1', port=0, rows=1000, sizes=None, calls=limiter.API_CALLS,
+                 period=limiter.API_PERIOD, latency=0.0, jitter=0.0, failure_rate=0.0, drop_rate=0.0,
+                 max_page_size=None, seed=0, ranges=True, file_cutoff=None):
+        """
+        :param host: string, interface to listen on
+        :param port: integer, port to listen on, 0 picks a free one
+        :param rows: integer, rows generated per collection
+        :param sizes: dict, route pattern to row count, overriding rows for that collection
+        :param calls: integer, requests each SID may make per period, None disables throttling
+        :param period: float, throttling window in seconds
+        :param latency: float, seconds added to every response
+        :param jitter: float, up to this many seconds randomly added to or taken from the latency
+        :param failure_rate: float, share of requests answered with HTTP 500
+        :param drop_rate: float, share of requests whose connection is closed without a response
+        :param max_page_size: integer, cap on page[limit], None serves any page size
+        :param seed: integer, seed for the jitter and failure injection
+        :param ranges: bool, honour Range requests for files; False sends the whole file with 200, as some storage
+            servers do
+        :param file_cutoff: integer, bytes of a file body sent before the connection is closed, simulating an
+            interrupted transfer, None sends whole files
+        """
+        self.calls = calls
+        self.period = period
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.max_page_size = max_page_size
+        self.ranges = ranges
+        self.file_cutoff = file_cutoff
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__windows = collections.defaultdict(collections.deque)
+        self.__e911 = {}
+        self.__urls = urls.URLs(API_PREFIX)
+        self.__counters = collections.Counter()
+
+        sizes = sizes or {}
+        self.__collections = {}
+        for route, (cls, make_row) in COLLECTIONS.items():
+            make_row = make_row or (lambda i, cls=cls: fixtures.record_row(cls, i))
+            self.__collections[route] = _Collection([make_row(i) for i in range(1, sizes.get(route, rows) + 1)])
+
+        emulator = self
+
+        class Handler(_Handler):
+            def handle_api(self):
+                return emulator.handle(self)
+
+        self.__server = ThreadingHTTPServer((host, port), Handler)
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.__server.server_address[:2]
+        return 'http://{}:{}{}'.format(host, port, API_PREFIX)
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='skyetel-emulator', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def serve_forever(self):
+        self.__server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def stats(self):
+        """
+        :return: dict, request counts: requests, throttled, failed, dropped and one entry per status code
+        """
+        with self.__lock:
+            return dict(self.__counters)
+
+    def __count(self, key):
+        with self.__lock:
+            self.__counters[key] += 1
+
+    def __throttle(self, sid):
+        if self.calls is None:
+            return 0
+        now = time.monotonic()
+        with self.__lock:
+            window = self.__windows[sid]
+            while window and window[0] <= now - self.period:
+                window.popleft()
+            if len(window) >= self.calls:
+                return window[0] + self.period - now
+            window.append(now)
+            return 0
+
+    def __delay(self):
+        with self.__lock:
+            delay = self.latency + (self.__random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+            roll = self.__random.random()
+        if delay > 0:
+            time.sleep(delay)
+        return roll
+
+    def handle(self, request):
+        """
+            Answer one request
+        :param request: _Handler
+        :return: tuple, (status, JSON-serialisable body or bytes, extra headers), or None to drop the connection
+        """
+        self.__count('requests')
+        path, query = request.path_query()
+        # Read the body before any early answer, so it is not left in the keep-alive stream
+        try:
+            form = request.form()
+        except ValueError:
+            return self.__error(400, 'Malformed request body')
+        if request.command == 'HEAD':
+            return 200, b'', {}
+        if not path.startswith(API_PREFIX + '/'):
+            return self.__file(request.command, path, request.headers.get('Range'))
+
+        sid = request.headers.get('X-AUTH-SID')
+        if not sid or not request.headers.get('X-AUTH-SECRET'):
+            return self.__error(401)
+        retry_after = self.__throttle(sid)
+        if retry_after:
+            self.__count('throttled')
+            return self.__error(429, headers={'Retry-After': str(int(retry_after) + 1)})
+
+        roll = self.__delay()
+        if roll < self.drop_rate:
+            self.__count('dropped')
+            return None
+        if roll < self.drop_rate + self.failure_rate:
+            self.__count('failed')
+            return self.__error(500)
+
+        try:
+            with self.__lock:
+                body = self.__route(request.command, path, query, form)
+        except EmulatorError as e:
+            return self.__error(e.status, str(e))
+        self.__count(200)
+        return 200, body, {}
+
+    def __error(self, status, message=None, headers=None):
+        self.__count(status)
+        return status, {'ERROR': message or _ERRORS[status]}, headers or {}
+
+    def __route(self, method, path, query, form):
+        pattern = self.__urls.pattern(path)
+        ids = [int(segment) for segment in path.split('/') if segment.isdigit()]
+
+        if pattern in COLLECTIONS:
+            collection = self.__collections[pattern]
+            if method == 'GET':
+                return self.__page(collection.rows, query)
+            if method == 'POST':
+                cls, make_row = COLLECTIONS[pattern]
+                row = make_row(collection.next_id) if make_row else fixtures.record_row(cls, collection.next_id)
+                row.update(form)
+                return collection.add(row)
+            raise EmulatorError(405)
+
+        parent = pattern.rsplit('/', 1)[0]
+        if pattern.endswith('/{id}') and parent in COLLECTIONS:
+            collection = self.__collections[parent]
+            row = collection.by_id.get(ids[-1])
+            if row is None:
+                raise EmulatorError(404, 'No record with id {}'.format(ids[-1]))
+            if method == 'GET':
+                return row
+            if method in ('PATCH', 'PUT'):
+                row.update(form)
+                return row
+            if method == 'DELETE':
+                collection.remove(row['id'])
+                return {}
+            raise EmulatorError(405)
+
+        if pattern in _TENANT_SCOPED:
+            rows = [row for row in self.__collections[_TENANT_SCOPED[pattern]].rows if row.get('tenant_id') == ids[0]]
+            return self.__page(rows, query)
+
+        return self.__special(method, pattern, ids, query, form)
+
+    def __special(self, method, pattern, ids, query, form):
+        phonenumbers = self.__collections['/phonenumbers']
+        if pattern == '/billing/balance':
+            return {'BALANCE': '125.50'}
+        if pattern in ('/stats/phonenumbers/local', '/stats/phonenumbers/toll-free'):
+            category = 'local' if pattern.endswith('local') else 'tollfree'
+            return {'TOTAL': sum(1 for row in phonenumbers.rows if row.get('category') == category)}
+        if pattern == '/stats/org/statement':
+            return fixtures.record_row(responses.BillingStatement, 1)
+        if pattern in ('/audio_recordings/{id}/download', '/audio_transcriptions/{id}/download'):
+            kind = pattern.split('/')[1]
+            if ids[0] not in self.__collections['/' + kind].by_id:
+                raise EmulatorError(404, 'No record with id {}'.format(ids[0]))
+            host = self.base_url[:-len(API_PREFIX)]
+            return {'download_url': '{}/files/{}/{}'.format(host, kind, ids[0])}
+        if pattern == '/phonenumbers/{id}/e911address':
+            if ids[0] not in phonenumbers.by_id:
+                raise EmulatorError(404, 'No record with id {}'.format(ids[0]))
+            if method == 'GET':
+                return self.__e911.get(ids[0], {})
+            if method in ('POST', 'PATCH'):
+                address = self.__e911.setdefault(ids[0], fixtures.record_row(responses.E911Address, ids[0]))
+                address.update(form)
+                return address
+            raise EmulatorError(405)
+        if pattern == '/phonenumbers/off-network' and method == 'POST':
+            row = fixtures.phonenumber_row(phonenumbers.next_id)
+            row.update(number=str(form.get('number', '')), off_network=True)
+            row = phonenumbers.add(row)
+            return {'id': row['id'], 'number': row['number']}
+        if pattern == '/phonenumbers/order/search':
+            quantity = int(query.get('filter[quantity]', 1))
+            npas = [value for key, value in query.items() if key.startswith('filter[npas]')] or ['555']
+            start = phonenumbers.next_id
+            return [str(10000000000 + int(npas[i % len(npas)]) * 10000000 + start + i) for i in range(quantity)]
+        if pattern == '/phonenumbers/order' and method == 'POST':
+            ordered = []
+            for key in form:
+                match = _ORDER_FIELD.fullmatch(key)
+                if match:
+                    row = fixtures.phonenumber_row(phonenumbers.next_id)
+                    row['number'] = match.group(1)
+                    ordered.append(phonenumbers.add(row))
+            return ordered
+        if pattern == '/tenants/{id}/billing':
+            if method == 'POST':
+                return {'stripe_invoice_id': 'in_emulated_{}'.format(ids[0])}
+            if method == 'DELETE':
+                return {}
+            raise EmulatorError(405)
+        if pattern in ('/tenants/{id}/features', '/tenants/{id}/monthly-stats', '/tenants/{id}/current-stats'):
+            return {'tenant_id': ids[0]}
+        raise EmulatorError(404, 'Unknown route {}'.format(pattern))
+
+    def __page(self, rows, query):
+        filters = {key[7:-1]: value for key, value in query.items() if key.startswith('filter[')}
+        search = filters.pop('query', None)
+        if search is not None:
+            rows = [row for row in rows if any(_matches(value, search) for value in row.values()
+                                               if isinstance(value, str))]
+        for field, wanted in filters.items():
+            if rows and _field(rows[0], field) is _MISSING:
+                raise EmulatorError(400, 'Unknown filter field {}'.format(field))
+            rows = [row for row in rows if _matches(_field(row, field), wanted)]
+
+        sort = [field for field in query.get('sort', '').split(',') if field]
+        if sort:
+            rows = list(rows)
+            # Stable sorts applied from the last key to the first give the multi-key order
+            for field in reversed(sort):
+                name = field.lstrip('-')
+                if rows and _field(rows[0], name) is _MISSING:
+                    raise EmulatorError(400, 'Unknown sort field {}'.format(name))
+                rows.sort(key=lambda row: _sort_key(name, row), reverse=field.startswith('-'))
+
+        if 'page[limit]' in query or 'page[offset]' in query:
+            limit = int(query.get('page[limit]', 10))
+            if self.max_page_size is not None:
+                limit = min(limit, self.max_page_size)
+            offset = int(query.get('page[offset]', 0))
+            rows = rows[offset:offset + limit]
+        return rows
+
+    def __file(self, method, path, range_header):
+        match = re.fullmatch(r'/files/(audio_recordings|audio_transcriptions)/(\d+)', path)
+        if method != 'GET' or match is None:
+            return self.__error(404)
+        kind, file_id = match.group(1), int(match.group(2))
+        if kind == 'audio_transcriptions':
+            self.__count(200)
+            return 200, {'left': [{'time': 0.0, 'text': 'hello {}'.format(file_id)}],
+                         'right': [{'time': 1.5, 'text': 'goodbye'}]}, {}
+        row = self.__collections['/audio_recordings'].by_id.get(file_id)
+        if row is None:
+            return self.__error(404)
+        content = bytes(index % 251 for index in range(int(row.get('size') or 0)))
+        offset = int(range_header[6:].split('-')[0]) if range_header and range_header.startswith('bytes=') else 0
+        status, headers = 200, {}
+        if offset and self.ranges:
+            if offset >= len(content):
+                self.__count(416)
+                return 416, b'', {}
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(offset, len(content) - 1, len(content))
+            status, content = 206, content[offset:]
+        if self.file_cutoff is not None and len(content) > self.file_cutoff:
+            headers['Content-Length'] = str(len(content))
+            content = content[:self.file_cutoff]
+        self.__count(status)
+        return status, content, headers
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def path_query(self):
+        parts = urlsplit(self.path)
+        return parts.path, dict(parse_qsl(parts.query, keep_blank_values=True))
+
+    def form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        body = self.rfile.read(length).decode()
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(body)
+        return dict(parse_qsl(body, keep_blank_values=True))
+
+    def handle_api(self):
+        raise NotImplementedError
+
+    def __respond(self):
+        answer = self.handle_api()
+        if answer is None:
+            self.close_connection = True
+            return
+        status, body, headers = answer
+        if isinstance(body, bytes):
+            content, content_type = body, 'application/octet-stream'
+        else:
+            content, content_type = json.dumps(body).encode(), 'application/json'
+        # A Content-Length beyond the body announces a transfer that is cut short
+        length = headers.pop('Content-Length', str(len(content)))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', length)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+        if int(length) > len(content):
+            self.close_connection = True
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = __respond
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.emulator', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rows', type=int, default=1000, help='rows generated per collection')
+    parser.add_argument('--calls', type=int, default=limiter.API_CALLS, help='requests per SID per period')
+    parser.add_argument('--period', type=float, default=limiter.API_PERIOD, help='throttling window in seconds')
+    parser.add_argument('--no-throttle', action='store_true', help='serve every request')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added to or taken from latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with HTTP 500')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='share of connections closed without a reply')
+    parser.add_argument('--max-page-size', type=int, help='cap on page[limit]')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    emulator = Emulator(args.host, args.port, args.rows, calls=None if args.no_throttle else args.calls,
+                        period=args.period, latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                        drop_rate=args.drop_rate, max_page_size=args.max_page_size, seed=args.seed)
+    print('Serving the Skyetel API emulator at {}'.format(emulator.base_url), flush=True)
+    try:
+        emulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
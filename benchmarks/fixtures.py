@@ -0,0 +1,117 @@
+"""
+    Deterministic JSON fixtures shaped like Skyetel API responses, for the offline benchmarks.
+
+    Rows follow the wire format rather than the decoded types: decimals and account numbers arrive as strings,
+    timestamps in SKYETEL_DATESTRING, and nested objects as JSON objects.
+"""
+import json
+import typing
+from dataclasses import fields, is_dataclass
+from datetime import datetime, timedelta
+
+from skyetel import responses
+from skyetel.decoders import SKYETEL_DATESTRING, SKYETEL_TIMESTRING
+
+# Row counts at scale 1
+PHONENUMBERS = 100000
+SMS_MESSAGES = 1000000
+TENANTS = 500
+MONTHS = 12
+OTHER_ROWS = 10000
+
+EPOCH = datetime(2021, 1, 1)
+
+# Fields whose wire value the type hint does not describe
+_WIRE_VALUES = {
+    (responses.CallCount, 'date'): lambda i: (EPOCH + timedelta(hours=i)).strftime(SKYETEL_TIMESTRING),
+    (responses.TenantInvoice, 'scheduled_date'): lambda i: (EPOCH + timedelta(hours=i)).strftime(SKYETEL_TIMESTRING),
+    (responses.E911Address, 'postal_code'): lambda i: '{:05d}'.format(i % 100000),
+}
+
+
+def org_row(i=1):
+    return {'id': i, 'active': True, 'authorized_tier': 2, 'account_number': '100200', 'support_pin': '4321',
+            'org_name': 'Example', 'website': 'example.com', 'transcription_password': '',
+            'phone_number': '15550001111', 'billing_postal_code': '02134', 'billing_alert_email': '',
+            'billing_alert_sms': '', 'uptime_alert_email': '', 'uptime_alert_sms': '', 'address': '',
+            'balance': '125.50', 'auto_recharge_reserve': '25.00', 'tags': []}
+
+
+def phonenumber_row(i):
+    return {
+        'id': i, 'number': str(15550000000 + i), 'forward': '', 'failover': str(15559990000 + i % 10),
+        'category': 'local', 'note': '', 'endpoint_group': {'id': i % 8, 'name': 'group-{}'.format(i % 8)},
+        'tenant': {'id': i % 50, 'tenant_code': 'T{}'.format(i % 50), 'name': 'Tenant {}'.format(i % 50)},
+        'origination': {'id': 1, 't38': None}, 'localpresence': None, 'localpresence_principle': None,
+        'e911address': None, 'alg': 0, 'vanity': False, 'exotic': False, 'tn_format': 1, 'failure_strategy': 0,
+        'e911_enabled': i % 3 == 0, 'off_network': False, 'cnam_enabled': True, 'spamblock_enabled': i % 2 == 0,
+        'spamblock_passthru': False, 'spamblock_cnam_prepend': False, 'spamblock_risk_score': 50,
+        'spamblock_allow_unknown': True, 'record_calls': 0, 'spamblock_bot': 0, 'spamblock_bot_contact_email': '',
+        'vfax_enabled': False, 'vfax_external_enabled': False, 'vfax_routing_enabled': False,
+        'conference_bridge_enabled': False, 'block_nocid': False, 'message_enabled': True, 'tier_enabled': 0,
+        'intl_balance': '0.00', 'intl_reserve': '5.00', 'lifecycle_state': 'active', 'portin_id': None,
+        'sip_credential': None, 'org': org_row(),
+    }
+
+
+def sms_row(i):
+    return {
+        'id': i, 'org': org_row(), 'time': (EPOCH + timedelta(seconds=30 * i)).strftime(SKYETEL_DATESTRING),
+        'flag_attachment': i % 20 == 0, 'flag_delivered': i % 50 != 0, 'from_phonenumber': str(15550000000 + i % 997),
+        'to_phonenumber': str(15560000000 + i % 5003), 'fwd_to_phonenumber': '', 'fwd_to_email': '',
+        'src_tenant_id': i % TENANTS, 'dst_tenant_id': None, 'cost': '0.0040', 'delivery_state': 'delivered',
+    }
+
+
+def tenant_statement_row(i):
+    tenant, month = i % TENANTS, i // TENANTS
+    row = record_row(responses.TenantStatement, i)
+    row['month'] = datetime(EPOCH.year + month // 12, month % 12 + 1, 1).strftime(SKYETEL_DATESTRING)
+    row['org'] = {'org_id': 1, 'org_name': 'Example'}
+    row['tenant'] = {'id': tenant, 'tenant_code': 'T{}'.format(tenant), 'name': 'Tenant {}'.format(tenant)}
+    return row
+
+
+def _wire_value(cls, name, hint, i):
+    if (cls, name) in _WIRE_VALUES:
+        return _WIRE_VALUES[(cls, name)](i)
+    if hint is int:
+        return i
+    if hint is float:
+        return '{:.2f}'.format(i % 1000 / 7)
+    if hint is bool:
+        return i % 2 == 0
+    if hint is str:
+        return '{}-{}'.format(name, i % 100)
+    if hint is datetime:
+        return (EPOCH + timedelta(minutes=i)).strftime(SKYETEL_DATESTRING)
+    if is_dataclass(hint):
+        return record_row(hint, i)
+    if typing.get_origin(hint) is list or hint is typing.List:
+        args = typing.get_args(hint)
+        return [record_row(args[0], i)] if args and is_dataclass(args[0]) else []
+    return None
+
+
+def record_row(cls, i):
+    """
+        A wire-format row for any responses dataclass, built from its type hints
+    :param cls: dataclass type from skyetel.responses
+    :param i: integer, row number, varies ids, numbers and timestamps
+    :return: dict
+    """
+    hints = typing.get_type_hints(cls)
+    return {f.name: _wire_value(cls, f.name, hints[f.name], i) for f in fields(cls)}
+
+
+def pages(make_row, count, page_size=1000):
+    """
+        JSON bodies of consecutive pages, built one at a time so a million-row fixture never sits in memory at once
+    :param make_row: callable, make_row(i) returning a row
+    :param count: integer, total rows
+    :param page_size: integer, rows per page
+    :return: generator of (rows in page, JSON text)
+    """
+    for offset in range(0, count, page_size):
+        rows = [make_row(i) for i in range(offset, min(offset + page_size, count))]
+        yield len(rows), json.dumps(rows)
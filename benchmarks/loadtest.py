@@ -0,0 +1,163 @@
+"""
+    Load test: drive a Skyetel client from several threads against the emulator and report sustained throughput
+    and tail latency per operation, as JSON.
+
+    python -m benchmarks.loadtest [--workers 8] [--duration 30] [--calls 120] [--latency 0.05] [--jitter 0.02]
+    python -m benchmarks.loadtest --url http://127.0.0.1:8080/v1 ...   (an emulator started separately)
+"""
+import argparse
+import collections
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from skyetel import Skyetel, PhoneNumberUpdate, errors, limiter, metrics, transport
+from .emulator import Emulator
+
+# Operation name, relative weight and call(client, random, rows)
+OPERATIONS = [
+    ('get_phonenumbers', 30, lambda client, rng, rows: client.get_phonenumbers(100, rng.randrange(rows))),
+    ('get_phonenumbers_filtered', 10,
+     lambda client, rng, rows: client.get_phonenumbers(100, 0, search={'tenant_id': rng.randrange(50)},
+                                                       sort=['-id'])),
+    ('get_sms_receipts', 20,
+     lambda client, rng, rows: client.get_sms_receipts(100, rng.randrange(rows), sort=['-time', '-id'])),
+    ('get_phonenumber_e911', 10, lambda client, rng, rows: client.get_phonenumber_e911(rng.randrange(1, rows))),
+    ('update_phonenumber', 10,
+     lambda client, rng, rows: client.update_phonenumber(rng.randrange(1, rows),
+                                                         PhoneNumberUpdate(note='load {}'.format(rng.random())))),
+    ('get_billing_balance', 10, lambda client, rng, rows: client.get_billing_balance()),
+    ('get_tenants', 10, lambda client, rng, rows: client.get_tenants(50, rng.randrange(rows))),
+]
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile(ordered, p):
+    """
+    :param ordered: list[float], sorted samples
+    :param p: float, percentile between 0 and 100
+    :return: float, nearest-rank percentile, None without samples
+    """
+    if not ordered:
+        return None
+    return ordered[min(len(ordered), max(1, math.ceil(p / 100 * len(ordered)))) - 1]
+
+
+def summarize(latencies, elapsed):
+    ordered = sorted(latencies)
+    summary = {'calls': len(ordered), 'throughput': len(ordered) / elapsed if elapsed else 0.0,
+               'mean': sum(ordered) / len(ordered) if ordered else None, 'max': ordered[-1] if ordered else None}
+    summary.update(('p{:g}'.format(p), percentile(ordered, p)) for p in PERCENTILES)
+    return summary
+
+
+def run(base_url, workers=8, duration=30.0, calls=limiter.API_CALLS, period=limiter.API_PERIOD, rows=1000,
+        operations=None, seed=0):
+    """
+        Call the API from workers threads for duration seconds, each picking weighted random operations
+    :param base_url: string, API root of the emulator
+    :param workers: integer, concurrent callers sharing one client
+    :param duration: float, seconds to run
+    :param calls: integer, client rate budget per period, should match the emulator's throttle
+    :param period: float, rate budget window in seconds
+    :param rows: integer, rows per collection in the emulator, bounds the offsets and ids used
+    :param operations: list[string], operation names to run, None runs the whole mix
+    :param seed: integer, seed for the operation choices
+    :return: dict, overall and per operation summaries with calls, throughput in calls/s and latency percentiles in
+        seconds, errors by type, and the client's per-route metrics
+    """
+    mix = [operation for operation in OPERATIONS if operations is None or operation[0] in operations]
+    if not mix:
+        raise errors.ValidationError('No operations selected')
+    observer = metrics.MetricsAggregator()
+    client = Skyetel('loadtest', 'loadtest', rate_limiter=limiter.SlidingWindow(calls, period),
+                     coalesce_requests=False, transport=transport.RequestsTransport(pool_size=workers),
+                     observer=observer, base_url=base_url)
+    latencies = collections.defaultdict(list)
+    failures = collections.Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        names = [operation[0] for operation in mix]
+        weights = [operation[1] for operation in mix]
+        calls_by_name = {operation[0]: operation[2] for operation in mix}
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                calls_by_name[name](client, rng, rows)
+            except errors.Error as e:
+                with lock:
+                    failures['{} {}'.format(type(e).__name__, e)] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+
+    client.warmup(workers)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(worker, range(workers)))
+    elapsed = time.monotonic() - started
+    client.close()
+
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'overall': summarize([value for values in latencies.values() for value in values], elapsed),
+        'operations': {name: summarize(values, elapsed) for name, values in sorted(latencies.items())},
+        'errors': dict(failures),
+        'client': observer.snapshot(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='API root of a running emulator; by default one is started in process')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run')
+    parser.add_argument('--calls', type=int, default=limiter.API_CALLS, help='rate budget per period')
+    parser.add_argument('--period', type=float, default=limiter.API_PERIOD, help='rate budget window in seconds')
+    parser.add_argument('--rows', type=int, default=1000, help='rows per collection')
+    parser.add_argument('--operation', action='append', help='run only this operation, may be repeated')
+    parser.add_argument('--latency', type=float, default=0.0, help='in-process emulator: seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='in-process emulator: latency jitter')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='in-process emulator: share of HTTP 500s')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='in-process emulator: share of dropped calls')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the report to this file instead of standard output')
+    args = parser.parse_args(argv)
+
+    emulator = None
+    base_url = args.url
+    if base_url is None:
+        emulator = Emulator(rows=args.rows, calls=args.calls, period=args.period, latency=args.latency,
+                            jitter=args.jitter, failure_rate=args.failure_rate, drop_rate=args.drop_rate,
+                            seed=args.seed).start()
+        base_url = emulator.base_url
+    try:
+        report = run(base_url, args.workers, args.duration, args.calls, args.period, args.rows, args.operation,
+                     args.seed)
+        if emulator is not None:
+            report['server'] = {str(key): value for key, value in emulator.stats().items()}
+    finally:
+        if emulator is not None:
+            emulator.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
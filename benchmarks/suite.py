@@ -0,0 +1,228 @@
+"""
+    Offline benchmark suite: decode throughput of every get_* parsing path, query string building, and memory
+    retained per decoded record, all on generated fixtures. Results are written as JSON so two runs can be compared.
+
+    python -m benchmarks.suite [--scale 0.1] [--repeat 3] [--only PATTERN] [--output results.json]
+    python -m benchmarks.suite --compare baseline.json [--tolerance 0.15]
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from skyetel import responses, decoders, builders, interning, views, urls
+from . import fixtures
+
+DATACLASS = 'dataclass'
+COMPACT = 'compact'
+LAZY = 'lazy'
+
+# Client method, record type, whether the body is one object, fixture row, rows at scale 1, and whether the
+# method takes lazy/fields
+METHODS = [
+    ('get_audio_recordings_list', responses.AudioRecording, False, None, fixtures.OTHER_ROWS, True),
+    ('get_audio_transcriptions_list', responses.AudioTranscription, False, None, fixtures.OTHER_ROWS, True),
+    ('get_organization_statement', responses.BillingStatement, True, None, 1000, False),
+    ('get_endpoints_list', responses.Endpoint, False, None, fixtures.OTHER_ROWS, False),
+    ('get_phonenumber_e911', responses.E911Address, True, None, fixtures.OTHER_ROWS, False),
+    ('get_phonenumbers', responses.PhoneNumber, False, fixtures.phonenumber_row, fixtures.PHONENUMBERS, True),
+    ('get_rate_centers', responses.RateCenter, False, None, fixtures.OTHER_ROWS, False),
+    ('get_sms_receipts', responses.SMSMessage, False, fixtures.sms_row, fixtures.SMS_MESSAGES, True),
+    ('get_endpoint_health', responses.EndpointHealth, False, None, fixtures.OTHER_ROWS, False),
+    ('get_daily_traffic_counts', responses.TrafficCount, False, None, fixtures.OTHER_ROWS, False),
+    ('get_daily_traffic_channels', responses.ChannelCount, False, None, fixtures.OTHER_ROWS, False),
+    ('get_hourly_call_count', responses.CallCount, False, None, fixtures.OTHER_ROWS, False),
+    ('get_tenant_statements', responses.TenantStatement, False, fixtures.tenant_statement_row,
+     fixtures.TENANTS * fixtures.MONTHS, False),
+    ('get_tenant_invoices', responses.TenantInvoice, False, None, fixtures.OTHER_ROWS, False),
+    ('get_billing_products', responses.TenantBillingProduct, False, None, fixtures.OTHER_ROWS, False),
+    ('get_tenants', responses.ExtendedTenant, False, None, fixtures.OTHER_ROWS, True),
+]
+
+# Rows decoded while tracemalloc is running; tracing slows allocation several times over
+MEMORY_ROWS = 10000
+
+
+def _decoder(cls, single, mode, interner):
+    if single:
+        return lambda rows: [decoders.decode(cls, row, interner, mode == COMPACT) for row in rows]
+    if mode == LAZY:
+        return lambda rows: views.decode_page(cls, rows, interner)
+    return lambda rows: decoders.decode_page(cls, rows, interner, mode == COMPACT)
+
+
+def _make_row(cls, make_row):
+    return make_row or (lambda i: fixtures.record_row(cls, i))
+
+
+def decode_throughput(cls, single, make_row, count, mode, repeat):
+    """
+        Best of repeat runs over the whole fixture, fed in pages as the client receives them. Fixture generation is
+        excluded from the timings.
+    :return: tuple, (JSON parse seconds, decode seconds)
+    """
+    # The client's default interner; decode plans are compiled per interner, so warm it up outside the timings
+    decode = _decoder(cls, single, mode, interning.shared_interner())
+    decode(json.loads(json.dumps([make_row(0)])))
+    best = None
+    for _ in range(repeat):
+        parse_seconds = decode_seconds = 0.0
+        gc.collect()
+        for _, body in fixtures.pages(make_row, count):
+            start = time.perf_counter()
+            page = json.loads(body)
+            parsed = time.perf_counter()
+            decode(page)
+            parse_seconds += parsed - start
+            decode_seconds += time.perf_counter() - parsed
+        if best is None or parse_seconds + decode_seconds < sum(best):
+            best = (parse_seconds, decode_seconds)
+    return best
+
+
+def retained_bytes(cls, single, make_row, count, mode):
+    """
+        Memory still allocated after parsing and decoding count rows and dropping the parsed JSON, so lazy views are
+        charged for the raw rows they keep alive
+    :return: integer, bytes
+    """
+    body = json.dumps([make_row(i) for i in range(count)])
+    decode = _decoder(cls, single, mode, interning.shared_interner())
+    decode(json.loads(json.dumps([make_row(0)])))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        page = json.loads(body)
+        result = decode(page)
+        del page
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def _query_cases():
+    search_filter = responses.PhoneNumberFilter(states=['MA', 'NH'], npas=[617, 781, 857], category=1, quantity=10,
+                                                tnMask='617xxxxxxx', lata=128, sequential=True)
+    start, end = datetime(2021, 1, 1), datetime(2021, 2, 1)
+    url = urls.URLs()
+    return [
+        ('PhoneNumberFilter.params', lambda: search_filter.params()),
+        ('page_parameters', lambda: builders.page_parameters(100, 500, 'smith', {'number': '1617', 'tenant_id': 7},
+                                                             ['-id', 'number'])),
+        ('traffic_parameters', lambda: builders.traffic_parameters(100, 500, start, end, 'America/New_York')),
+        ('phonenumbers_url', lambda: url.phonenumbers_url() + builders.page_parameters(100, 500, sort=['-id'])),
+    ]
+
+
+def query_cost(call, repeat, number=20000):
+    """
+    :return: float, best seconds per call
+    """
+    return min(timeit.repeat(call, repeat=repeat, number=number)) / number
+
+
+def run(scale=1.0, repeat=3, only=None):
+    """
+        Run the suite
+    :param scale: float, multiplies every fixture row count
+    :param repeat: integer, runs per measurement, the best is kept
+    :param only: string, fnmatch pattern on result names
+    :return: list[dict], one per measurement with name, value, unit and better ('higher' or 'lower')
+    """
+    results = []
+
+    def wanted(name):
+        return only is None or fnmatch.fnmatch(name, only)
+
+    for method, cls, single, make_row, count, lazy in METHODS:
+        make_row = _make_row(cls, make_row)
+        count = max(1, int(count * scale))
+        for mode in (DATACLASS, COMPACT, LAZY) if lazy else (DATACLASS, COMPACT):
+            name = 'decode/{}/{}'.format(method, mode)
+            if wanted(name):
+                parse_seconds, decode_seconds = decode_throughput(cls, single, make_row, count, mode, repeat)
+                results.append({'name': name, 'value': count / decode_seconds, 'unit': 'rows/s', 'better': 'higher',
+                                'record_type': cls.__name__, 'rows': count, 'parse_seconds': parse_seconds,
+                                'decode_seconds': decode_seconds})
+            name = 'memory/{}/{}'.format(method, mode)
+            if wanted(name):
+                rows = min(count, MEMORY_ROWS)
+                retained = retained_bytes(cls, single, make_row, rows, mode)
+                results.append({'name': name, 'value': retained / rows, 'unit': 'bytes/record', 'better': 'lower',
+                                'record_type': cls.__name__, 'rows': rows})
+
+    for case, call in _query_cases():
+        name = 'query/{}'.format(case)
+        if wanted(name):
+            results.append({'name': name, 'value': query_cost(call, repeat) * 1e9, 'unit': 'ns/call',
+                            'better': 'lower'})
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+        Find measurements that got worse than the baseline by more than tolerance
+    :param results: list[dict], from run()
+    :param baseline: list[dict], from an earlier run()
+    :param tolerance: float, allowed relative change, e.g. 0.15
+    :return: list[tuple], (name, baseline value, new value, relative change) per regression
+    """
+    before = {result['name']: result['value'] for result in baseline}
+    regressions = []
+    for result in results:
+        old = before.get(result['name'])
+        if not old:
+            continue
+        change = (result['value'] - old) / old
+        if (change < -tolerance) if result['better'] == 'higher' else (change > tolerance):
+            regressions.append((result['name'], old, result['value'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier on every fixture row count')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best is kept')
+    parser.add_argument('--only', help='fnmatch pattern on result names, e.g. "decode/get_phonenumbers/*"')
+    parser.add_argument('--output', help='write the results to this file instead of standard output')
+    parser.add_argument('--compare', help='earlier results file; exit with status 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative change for --compare')
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.only)
+    document = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print('regression: {} {:.6g} -> {:.6g} ({:+.1%})'.format(name, old, new, change), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
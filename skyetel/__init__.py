@@ -1,4 +1,6 @@
 from .skyetel import Skyetel
-from .responses import PhoneNumberUpdate, PhoneNumberFilter, TenantInvoiceProduct, TenantBillingProfile, CreateTenant
-__all__ = ['Skyetel', 'PhoneNumberUpdate', 'PhoneNumberFilter', 'TenantInvoiceProduct', 'TenantBillingProfile',
-           'CreateTenant']
+from .async_skyetel import AsyncSkyetel
+from .responses import PhoneNumberUpdate, PhoneNumberFilter, TenantInvoiceProduct, TenantBillingProfile, CreateTenant, \
+    EndpointConfig
+__all__ = ['Skyetel', 'AsyncSkyetel', 'PhoneNumberUpdate', 'PhoneNumberFilter', 'TenantInvoiceProduct',
+           'TenantBillingProfile', 'CreateTenant', 'EndpointConfig']
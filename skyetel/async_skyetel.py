@@ -0,0 +1,1068 @@
+import asyncio
+import json as json_
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict
+
+from . import errors, urls, responses, pagination, decoders, builders, limiter, interning, views, singleflight, bulk, \
+    reconcile, transcripts, metrics, statements, timeseries, provisioning, downloads
+from . import cache as cache_, transport as transport_
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncSkyetel:
+    """
+        asyncio client with the same method surface as Skyetel. Requests share one pooled aiohttp session, so it should
+        be closed with close() or used as an async context manager.
+    """
+    def __init__(self, x_auth_sid, x_auth_secret, pool_size=100, rate_limiter: limiter.RateLimiter = None,
+                 rate_limit_timeout=None, interner: interning.Interner = interning.shared_interner(),
+                 compact_records=False, cache: cache_.ResponseCache = None, coalesce_requests=True,
+                 download_timeout=60.0, transcript_cache: transcripts.TranscriptCache = None, timeouts: Dict = None,
+                 observer: metrics.Observer = None, base_url: str = urls.BASE_URL,
+                 statement_cache: statements.StatementCache = None):
+        """
+        :param x_auth_sid: string, API SID
+        :param x_auth_secret: string, API secret
+        :param pool_size: integer, maximum number of pooled connections
+        :param rate_limiter: RateLimiter, request budget, defaults to a 120/min window shared per SID in this process
+        :param rate_limit_timeout: float, seconds to wait for budget before raising RateLimited, None waits forever
+        :param interner: Interner, shares repeated nested objects between result rows, None disables interning
+        :param compact_records: bool, return __slots__ records, and compact.Records instead of lists, to save memory
+        :param cache: ResponseCache, caches GET responses per route TTL and invalidates them on writes, None disables
+        :param coalesce_requests: bool, identical GETs in flight at the same time share one request and its result
+        :param download_timeout: float, seconds allowed for fetching one transcript file
+        :param transcript_cache: TranscriptCache, keeps fetched transcripts on disk, None disables
+        :param timeouts: dict, endpoint class to (connect, read) seconds, merged over transport.DEFAULT_TIMEOUTS
+        :param observer: Observer, receives request, rate limit, cache and decode timings, None disables them
+        :param base_url: string, API root, override to point the client at a proxy or emulator
+        :param statement_cache: StatementCache, keeps statements of closed months on disk, None disables
+        """
+        if aiohttp is None:
+            raise errors.ValidationError('AsyncSkyetel requires the aiohttp package')
+        self.__x_auth_sid = x_auth_sid
+        self.__x_auth_secret = x_auth_secret
+        self.__url = urls.URLs(base_url)
+        self.__rate_limiter = rate_limiter or limiter.shared_bucket(x_auth_sid)
+        self.__rate_limit_timeout = rate_limit_timeout
+        self.__interner = interner
+        self.__compact_records = compact_records
+        self.__cache = cache
+        self.__single_flight = singleflight.shared_group(x_auth_sid) if coalesce_requests else None
+        self.__observer = observer
+
+        self.__headers = {'X-AUTH-SID': x_auth_sid, 'X-AUTH-SECRET': x_auth_secret}
+        self.__pool_size = pool_size
+        self.__session = None
+        self.__download_timeout = download_timeout
+        self.__transcript_cache = transcript_cache
+        self.__statement_cache = statement_cache
+        self.__refresh_lock = None
+        self.__refreshing = set()
+        self.__refresh_tasks = set()
+        timeouts = dict(transport_.DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.__timeouts = {endpoint_class: aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+                           for endpoint_class, (connect, read) in timeouts.items()}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+            Close the pooled connections, cancelling background refreshes still queued
+        :return: None
+        """
+        for task in list(self.__refresh_tasks):
+            task.cancel()
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def warmup(self, connections: int = 1):
+        """
+            Open connections to the API ahead of the first call, so it does not pay the TCP and TLS handshakes. Sends
+            unauthenticated HEAD requests, which do not use the rate budget.
+        :param connections: integer, keep-alive connections to open, at most pool_size are kept
+        :return: None
+        """
+        async def head():
+            async with self.__get_session().head(self.__url.base_url(), timeout=self.__timeouts['read']):
+                pass
+
+        try:
+            await asyncio.gather(*[head() for _ in range(max(1, min(connections, self.__pool_size)))])
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
+
+    def __get_session(self):
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit=self.__pool_size)
+            self.__session = aiohttp.ClientSession(connector=connector)
+        return self.__session
+
+    async def __make_api_request(self, request_type, endpoint, data=None, json=None):
+        if request_type not in ('GET', 'POST', 'PATCH', 'DELETE'):
+            raise errors.ValidationError('Invalid Request Type')
+
+        if request_type != 'GET':
+            return await self.__send_request(request_type, endpoint, data, json)
+
+        entry = None
+        if self.__cache is not None:
+            entry = self.__cache.get(endpoint, self.__x_auth_sid)
+            if entry is not None and entry.fresh:
+                self.__observe_cache(endpoint, metrics.CACHE_HIT)
+                return entry.value
+            if self.__cache.stale(entry, cache_.serving_stale.get()):
+                self.__observe_cache(endpoint, metrics.CACHE_STALE)
+                self.__submit_refresh(endpoint, lambda: self.__send_request(request_type, endpoint, data, json, entry))
+                return entry.value
+            self.__observe_cache(endpoint, metrics.CACHE_MISS)
+
+        if self.__single_flight is not None:
+            return await self.__single_flight.do_async((endpoint, repr(data), repr(json)),
+                                                       lambda: self.__send_request(request_type, endpoint, data, json,
+                                                                                   entry))
+        return await self.__send_request(request_type, endpoint, data, json, entry)
+
+    def __submit_refresh(self, endpoint, refresh):
+        # Background refreshes run as tasks on this client's loop, one at a time so they never stampede the rate
+        # budget. They never touch the cache's refresher thread, which would block on a loop that has stopped.
+        if endpoint in self.__refreshing:
+            return
+        self.__refreshing.add(endpoint)
+        task = asyncio.ensure_future(self.__refresh(endpoint, refresh))
+        self.__refresh_tasks.add(task)
+        task.add_done_callback(self.__refresh_tasks.discard)
+
+    async def __refresh(self, endpoint, refresh):
+        if self.__refresh_lock is None:
+            self.__refresh_lock = asyncio.Lock()
+        try:
+            async with self.__refresh_lock:
+                await refresh()
+            self.__cache.refresher.record()
+        except errors.Error:
+            # The stale entry stays in place and the next stale read tries again
+            self.__cache.refresher.record(failed=True)
+        finally:
+            self.__refreshing.discard(endpoint)
+
+    async def __send_request(self, request_type, endpoint, data, json, entry=None):
+        headers = dict(self.__headers)
+        if entry is not None:
+            headers.update(entry.validators())
+
+        observer = self.__observer
+        pattern = self.__url.pattern(endpoint)
+        timeout = self.__timeouts.get(transport_.endpoint_class(request_type, pattern), self.__timeouts['read'])
+        for _ in range(limiter.RATE_LIMIT_RETRIES + 1):
+            if observer is not None:
+                started = time.perf_counter()
+            if not await self.__rate_limiter.acquire_async(self.__rate_limit_timeout):
+                raise errors.RateLimited('Rate limit budget exhausted')
+            if observer is not None:
+                sent = time.perf_counter()
+                observer.on_rate_limit_wait(pattern, sent - started)
+
+            try:
+                async with self.__get_session().request(request_type, endpoint, data=data, json=json,
+                                                        headers=headers, timeout=timeout) as response:
+                    body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
+            if observer is not None:
+                observer.on_request(pattern, request_type, response.status, time.perf_counter() - sent, len(body), 0)
+            if response.status != 429:
+                break
+            # Over budget anyway, e.g. another host uses the same account: hold every caller back for Retry-After
+            await self.__rate_limiter.pause_async(limiter.retry_after(response.headers))
+        else:
+            raise errors.RateLimited('API rate limit exceeded')
+
+        if response.status == 304 and entry is not None:
+            if observer is not None:
+                observer.on_cache(pattern, metrics.CACHE_REVALIDATED)
+            return self.__cache.revalidated(endpoint, entry, self.__x_auth_sid)
+
+        if observer is None:
+            content = json_.loads(body)
+        else:
+            parsing = time.perf_counter()
+            content = json_.loads(body)
+            observer.on_parse(pattern, time.perf_counter() - parsing)
+
+        if response.status != 200:
+            raise errors.APIError(content['ERROR'])
+
+        if self.__cache is not None:
+            if request_type == 'GET':
+                self.__cache.store(endpoint, pattern, content, response.headers, self.__x_auth_sid)
+            else:
+                self.__cache.invalidate_write(pattern)
+        return content
+
+    @contextmanager
+    def serve_stale(self, max_stale=None):
+        """
+            Let reads inside the block return a cached response that is up to max_stale seconds past its TTL
+            immediately, while a background task on the event loop fetches a new one
+        :param max_stale: float, seconds, overrides the cache's max_stale for this block
+        :return: context manager yielding a cache.Staleness, whose stale flag is set if any read was served stale
+        """
+        if self.__cache is None:
+            raise errors.ValidationError('serve_stale requires a cache')
+        staleness = cache_.Staleness(max_stale)
+        token = cache_.serving_stale.set(staleness)
+        try:
+            yield staleness
+        finally:
+            cache_.serving_stale.reset(token)
+
+    def __observe_cache(self, endpoint, event):
+        if self.__observer is not None:
+            self.__observer.on_cache(self.__url.pattern(endpoint), event)
+
+    def __decode(self, cls, response):
+        if self.__observer is None:
+            return decoders.decode(cls, response, self.__interner, self.__compact_records)
+        started = time.perf_counter()
+        result = decoders.decode(cls, response, self.__interner, self.__compact_records)
+        self.__observer.on_decode(cls.__name__, 0 if result is None else 1, time.perf_counter() - started)
+        return result
+
+    def __decode_page(self, cls, response, lazy=False, fields=None):
+        if self.__observer is not None:
+            started = time.perf_counter()
+        if lazy or fields:
+            result = views.decode_page(cls, response, self.__interner, fields)
+        else:
+            result = decoders.decode_page(cls, response, self.__interner, self.__compact_records)
+        if self.__observer is not None:
+            self.__observer.on_decode(cls.__name__, len(result) if result else 0, time.perf_counter() - started)
+        return result
+
+    async def get_audio_recordings_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None,
+                                        lazy: bool = False, fields: List[str] = None):
+        """
+            Get a list of the phone call recordings.
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[AudioRecording], List of AudioRecording objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = await self.__make_api_request('GET', self.__url.audio_recordings_url() + parameters)
+        return self.__decode_page(responses.AudioRecording, response, lazy, fields)
+
+    def iter_audio_recordings(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                              sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Asynchronously iterate over all phone call recordings, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: async generator[AudioRecording], AudioRecording objects in server order
+        """
+        async def fetch_page(limit, offset):
+            return await self.get_audio_recordings_list(limit, offset, query=query, search=search, sort=sort,
+                                                        lazy=lazy, fields=fields)
+        return pagination.aiter_records(fetch_page, items_per_page, page_offset)
+
+    async def get_audio_recording_url(self, recording_id):
+        """
+            Get the URL for the audio file of a specific call recording
+        :param recording_id: integer, ID of a call recording from recording list
+        :return: string, URL of call recording audio file
+        """
+        response = await self.__make_api_request('GET', self.__url.audio_recording_download_url(recording_id))
+        return response.get('download_url', None)
+
+    async def download_audio_recordings(self, recordings, directory, max_workers: int = 4):
+        """
+            Download call recording audio files to a directory, resuming partial files and skipping finished ones
+        :param recordings: iterable of AudioRecording or integer recording ids; only AudioRecording sizes are verified
+        :param directory: string, destination directory, created if missing
+        :param max_workers: integer, concurrent downloads
+        :return: list[downloads.DownloadReport], one per recording in input order
+        """
+        downloader = downloads.RecordingDownloader(self, directory, max_workers)
+        try:
+            return await downloader.adownload(recordings)
+        finally:
+            downloader.close()
+
+    async def get_audio_transcriptions_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None,
+                                            lazy: bool = False, fields: List[str] = None):
+        """
+            Get a list of all phone call transcriptions
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[AudioTranscription], list of AudioTranscription objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = await self.__make_api_request('GET', self.__url.audio_transcriptions_url() + parameters)
+        return self.__decode_page(responses.AudioTranscription, response, lazy, fields)
+
+    def iter_audio_transcriptions(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                                  sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Asynchronously iterate over all phone call transcriptions, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: async generator[AudioTranscription], AudioTranscription objects in server order
+        """
+        async def fetch_page(limit, offset):
+            return await self.get_audio_transcriptions_list(limit, offset, query=query, search=search, sort=sort,
+                                                            lazy=lazy, fields=fields)
+        return pagination.aiter_records(fetch_page, items_per_page, page_offset)
+
+    async def get_audio_transcription_url(self, transcription_id):
+        """
+            Get the URL for the text log of a specific call transcription
+        :param transcription_id: integer, ID of a call transcription from transcription list
+        :return: string, URL of call transcription text log
+        """
+        response = await self.__make_api_request('GET', self.__url.audio_transcription_download_url(transcription_id))
+        return response.get('download_url', None)
+
+    async def get_audio_transcription_text(self, transcription_id):
+        """
+            Get the text log for a specific call transcription
+        :param transcription_id: integer, ID of a call transcription from transcription list
+        :return: dict, dictionary of both parties text and timestamps
+        """
+        if self.__transcript_cache is not None:
+            transcript = self.__transcript_cache.get(transcription_id)
+            if transcript is not None:
+                return transcript
+
+        response = await self.__make_api_request('GET', self.__url.audio_transcription_download_url(transcription_id))
+        url = response.get('download_url', '')
+        if url:
+            timeout = aiohttp.ClientTimeout(total=self.__download_timeout)
+            try:
+                async with self.__get_session().get(url, timeout=timeout) as download:
+                    body = await download.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                raise errors.Unavailable('Transcript Unavailable: {}'.format(e)) from None
+            transcript = transcripts.decode_download(download.status, body)
+            if self.__transcript_cache is not None:
+                self.__transcript_cache.put(transcription_id, transcript)
+            return transcript
+        else:
+            return None
+
+    async def fetch_transcripts(self, transcription_ids, max_workers: int = 8):
+        """
+            Get the text logs of many call transcriptions concurrently, reading cached ones from disk. A failing ID
+            does not stop the others; its error is returned with the batch.
+        :param transcription_ids: iterable of integer transcription IDs
+        :param max_workers: integer, concurrent fetches, API calls are further limited by the rate budget
+        :return: transcripts.TranscriptBatch, text logs by ID and the errors of the IDs that failed
+        """
+        transcription_ids = list(transcription_ids)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(transcription_id):
+            async with semaphore:
+                try:
+                    return await self.get_audio_transcription_text(transcription_id), None
+                except errors.Error as e:
+                    return None, e
+
+        batch = transcripts.TranscriptBatch()
+        for transcription_id, (transcript, error) in zip(transcription_ids,
+                                                         await asyncio.gather(*map(fetch, transcription_ids))):
+            if error is None:
+                batch.transcripts[transcription_id] = transcript
+            else:
+                batch.failed[transcription_id] = error
+        return batch
+
+    async def get_billing_balance(self):
+        """
+            Get the remaining balance on the account
+        :return: float, billing balance remaining on the account
+        """
+        response = await self.__make_api_request('GET', self.__url.balance_url())
+        return float(response.get('BALANCE', 0))
+
+    async def get_organization_statement(self, year=None, month=None):
+        """
+            Get the monthly statement for the entire organization account. Defaults to current month.
+        :param year: integer, four digit year of the statement month
+        :param month: integer, single or double digit, with January corresponding to 1
+        :return: BillingStatement
+        """
+        if year and month:
+            response = await self.__monthly(statements.ORGANIZATION, self.__url.organization_statement_url(), year,
+                                            month)
+        else:
+            parameters = builders.month_parameters(year, month)
+            response = await self.__make_api_request('GET', self.__url.organization_statement_url() + parameters)
+        return self.__decode(responses.BillingStatement, response)
+
+    async def get_organization_statement_range(self, start, end, max_workers: int = 8):
+        """
+            Get the organization statements of every month in a range, fetched concurrently. With a statement cache,
+            closed months are requested once and read from disk afterwards.
+        :param start: (year, month) tuple, or a date, first month
+        :param end: (year, month) tuple, or a date, last month, included
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: dict, (year, month) to BillingStatement, in month order
+        """
+        month_list = statements.months(start, end)
+        url = self.__url.organization_statement_url()
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(year, month):
+            async with semaphore:
+                return await self.__monthly(statements.ORGANIZATION, url, year, month)
+        fetched = await asyncio.gather(*(fetch(year, month) for year, month in month_list))
+        return {key: self.__decode(responses.BillingStatement, response) for key, response in zip(month_list, fetched)}
+
+    async def __monthly(self, kind, url, year, month):
+        # Raw response for one month's statements, read from the statement cache once the month has closed
+        cache = self.__statement_cache if statements.is_closed(year, month) else None
+        response = cache.get(self.__x_auth_sid, kind, year, month) if cache is not None else None
+        if response is None:
+            response = await self.__make_api_request('GET', url + builders.month_parameters(year, month))
+            if cache is not None:
+                cache.put(self.__x_auth_sid, kind, year, month, response)
+        return response
+
+    async def get_endpoints_list(self, items_per_page=10, page_offset=0):
+        """
+            Get list of SIP Endpoints
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :return: list[Endpoint], list of Endpoint objects
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset)
+        response = await self.__make_api_request('GET', self.__url.endpoints_url() + parameters)
+        return self.__decode_page(responses.Endpoint, response)
+
+    def iter_endpoints(self, items_per_page: int = 100, page_offset: int = 0):
+        """
+            Asynchronously iterate over all SIP Endpoints, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :return: async generator[Endpoint], Endpoint objects in server order
+        """
+        return pagination.aiter_records(self.get_endpoints_list, items_per_page, page_offset)
+
+    async def create_endpoint(self, ip, priority, description, endpoint_group_id, endpoint_group_name, port=5060,
+                              transport="udp"):
+        """
+            Create a new SIP Endpoint in an Endpoint Group
+        :param ip: string, IPv4 Address of the Endpoint
+        :param priority: integer, the higher the number, the higher the priority
+        :param description: string, short note to describe the Endpoint
+        :param endpoint_group_id: integer, Endpoint Group ID
+        :param endpoint_group_name: string, Endpoint Group Name
+        :param port: integer, SIP Port Number for the Endpoint (default 5060)
+        :param transport: string, SIP Transport method, UDP (default) or TCP
+        :return: Endpoint, object representation of the created Endpoint
+        """
+        parameters = builders.endpoint_data(ip, priority, description, endpoint_group_id, endpoint_group_name, port,
+                                            transport)
+        response = await self.__make_api_request('POST', self.__url.endpoints_url(), data=parameters)
+        return self.__decode(responses.Endpoint, response)
+
+    async def update_endpoint(self, endpoint_id, ip, priority, description, endpoint_group_id, endpoint_group_name,
+                              port=5060, transport="udp"):
+        """
+            Update an existing Endpoint's details
+        :param endpoint_id: integer, assigned ID for the Endpoint
+        :param ip: string, IPv4 Address of the Endpoint
+        :param priority: integer, the higher the number, the higher the priority
+        :param description: string, short note to describe the Endpoint
+        :param endpoint_group_id: integer, Endpoint Group ID
+        :param endpoint_group_name: string, Endpoint Group Name
+        :param port: integer, SIP Port Number for the Endpoint (default 5060)
+        :param transport: string, SIP Transport method, UDP (default) or TCP
+        :return: Endpoint, object representation of the updated Endpoint
+        """
+        parameters = builders.endpoint_data(ip, priority, description, endpoint_group_id, endpoint_group_name, port,
+                                            transport)
+        response = await self.__make_api_request('PATCH', self.__url.endpoint_url(endpoint_id), data=parameters)
+        return self.__decode(responses.Endpoint, response)
+
+    async def plan_endpoints(self, desired: Dict[responses.EndpointGroup, List[responses.EndpointConfig]]):
+        """
+            Dry run of reconcile_endpoints: compare the desired endpoints with every current Endpoint
+        :param desired: dict, EndpointGroup to the list of EndpointConfig it should contain
+        :return: reconcile.EndpointPlan, creates, updates, unchanged and unmanaged endpoints
+        """
+        return reconcile.plan(desired, [endpoint async for endpoint in self.iter_endpoints()])
+
+    async def reconcile_endpoints(self, desired: Dict[responses.EndpointGroup, List[responses.EndpointConfig]],
+                                  plan: reconcile.EndpointPlan = None, max_workers: int = 8):
+        """
+            Create and update Endpoints concurrently until each group matches the desired state. Only real changes
+            are written and nothing is deleted.
+        :param desired: dict, EndpointGroup to the list of EndpointConfig it should contain
+        :param plan: EndpointPlan, a reviewed result of plan_endpoints to apply instead of planning again
+        :param max_workers: integer, concurrent write requests, further limited by the rate budget
+        :return: list[reconcile.ChangeReport], one per create or update in plan order
+        """
+        if plan is None:
+            plan = await self.plan_endpoints(desired)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def apply(change):
+            async with semaphore:
+                return await reconcile.apply_async(self, change)
+
+        return list(await asyncio.gather(*[apply(change) for change in plan.writes]))
+
+    async def get_phonenumber_e911(self, phonenumber_id):
+        """
+            Get the E911 address associated with a phone number
+        :param phonenumber_id: integer, assigned ID for the Phone Number
+        :return: E911Address, object representation of the associated E911 Address
+        """
+        response = await self.__make_api_request('GET', self.__url.phonenumber_e911address_url(phonenumber_id))
+        return self.__decode(responses.E911Address, response)
+
+    async def create_phonenumber_e911(self, phonenumber_id, caller_name, address1, address2, community, state,
+                                      postal_code):
+        """
+            Create an E911 address for a phone number and enable E911 processing
+        :param phonenumber_id: integer, assigned ID for the Phone Number
+        :param caller_name: string, Name associated with the Phone Number
+        :param address1: string, First Address Line for Emergency Response
+        :param address2: string, Second Address Line for Emergency Response
+        :param community: string, City for Emergency Response
+        :param state: string, Two letter State Abbreviation for Emergency Response
+        :param postal_code: string, Postal Code for Emergency Response
+        :return: E911Address, object representation of the associated E911 Address
+        """
+        parameters = builders.e911_data(caller_name, address1, address2, community, state, postal_code)
+        response = await self.__make_api_request('POST', self.__url.phonenumber_e911address_url(phonenumber_id),
+                                                 data=parameters)
+        return self.__decode(responses.E911Address, response)
+
+    async def update_phonenumber_e911(self, phonenumber_id: int, caller_name, address1, address2, community, state,
+                                      postal_code):
+        """
+            Update an E911 address for a phone number
+        :param phonenumber_id: integer, assigned ID for the Phone Number
+        :param caller_name: string, Name associated with the Phone Number
+        :param address1: string, First Address Line for Emergency Response
+        :param address2: string, Second Address Line for Emergency Response
+        :param community: string, City for Emergency Response
+        :param state: string, Two letter State Abbreviation for Emergency Response
+        :param postal_code: string, Postal Code for Emergency Response
+        :return: E911Address, object representation of the associated E911 Address
+        """
+        parameters = builders.e911_data(caller_name, address1, address2, community, state, postal_code)
+        response = await self.__make_api_request('PATCH', self.__url.phonenumber_e911address_url(phonenumber_id),
+                                                 data=parameters)
+        return self.__decode(responses.E911Address, response)
+
+    async def get_phonenumbers(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None,
+                               sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Get a list of all Phone Numbers associated with the organization account
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[PhoneNumber], list of PhoneNumber objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = await self.__make_api_request('GET', self.__url.phonenumbers_url() + parameters)
+        return self.__decode_page(responses.PhoneNumber, response, lazy, fields)
+
+    def iter_phonenumbers(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                          sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Asynchronously iterate over all Phone Numbers in the organization account, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: async generator[PhoneNumber], PhoneNumber objects in server order
+        """
+        async def fetch_page(limit, offset):
+            return await self.get_phonenumbers(limit, offset, query=query, search=search, sort=sort,
+                                               lazy=lazy, fields=fields)
+        return pagination.aiter_records(fetch_page, items_per_page, page_offset)
+
+    async def crawl_phonenumbers(self, items_per_page=100, max_workers: int = 8, total: int = None,
+                                 query: str = None, search: Dict = None, sort: List = None, lazy: bool = False,
+                                 fields: List[str] = None):
+        """
+            Get every Phone Number by fetching all pages concurrently, which takes a few round trips instead of one
+            per page. Raises OffsetShift if numbers keep moving between pages while they are read.
+        :param items_per_page: integer, records per request, at most one less than the server's page size cap
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :param total: integer, expected count; defaults to the local and toll-free counts, or is probed when
+            filtering
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], sort fields, defaults to ascending id so numbers added mid-crawl land at the end
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; id is always included
+        :return: list[PhoneNumber], PhoneNumber objects, or LazyRecord views of them, in server order
+        """
+        sort = sort or ['id']
+        if fields and 'id' not in fields:
+            fields = ['id'] + list(fields)
+
+        async def fetch_page(limit, offset):
+            return await self.get_phonenumbers(limit, offset, query=query, search=search, sort=sort,
+                                               lazy=lazy, fields=fields)
+        if total is None:
+            if query or search:
+                total = await pagination.aprobe_total(fetch_page, items_per_page, max_workers)
+            else:
+                local, tollfree = await asyncio.gather(self.get_local_phonunumbers_count(),
+                                                       self.get_tollfree_phonenumbers_count())
+                total = local + tollfree
+        return await pagination.acrawl(fetch_page, total, items_per_page, concurrency=max_workers)
+
+    async def create_off_network_phonenumber(self, number: str):
+        """
+            Creates an Off-Network Phone Number
+        :param number: string, 11 digit phone number to register
+        :return: OffNetworkPhoneNumber, object representation of the Off-Network Phone Number
+        """
+        parameters = {'number': str(number)}
+        response = await self.__make_api_request('POST', self.__url.phonenumbers_offnetwork_url(), json=parameters)
+        return self.__decode(responses.OffNetworkPhoneNumber, response)
+
+    async def update_phonenumber(self, phonenumber_id: int, update_data: responses.PhoneNumberUpdate):
+        """
+            Update features and settings of a Phone Number
+        :param phonenumber_id: integer, assigned Id for the Phone Number
+        :param update_data: PhoneNumberUpdate, object containing changes to apply to the Phone Number
+        :return: PhoneNumberUpdate, object representation of the Phone Number's features and settings
+        """
+        data = update_data.as_dict()
+        response = await self.__make_api_request('PATCH', self.__url.phonenumber_url(phonenumber_id), data=data)
+        return self.__decode(responses.PhoneNumberUpdate, response)
+
+    async def update_phonenumbers(self, updates, current: List[responses.PhoneNumber] = None, max_workers: int = 8):
+        """
+            Apply many Phone Number updates concurrently, skipping those that would change nothing and sending only
+            the fields that differ from the current state
+        :param updates: iterable of (phonenumber_id, PhoneNumberUpdate) pairs
+        :param current: list[PhoneNumber], current state to diff against. If None, each Phone Number is fetched
+            with a search by id just before its update, one extra request per update; for large batches, pass the
+            result of crawl_phonenumbers instead, which costs one request per page of the inventory
+        :param max_workers: integer, concurrent PATCH requests, further limited by the rate budget
+        :return: list[bulk.UpdateReport], one per update in input order
+        """
+        by_id = {phonenumber.id: phonenumber for phonenumber in current or []}
+        fetch_current = self.__current_phonenumber if current is None else None
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def apply(phonenumber_id, update):
+            async with semaphore:
+                return await bulk.apply_async(self.update_phonenumber, phonenumber_id, update,
+                                              by_id.get(phonenumber_id), fetch_current)
+
+        return list(await asyncio.gather(*[apply(phonenumber_id, update) for phonenumber_id, update in updates]))
+
+    async def __current_phonenumber(self, phonenumber_id):
+        # Current state of one Phone Number, limited to the fields an update can change. A search may match other
+        # numbers, and diffing against one of those could skip a needed update, so anything else counts as unknown.
+        found = await self.get_phonenumbers(1, 0, search={'id': phonenumber_id}, fields=bulk.CURRENT_FIELDS)
+        return next((phonenumber for phonenumber in found or () if phonenumber.id == phonenumber_id), None)
+
+    async def apply_phonenumber_update(self, update: responses.PhoneNumberUpdate,
+                                       phonenumbers: List[responses.PhoneNumber], max_workers: int = 8):
+        """
+            Apply one update to every Phone Number in a result, e.g. from get_phonenumbers with a search
+        :param update: PhoneNumberUpdate, object containing changes to apply to each Phone Number
+        :param phonenumbers: list[PhoneNumber], numbers to update, also used as their current state
+        :param max_workers: integer, concurrent PATCH requests, further limited by the rate budget
+        :return: list[bulk.UpdateReport], one per Phone Number in input order
+        """
+        phonenumbers = list(phonenumbers)
+        return await self.update_phonenumbers([(phonenumber.id, update) for phonenumber in phonenumbers],
+                                              phonenumbers, max_workers)
+
+    async def get_available_phonenumbers(self, search_filter: responses.PhoneNumberFilter = None):
+        """
+            Get a list of Phone Numbers available for purchase, with filtering. Phone Numbers are held server-side
+            for 10 minutes
+        :param search_filter: PhoneNumberFilter, object containing filters to apply to search
+        :return: list[string], List of Phone Numbers available for purchase
+        """
+        params = ''
+        if search_filter:
+            params = search_filter.params()
+        response = await self.__make_api_request('GET', self.__url.phonenumbers_ordersearch_url() + params)
+        # A copy, the response may be shared with the cache and with coalesced callers
+        return list(response)
+
+    async def get_rate_centers(self, state: str = None):
+        """
+            Get a list of Rate Centers in a given State
+        :param state: string, Two letter State Abbreviation
+        :return: list[RateCenter], list of RateCenter objects
+        """
+        params = ''
+        if state:
+            params = '?state={}'.format(state)
+        response = await self.__make_api_request('GET', self.__url.phonenumbers_ratecenters_url() + params)
+        return self.__decode_page(responses.RateCenter, response)
+
+    async def order_phonenumbers(self, number_list: List[responses.NumberPurchase]):
+        """
+            UNTESTED: Order Phone Numbers
+        :param number_list: list[NumberPurchase], List of NumberPurchase objects with associated MOU
+        :return: list[PhoneNumberUpdate], List of PhoneNumberUpdate objects
+        """
+        data = builders.order_data(number_list)
+        response = await self.__make_api_request('POST', self.__url.phonenumbers_order_url(), data=data)
+        return self.__decode_page(responses.PhoneNumberUpdate, response)
+
+    async def provision_phonenumbers(self, filters: List[responses.PhoneNumberFilter], mou: int, batch_size: int = 100,
+                                     max_workers: int = 8, margin: float = provisioning.MARGIN_SECONDS,
+                                     max_wait: float = provisioning.MAX_WAIT_SECONDS):
+        """
+            Search with many filters concurrently and order the numbers found in batches before their 10 minute holds
+            expire, the numbers closest to expiry first. Orders that are due go out ahead of further searches.
+            Numbers found by several searches are ordered once.
+        :param filters: list[PhoneNumberFilter], one order search each
+        :param mou: integer, MOU of every NumberPurchase
+        :param batch_size: integer, numbers per order
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :param margin: float, seconds of hold that must remain for a number to be ordered, otherwise it is lost
+        :param max_wait: float, seconds a number waits for a full batch before a partial one is ordered
+        :return: provisioning.ProvisionReport, numbers ordered, numbers lost to expiry and failed requests
+        """
+        tracker = provisioning.HoldTracker(mou, batch_size, margin=margin, max_wait=max_wait)
+        return await provisioning.aprovision(self.get_available_phonenumbers, self.order_phonenumbers, filters, tracker,
+                                             max_workers)
+
+    async def get_local_phonunumbers_count(self):
+        """
+            Get a count of local Phone Numbers in the organization
+        :return: int, Count of local Phone Numbers
+        """
+        response = await self.__make_api_request('GET', self.__url.phonenumbers_localcount_url())
+        return int(response.get('TOTAL', 0))
+
+    async def get_tollfree_phonenumbers_count(self):
+        """
+            Get a count of Toll-Free Phone Numbers in the organization
+        :return: int, Count of Toll-Free Phone Numbers
+        """
+        response = await self.__make_api_request('GET', self.__url.phonenumbers_tfcount_url())
+        return int(response.get('TOTAL', 0))
+
+    async def get_sms_receipts(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None,
+                               sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Get a list of received SMS/MMS messages
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[SMSMessage], list of SMSMessage objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = await self.__make_api_request('GET', self.__url.smsreceipts_url() + parameters)
+        return self.__decode_page(responses.SMSMessage, response, lazy, fields)
+
+    def iter_sms_receipts(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                          sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Asynchronously iterate over all received SMS/MMS messages, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: async generator[SMSMessage], SMSMessage objects in server order
+        """
+        async def fetch_page(limit, offset):
+            return await self.get_sms_receipts(limit, offset, query=query, search=search, sort=sort,
+                                               lazy=lazy, fields=fields)
+        return pagination.aiter_records(fetch_page, items_per_page, page_offset)
+
+    async def get_endpoint_health(self, items_per_page: int = 10, page_offset: int = 0):
+        """
+            Get a list of all Endpoints and their associated health status
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :return: list[EndpointHealth], list of EndpointHealth objects
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset)
+        response = await self.__make_api_request('GET', self.__url.endpoint_health_url() + parameters)
+        return self.__decode_page(responses.EndpointHealth, response)
+
+    def iter_endpoint_health(self, items_per_page: int = 100, page_offset: int = 0):
+        """
+            Asynchronously iterate over all Endpoints and their health status, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :return: async generator[EndpointHealth], EndpointHealth objects in server order
+        """
+        return pagination.aiter_records(self.get_endpoint_health, items_per_page, page_offset)
+
+    async def get_daily_traffic_counts(self, items_per_page: int = 10, page_offset: int = 0,
+                                       start_time_min: datetime = None, start_time_max: datetime = None,
+                                       tz_string: str = None):
+        """
+            Get a list of Traffic Counts per-day between two specified dates
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param start_time_min: datetime, filters data after this date
+        :param start_time_max: datetime, filters data before this date
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :return: list[TrafficCount], list of TrafficCount objects
+        """
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
+        response = await self.__make_api_request('GET', self.__url.traffic_count_url() + parameters)
+        return self.__decode_page(responses.TrafficCount, response)
+
+    async def get_daily_traffic_channels(self, items_per_page: int = 10, page_offset: int = 0,
+                                         start_time_min: datetime = None,
+                                         start_time_max: datetime = None, tz_string: str = None):
+        """
+            Get a list of Channels used per-day between two specified dates
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param start_time_min: datetime, filters data after this date
+        :param start_time_max: datetime, filters data before this date
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :return: list[ChannelCount], list of ChannelCount objects
+        """
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
+        response = await self.__make_api_request('GET', self.__url.channel_count_url() + parameters)
+        return self.__decode_page(responses.ChannelCount, response)
+
+    async def get_hourly_call_count(self, items_per_page: int = 10, page_offset: int = 0,
+                                    start_time_min: datetime = None, start_time_max: datetime = None,
+                                    tz_string: str = None):
+        """
+            Get a list of Calls placed per-hour between two specified dates
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param start_time_min: datetime, filters data after this date
+        :param start_time_max: datetime, filters data before this date
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :return: list[CallCount], list of CallCount objects
+        """
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
+        response = await self.__make_api_request('GET', self.__url.traffic_hourly_url() + parameters)
+        return self.__decode_page(responses.CallCount, response)
+
+    async def get_daily_traffic_series(self, start_time_min: datetime, start_time_max: datetime,
+                                       chunk: timedelta = timedelta(days=31), tz_string: str = None,
+                                       max_workers: int = 8):
+        """
+            Get per-day Traffic Counts over a long range as a compact array-backed series. The range is split into
+            day-aligned chunks fetched concurrently; rows repeated at chunk boundaries are kept once.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, columns inbound_minutes, outbound_minutes, inbound_count, outbound_count and
+            total_billing_cost
+        """
+        url = self.__url.traffic_count_url()
+        rows = await self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.TrafficCount, rows)
+
+    async def get_daily_channel_series(self, start_time_min: datetime, start_time_max: datetime,
+                                       chunk: timedelta = timedelta(days=31), tz_string: str = None,
+                                       max_workers: int = 8):
+        """
+            Get per-day Channel usage over a long range as a compact array-backed series, fetched like
+            get_daily_traffic_series. Resampling keeps the peak, so series.resample('week').peaks(n=5) gives the
+            busiest weeks.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, column channel_count
+        """
+        url = self.__url.channel_count_url()
+        rows = await self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.ChannelCount, rows)
+
+    async def get_hourly_call_series(self, start_time_min: datetime, start_time_max: datetime,
+                                     chunk: timedelta = timedelta(days=31), tz_string: str = None,
+                                     max_workers: int = 8):
+        """
+            Get Calls placed per hour of day over a long range as a compact array-backed series. Each chunk reports
+            calls per hour of day, so the chunks' counts are added together.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, column call_count, timestamps at the hours of 1900-01-01 like CallCount.date
+        """
+        url = self.__url.traffic_hourly_url()
+        rows = await self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.CallCount, rows, combine='sum')
+
+    async def __traffic_rows(self, url, start, end, chunk, tz_string, max_workers, items_per_page=100):
+        # Raw rows of a traffic endpoint, one paginated walk per chunk with the chunks fetched concurrently. A daily
+        # chunk shorter than items_per_page days takes a single request.
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(lower, upper):
+            rows = []
+            async with semaphore:
+                while True:
+                    parameters = builders.traffic_parameters(items_per_page, len(rows), lower, upper, tz_string)
+                    page = await self.__make_api_request('GET', url + parameters) or []
+                    rows.extend(page)
+                    if len(page) < items_per_page:
+                        return rows
+        chunks = await asyncio.gather(*(fetch(*bounds) for bounds in timeseries.chunk_ranges(start, end, chunk)))
+        return [row for rows in chunks for row in rows]
+
+    async def get_tenant_statements(self, year=None, month=None):
+        """
+            Get all Tenant Statements in a given month. Defaults to current month
+        :param year: integer, four digit year of the statement month
+        :param month: integer, single or double digit, with January corresponding to 1
+        :return: list[TenantStatement], list of TenantStatement objects
+        """
+        if year and month:
+            response = await self.__monthly(statements.TENANT, self.__url.tenant_statements_url(), year, month)
+        else:
+            parameters = builders.month_parameters(year, month)
+            response = await self.__make_api_request('GET', self.__url.tenant_statements_url() + parameters)
+        return self.__decode_page(responses.TenantStatement, response)
+
+    async def get_tenant_statement_range(self, start, end, max_workers: int = 8):
+        """
+            Get the Tenant Statements of every month in a range, fetched concurrently. With a statement cache, closed
+            months are requested once and read from disk afterwards.
+        :param start: (year, month) tuple, or a date, first month
+        :param end: (year, month) tuple, or a date, last month, included
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: dict, (year, month) to list[TenantStatement], in month order
+        """
+        month_list = statements.months(start, end)
+        url = self.__url.tenant_statements_url()
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(year, month):
+            async with semaphore:
+                return await self.__monthly(statements.TENANT, url, year, month)
+        fetched = await asyncio.gather(*(fetch(year, month) for year, month in month_list))
+        return {key: self.__decode_page(responses.TenantStatement, response)
+                for key, response in zip(month_list, fetched)}
+
+    async def get_tenant_invoices(self):
+        """
+            UNTESTED: Get all Tenant Invoices
+        :return: list[TenantInvoice], list of TenantInvoice objects
+        """
+        response = await self.__make_api_request('GET', self.__url.tenant_invoices_url())
+        return self.__decode_page(responses.TenantInvoice, response)
+
+    async def create_onetime_tenant_invoice(self, tenant_id: int, billing: responses.TenantBillingProfile):
+        """
+            UNTESTED: Create a One-Time Tenant Invoice from a Tenant Billing Profile
+        :param tenant_id: integer, ID of the Tenant for the Invoice
+        :param billing: TenantBillingProfile, a TenantBillingProfile object
+        :return: string, Stripe Invoice ID
+        """
+        data = builders.invoice_data(billing)
+        response = await self.__make_api_request('POST', self.__url.tenant_invoice_url(tenant_id), data=data)
+        return response.get('stripe_invoice_id', None)
+
+    async def void_tenant_invoice(self, tenant_id: int):
+        """
+            UNTESTED: Void an Invoice for a Tenant
+        :param tenant_id: integer, ID of the Tenant
+        :return: None
+        """
+        await self.__make_api_request('DELETE', self.__url.tenant_invoice_url(tenant_id))
+        return None
+
+    async def get_billing_products(self):
+        """
+            UNTESTED: Get a list of Tenant Billing Products
+        :return: list[TenantBillingProduct], List of TenantBillingProduct objects
+        """
+        response = await self.__make_api_request('GET', self.__url.tenant_products_url())
+        return self.__decode_page(responses.TenantBillingProduct, response)
+
+    async def get_tenants(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None,
+                          sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Get a list of Tenants
+        :param items_per_page: integer, defaults to 10 records returned per request
+        :param page_offset: integer, combines with items_per_page
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[ExtendedTenant], list of ExtendedTenant objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = await self.__make_api_request('GET', self.__url.tenants_url() + parameters)
+        return self.__decode_page(responses.ExtendedTenant, response, lazy, fields)
+
+    def iter_tenants(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                     sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Asynchronously iterate over all Tenants, prefetching the next page
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: async generator[ExtendedTenant], ExtendedTenant objects in server order
+        """
+        async def fetch_page(limit, offset):
+            return await self.get_tenants(limit, offset, query=query, search=search, sort=sort,
+                                          lazy=lazy, fields=fields)
+        return pagination.aiter_records(fetch_page, items_per_page, page_offset)
@@ -0,0 +1,256 @@
+import typing
+from dataclasses import dataclass, fields, is_dataclass
+from operator import attrgetter
+
+from . import errors, responses
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def numeric_fields(cls, prefix=''):
+    """
+        Names of the int and float fields of a totals dataclass, with nested dataclasses flattened to dotted paths,
+        e.g. phone_numbers.local
+    :param cls: dataclass type, e.g. TenantStatementTotals
+    :param prefix: string, path of cls inside the parent
+    :return: list[string]
+    """
+    hints = typing.get_type_hints(cls)
+    names = []
+    for f in fields(cls):
+        hint = hints[f.name]
+        if is_dataclass(hint):
+            names.extend(numeric_fields(hint, prefix + f.name + '.'))
+        elif hint in (int, float):
+            names.append(prefix + f.name)
+    return names
+
+
+FIELDS = numeric_fields(responses.TenantStatementTotals)
+
+
+def _reader(field_names):
+    """
+        Build a function reading the given dotted field paths from a totals object. Fields are read one attrgetter
+        per object rather than one lookup per path, which is several times faster; values come out grouped by object.
+    :return: tuple, (read(totals) returning a tuple of values, list of the field names in that order)
+    """
+    top = [name for name in field_names if '.' not in name]
+    nested = {}
+    for name in field_names:
+        if '.' in name:
+            prefix, rest = name.split('.', 1)
+            nested.setdefault(prefix, []).append(rest)
+    children = [(prefix, _reader(rest)) for prefix, rest in nested.items()]
+    order = top + [prefix + '.' + name for prefix, (_, names) in children for name in names]
+    get = attrgetter(*top) if top else None
+    single = len(top) == 1
+    empty = (None,) * len(order)
+
+    def read(totals):
+        # A missing totals or nested object reads as None, which becomes zero in the cube
+        if totals is None:
+            return empty
+        values = () if get is None else (get(totals),) if single else get(totals)
+        for prefix, (read_child, _) in children:
+            values += read_child(getattr(totals, prefix, None))
+        return values
+    return read, order
+
+
+def unit_price(product: responses.TenantInvoiceProduct):
+    """
+        Price billed per unit for a tenant invoice product, with markup as a percentage of the unit cost
+    :param product: TenantInvoiceProduct
+    :return: float
+    """
+    return (product.unit_cost or 0.0) * (1 + (product.markup or 0.0) / 100)
+
+
+@dataclass
+class MarginReport:
+    """
+        Tenant x month arrays of what tenants are billed, what their traffic cost, and the difference
+    """
+    revenue: typing.Any
+    cost: typing.Any
+    margin: typing.Any
+    # revenue / cost - 1, NaN where there was no cost
+    markup: typing.Any
+
+
+class BillingCube:
+    """
+        Dense tenant x month x field array of Tenant Statement totals, for vectorised billing rollups. Every numeric
+        field of TenantStatementTotals is a column; tenant-months without a statement are zero and marked absent in
+        present. Requires the optional numpy package.
+    """
+    def __init__(self, values, tenant_ids, months, field_names=None, present=None):
+        """
+        :param values: array of shape (tenants, months, fields)
+        :param tenant_ids: list[int], tenant id of each row
+        :param months: list[tuple], (year, month) of each column, in order
+        :param field_names: list[string], name of each field, defaults to FIELDS
+        :param present: boolean array of shape (tenants, months), which tenant-months had a statement
+        """
+        if numpy is None:
+            raise errors.ValidationError('BillingCube requires the numpy package')
+        self.values = numpy.asarray(values, dtype=float)
+        self.tenant_ids = list(tenant_ids)
+        self.months = list(months)
+        self.fields = list(field_names or FIELDS)
+        if self.values.shape != (len(self.tenant_ids), len(self.months), len(self.fields)):
+            raise errors.ValidationError('Values do not match the tenant, month and field indexes')
+        self.present = numpy.ones(self.values.shape[:2], dtype=bool) if present is None else numpy.asarray(present)
+        self.tenant_index = {tenant_id: index for index, tenant_id in enumerate(self.tenant_ids)}
+        self.month_index = {month: index for index, month in enumerate(self.months)}
+        self.field_index = {name: index for index, name in enumerate(self.fields)}
+
+    @classmethod
+    def from_statements(cls, statements, field_names=None):
+        """
+            Build a cube from Tenant Statements. Tenants and months are sorted; a month with no statements at all
+            is left out.
+        :param statements: iterable of TenantStatement, or the dict get_tenant_statement_range returns
+        :param field_names: list[string], fields to include, defaults to FIELDS
+        :return: BillingCube
+        """
+        if numpy is None:
+            raise errors.ValidationError('BillingCube requires the numpy package')
+        if isinstance(statements, dict):
+            statements = [statement for page in statements.values() for statement in page]
+        else:
+            statements = list(statements)
+        field_names = list(field_names or FIELDS)
+        unknown = set(field_names) - set(FIELDS)
+        if unknown:
+            raise errors.ValidationError('Unknown statement fields: {}'.format(', '.join(sorted(unknown))))
+
+        tenant_ids = sorted({statement.tenant.id for statement in statements})
+        months = sorted({(statement.month.year, statement.month.month) for statement in statements})
+        tenant_index = {tenant_id: index for index, tenant_id in enumerate(tenant_ids)}
+        month_index = {month: index for index, month in enumerate(months)}
+
+        values = numpy.zeros((len(tenant_ids), len(months), len(field_names)))
+        present = numpy.zeros((len(tenant_ids), len(months)), dtype=bool)
+        if statements:
+            read, order = _reader(field_names)
+            rows = [read(statement.totals) for statement in statements]
+            matrix = numpy.array(rows, dtype=float).reshape(len(statements), len(field_names))
+            matrix = matrix[:, [order.index(name) for name in field_names]]
+            tenants = numpy.fromiter((tenant_index[statement.tenant.id] for statement in statements), dtype=numpy.intp,
+                                     count=len(statements))
+            columns = numpy.fromiter((month_index[(statement.month.year, statement.month.month)]
+                                      for statement in statements), dtype=numpy.intp, count=len(statements))
+            # Several statements for one tenant-month add up
+            numpy.add.at(values, (tenants, columns), numpy.nan_to_num(matrix))
+            present[tenants, columns] = True
+        return cls(values, tenant_ids, months, field_names, present)
+
+    def __field_columns(self, field_names):
+        if field_names is None:
+            return slice(None), self.fields
+        if isinstance(field_names, str):
+            field_names = [field_names]
+        try:
+            return [self.field_index[name] for name in field_names], list(field_names)
+        except KeyError as e:
+            raise errors.ValidationError('Field {} is not in the cube'.format(e.args[0])) from None
+
+    def field(self, name):
+        """
+        :param name: string, field name
+        :return: array of shape (tenants, months)
+        """
+        columns, _ = self.__field_columns(name)
+        return self.values[:, :, columns[0]]
+
+    def tenant_totals(self, field_names=None):
+        """
+        :param field_names: list[string] or string, fields to sum, defaults to all
+        :return: array of shape (tenants, fields), summed over months
+        """
+        columns, _ = self.__field_columns(field_names)
+        return self.values[:, :, columns].sum(axis=1)
+
+    def month_totals(self, field_names=None):
+        """
+        :param field_names: list[string] or string, fields to sum, defaults to all
+        :return: array of shape (months, fields), summed over tenants
+        """
+        columns, _ = self.__field_columns(field_names)
+        return self.values[:, :, columns].sum(axis=0)
+
+    def totals(self, field_names=None):
+        """
+        :param field_names: list[string] or string, fields to sum, defaults to all
+        :return: dict, field name to the sum over every tenant and month
+        """
+        columns, names = self.__field_columns(field_names)
+        return dict(zip(names, self.values[:, :, columns].sum(axis=(0, 1)).tolist()))
+
+    def month_over_month(self, name, relative=False):
+        """
+            Change of a field from each month to the next
+        :param name: string, field name
+        :param relative: bool, return the change as a fraction of the previous month, NaN where that was zero
+        :return: array of shape (tenants, months - 1)
+        """
+        series = self.field(name)
+        delta = numpy.diff(series, axis=1)
+        if not relative:
+            return delta
+        previous = series[:, :-1]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.where(previous != 0, delta / previous, numpy.nan)
+
+    def top(self, name, n=10, month=None):
+        """
+            Tenants with the largest value of a field
+        :param name: string, field name
+        :param n: integer, number of tenants
+        :param month: (year, month) tuple, one month only, None sums every month
+        :return: list[tuple], (tenant id, value), largest first
+        """
+        series = self.field(name)
+        if month is None:
+            scores = series.sum(axis=1)
+        else:
+            if tuple(month) not in self.month_index:
+                raise errors.ValidationError('Month {} is not in the cube'.format(tuple(month)))
+            scores = series[:, self.month_index[tuple(month)]]
+        n = min(n, len(scores))
+        if n <= 0:
+            return []
+        best = numpy.argpartition(-scores, n - 1)[:n]
+        best = best[numpy.argsort(-scores[best], kind='stable')]
+        return [(self.tenant_ids[index], float(scores[index])) for index in best]
+
+    def markup(self, pricing, tenant_pricing=None, cost_field='total_cost'):
+        """
+            Compare what tenants are billed under invoice product pricing with what their traffic cost
+        :param pricing: dict, field name to the TenantInvoiceProduct billed per unit of that field, e.g.
+            'sent_sms_count' or 'phone_numbers.local'
+        :param tenant_pricing: dict, tenant id to a pricing dict overriding pricing for that tenant
+        :param cost_field: string, field holding the tenant's cost
+        :return: MarginReport
+        """
+        prices = numpy.zeros(len(self.fields))
+        for name, product in pricing.items():
+            prices[self.__field_columns(name)[0][0]] = unit_price(product)
+        prices = numpy.broadcast_to(prices, (len(self.tenant_ids), len(self.fields)))
+        if tenant_pricing:
+            prices = prices.copy()
+            for tenant_id, overrides in tenant_pricing.items():
+                if tenant_id in self.tenant_index:
+                    for name, product in overrides.items():
+                        prices[self.tenant_index[tenant_id], self.__field_columns(name)[0][0]] = unit_price(product)
+
+        revenue = numpy.einsum('tmf,tf->tm', self.values, prices)
+        cost = self.field(cost_field)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ratio = numpy.where(cost != 0, revenue / cost - 1, numpy.nan)
+        return MarginReport(revenue, cost, revenue - cost, ratio)
@@ -0,0 +1,85 @@
+from dataclasses import asdict
+
+from .decoders import SKYETEL_DATESTRING
+
+
+def page_parameters(items_per_page, page_offset, query=None, search=None, sort=None):
+    """
+        Build the query string shared by the paginated list endpoints
+    :param items_per_page: integer, records returned per request
+    :param page_offset: integer, combines with items_per_page
+    :param query: string, wildcard search on all string fields
+    :param search: dict, format 'field':'query'
+    :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+    :return: string, query string beginning with '?'
+    """
+    parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
+    if query:
+        parameters += '&filter[query]={}'.format(query)
+    if search:
+        for field in search:
+            parameters += '&filter[{}]={}'.format(field, search[field])
+    if sort:
+        parameters += '&sort={}'.format(sort[0])
+        for x in range(1, len(sort)):
+            parameters += ',{}'.format(sort[x])
+    return parameters
+
+
+def month_parameters(year=None, month=None):
+    """
+        Build the query string for the monthly statement endpoints
+    :param year: integer, four digit year of the statement month
+    :param month: integer, single or double digit, with January corresponding to 1
+    :return: string, query string beginning with '?'
+    """
+    parameters = '?'
+    if year:
+        parameters += 'year={}'.format(year)
+        if month:
+            parameters += '&'
+    if month:
+        parameters += 'month={}'.format(month)
+    return parameters
+
+
+def traffic_parameters(items_per_page, page_offset, start_time_min=None, start_time_max=None, tz_string=None):
+    """
+        Build the query string for the traffic statistics endpoints
+    :param items_per_page: integer, records returned per request
+    :param page_offset: integer, combines with items_per_page
+    :param start_time_min: datetime, filters data after this date
+    :param start_time_max: datetime, filters data before this date
+    :param tz_string: string, standard Time Zone string (ex. America/New_York)
+    :return: string, query string beginning with '?'
+    """
+    parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
+    if start_time_min:
+        parameters += '&start_time_min={}'.format(start_time_min.strftime(SKYETEL_DATESTRING))
+    if start_time_max:
+        parameters += '&start_time_max={}'.format(start_time_max.strftime(SKYETEL_DATESTRING))
+    if tz_string:
+        parameters += '&tz={}'.format(tz_string)
+    return parameters
+
+
+def endpoint_data(ip, priority, description, endpoint_group_id, endpoint_group_name, port, transport):
+    return {'ip': ip, 'port': port, 'transport': transport, 'priority': priority, 'description': description,
+            'endpoint_group_id': endpoint_group_id, 'endpoint_group_name': endpoint_group_name}
+
+
+def e911_data(caller_name, address1, address2, community, state, postal_code):
+    return {'caller_name': caller_name, 'address1': address1, 'address2': address2, 'community': community,
+            'state': state, 'postal_code': postal_code}
+
+
+def order_data(number_list):
+    data = {}
+    for num in number_list:
+        data['numbers[{}][mou]'.format(num.number)] = num.mou
+    return data
+
+
+def invoice_data(billing):
+    # asdict recurses into the nested TenantInvoiceProduct objects
+    return asdict(billing)
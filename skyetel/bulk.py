@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field, fields
+from typing import Dict
+
+from . import errors, responses
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+# PhoneNumberUpdate fields whose current value lives under a different PhoneNumber field
+_NESTED_IDS = {
+    'endpoint_group_id': 'endpoint_group',
+    'tenant_id': 'tenant',
+    'localpresence_id': 'localpresence',
+}
+
+# PhoneNumber fields needed to diff any PhoneNumberUpdate, used as a projection when fetching current state
+CURRENT_FIELDS = ['id'] + [_NESTED_IDS.get(f.name, f.name) for f in fields(responses.PhoneNumberUpdate)]
+
+
+@dataclass
+class UpdateReport:
+    phonenumber_id: int
+    status: str
+    changes: Dict = field(default_factory=dict)
+    result: responses.PhoneNumberUpdate = None
+    error: errors.Error = None
+
+
+def _current_value(phonenumber, name):
+    if name not in _NESTED_IDS:
+        return getattr(phonenumber, name)
+    nested = getattr(phonenumber, _NESTED_IDS[name])
+    if isinstance(nested, dict):
+        return nested.get('id')
+    return getattr(nested, 'id', nested)
+
+
+def _same(value, current):
+    if value == current:
+        return True
+    # Numbers are sent as strings and decoded as integers, balances the other way around
+    if value is None or current is None or isinstance(value, bool) or isinstance(current, bool):
+        return False
+    try:
+        return float(value) == float(current)
+    except (TypeError, ValueError):
+        return False
+
+
+def pending_changes(update: responses.PhoneNumberUpdate, phonenumber=None):
+    """
+        Get the fields of an update that differ from a Phone Number's current state
+    :param update: PhoneNumberUpdate, fields left as None are not changed
+    :param phonenumber: PhoneNumber or LazyRecord view of one, None treats every set field as a change
+    :return: dict, field name to new value
+    """
+    changes = update.as_dict()
+    if phonenumber is None:
+        return changes
+    return {name: value for name, value in changes.items() if not _same(value, _current_value(phonenumber, name))}
+
+
+def apply(update_phonenumber, phonenumber_id, update, phonenumber=None, fetch_current=None):
+    """
+        Send the changed fields of one update, or nothing if no field would change
+    :param update_phonenumber: callable, Skyetel.update_phonenumber
+    :param phonenumber_id: integer, assigned Id for the Phone Number
+    :param update: PhoneNumberUpdate, desired settings
+    :param phonenumber: PhoneNumber, current state, None sends every set field
+    :param fetch_current: callable, fetch_current(phonenumber_id) returning the current PhoneNumber or None, used
+        when phonenumber is None
+    :return: UpdateReport
+    """
+    if phonenumber is None and fetch_current is not None:
+        try:
+            phonenumber = fetch_current(phonenumber_id)
+        except errors.Error as e:
+            return UpdateReport(phonenumber_id, FAILED, error=e)
+    changes = pending_changes(update, phonenumber)
+    if not changes:
+        return UpdateReport(phonenumber_id, UNCHANGED)
+    try:
+        result = update_phonenumber(phonenumber_id, responses.PhoneNumberUpdate(**changes))
+    except errors.Error as e:
+        return UpdateReport(phonenumber_id, FAILED, changes, error=e)
+    return UpdateReport(phonenumber_id, UPDATED, changes, result)
+
+
+async def apply_async(update_phonenumber, phonenumber_id, update, phonenumber=None, fetch_current=None):
+    """
+        apply() for AsyncSkyetel.update_phonenumber, with fetch_current a coroutine function
+    """
+    if phonenumber is None and fetch_current is not None:
+        try:
+            phonenumber = await fetch_current(phonenumber_id)
+        except errors.Error as e:
+            return UpdateReport(phonenumber_id, FAILED, error=e)
+    changes = pending_changes(update, phonenumber)
+    if not changes:
+        return UpdateReport(phonenumber_id, UNCHANGED)
+    try:
+        result = await update_phonenumber(phonenumber_id, responses.PhoneNumberUpdate(**changes))
+    except errors.Error as e:
+        return UpdateReport(phonenumber_id, FAILED, changes, error=e)
+    return UpdateReport(phonenumber_id, UPDATED, changes, result)
+
+
+def summarize(reports):
+    """
+        Count reports by status
+    :param reports: list[UpdateReport]
+    :return: dict, status to count
+    """
+    counts = {UPDATED: 0, UNCHANGED: 0, FAILED: 0}
+    for report in reports:
+        counts[report.status] += 1
+    return counts
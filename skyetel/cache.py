@@ -0,0 +1,325 @@
+import contextvars
+import queue
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+from . import statements
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def closed_month_ttl(url):
+    """
+        TTL for monthly statements: a closed month never changes again, the current one and its grace period can
+    :param url: string, request URL with optional year and month parameters
+    :return: integer, seconds
+    """
+    query = parse_qs(urlsplit(url).query)
+    try:
+        year, month = int(query['year'][0]), int(query['month'][0])
+    except (KeyError, ValueError):
+        return 0
+    return 30 * DAY if statements.is_closed(year, month) else 0
+
+
+# Route patterns as produced by URLs.pattern; values are seconds or callable(url) returning seconds
+DEFAULT_TTLS = {
+    '/phonenumbers/order/rate_centers': DAY,
+    '/tenants/billing-products': HOUR,
+    '/stats/phonenumbers/local': 5 * MINUTE,
+    '/stats/phonenumbers/toll-free': 5 * MINUTE,
+    '/endpoints': MINUTE,
+    '/stats/org/statement': closed_month_ttl,
+    '/stats/org/tenant-statements': closed_month_ttl,
+}
+
+# Writes under a route also invalidate these derived read routes
+RELATED_ROUTES = {
+    '/phonenumbers': ('/stats/phonenumbers',),
+    '/tenants': ('/stats/org/tenant-statements',),
+}
+
+
+class CacheEntry:
+    __slots__ = ('pattern', 'value', 'stored', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, pattern, value, ttl, etag=None, last_modified=None):
+        self.pattern = pattern
+        self.value = value
+        self.stored = time.monotonic()
+        self.expires = self.stored + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires
+
+    @property
+    def age(self):
+        return time.monotonic() - self.stored
+
+    @property
+    def staleness(self):
+        return time.monotonic() - self.expires
+
+    def validators(self):
+        """
+            Conditional request headers for revalidating this entry
+        :return: dict, empty if the server sent no validators
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class Staleness:
+    """
+        Yielded by a client's serve_stale(); records whether any response read inside the block was served stale
+    """
+    __slots__ = ('max_stale', 'stale', 'age')
+
+    def __init__(self, max_stale=None):
+        self.max_stale = max_stale
+        self.stale = False
+        self.age = 0.0
+
+    def __repr__(self):
+        return 'Staleness(stale={}, age={:.1f})'.format(self.stale, self.age)
+
+    def served(self, entry):
+        self.stale = True
+        self.age = max(self.age, entry.age)
+
+
+# Staleness of the serve_stale() block the current thread or task is in, None outside one
+serving_stale = contextvars.ContextVar('serving_stale', default=None)
+
+
+class Refresher:
+    """
+        Single daemon thread running background refreshes one at a time, so serving stale data never stampedes the
+        rate budget. A URL already waiting for refresh is not queued twice.
+    """
+    def __init__(self):
+        self.__queue = queue.Queue()
+        self.__pending = set()
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.refreshes = 0
+        self.errors = 0
+
+    def submit(self, key, refresh):
+        """
+            Queue a refresh unless one for the same key is already waiting
+        :param key: hashable, identifies the request, e.g. (account, URL)
+        :param refresh: callable, refresh() fetching the URL and storing the result
+        :return: bool, True if the refresh was queued
+        """
+        with self.__lock:
+            if key in self.__pending:
+                return False
+            self.__pending.add(key)
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__run, name='skyetel-refresher', daemon=True)
+                self.__thread.start()
+        self.__queue.put((key, refresh))
+        return True
+
+    def join(self):
+        """
+            Wait until every queued refresh has run
+        :return: None
+        """
+        self.__queue.join()
+
+    def __run(self):
+        while True:
+            key, refresh = self.__queue.get()
+            with self.__lock:
+                self.__pending.discard(key)
+            try:
+                refresh()
+                self.record()
+            except Exception:
+                # The stale entry stays in place and the next stale read tries again
+                self.record(failed=True)
+            finally:
+                self.__queue.task_done()
+
+    def record(self, failed=False):
+        """
+            Count a finished refresh, including ones run elsewhere such as on an asyncio event loop
+        :param failed: bool, the refresh raised
+        :return: None
+        """
+        with self.__lock:
+            if failed:
+                self.errors += 1
+            else:
+                self.refreshes += 1
+
+
+class ResponseCache:
+    """
+        LRU cache of decoded JSON bodies for GET requests, with a TTL per route pattern. Entries past their TTL are
+        kept for conditional revalidation when the server supplied an ETag or Last-Modified header, and for up to
+        max_stale seconds for callers that opt in to stale-while-revalidate. Responses read inside serve_stale() are
+        kept even on routes without a TTL, so the block can fall back on them later. Entries are kept per account,
+        so clients of different SIDs can share a cache without seeing each other's data.
+    """
+    def __init__(self, ttls=None, max_entries=1024, default_ttl=0, max_stale=0):
+        """
+        :param ttls: dict, route pattern to seconds or callable(url), replacing DEFAULT_TTLS
+        :param max_entries: integer, entries kept before the least recently used is evicted
+        :param default_ttl: integer, seconds for routes missing from ttls
+        :param max_stale: integer, seconds past its TTL an entry may be served inside serve_stale(), 0 disables
+        """
+        self.__ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.__max_entries = max_entries
+        self.__default_ttl = default_ttl
+        self.__max_stale = max_stale
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__refresher = Refresher()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    @property
+    def refresher(self):
+        return self.__refresher
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def ttl(self, pattern, url):
+        ttl = self.__ttls.get(pattern, self.__default_ttl)
+        return ttl(url) if callable(ttl) else ttl
+
+    def get(self, url, account=None):
+        """
+            Look up an entry, counting a hit if it is fresh and a miss if there is none. An expired entry is counted
+            by the stale() check that follows, as a stale hit or a miss.
+        :param url: string, request URL
+        :param account: string, API SID the request is made with
+        :return: CacheEntry, or None; the entry may be stale
+        """
+        key = (account, url)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            return entry
+
+    def stale(self, entry, staleness):
+        """
+            Check whether an expired entry may be served to a serve_stale() block, counting a stale hit if so and a
+            miss otherwise
+        :param entry: CacheEntry, or None
+        :param staleness: Staleness, the caller's serve_stale() status, None outside serve_stale()
+        :return: bool
+        """
+        if entry is None or entry.fresh:
+            return False
+        servable = staleness is not None and entry.staleness <= self.__allowed(staleness)
+        with self.__lock:
+            if servable:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+        if servable:
+            staleness.served(entry)
+        return servable
+
+    def __allowed(self, staleness):
+        return self.__max_stale if staleness.max_stale is None else staleness.max_stale
+
+    def store(self, url, pattern, value, headers=None, account=None):
+        """
+            Cache a response body if its route has a TTL, the server sent validators or stale serving is enabled,
+            either on the cache or by a serve_stale() block the request ran in. An entry already cached for the URL
+            is always replaced, so background refreshes land.
+        :param url: string, request URL
+        :param pattern: string, route pattern of the URL
+        :param value: decoded JSON body
+        :param headers: mapping, response headers
+        :param account: string, API SID the request was made with
+        :return: None
+        """
+        key = (account, url)
+        headers = headers or {}
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        ttl = self.ttl(pattern, url)
+        staleness = serving_stale.get()
+        keep = self.__max_stale or (staleness is not None and self.__allowed(staleness)) or key in self.__entries
+        if ttl <= 0 and not (etag or last_modified or keep):
+            return
+        with self.__lock:
+            self.__entries[key] = CacheEntry(pattern, value, ttl, etag, last_modified)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def revalidated(self, url, entry, account=None):
+        """
+            Restart an entry's TTL after the server answered 304 Not Modified
+        :param url: string, request URL
+        :param entry: CacheEntry, the entry that was revalidated
+        :param account: string, API SID the request was made with
+        :return: decoded JSON body of the entry
+        """
+        with self.__lock:
+            self.revalidations += 1
+            self.__entries[(account, url)] = CacheEntry(entry.pattern, entry.value, self.ttl(entry.pattern, url),
+                                                        entry.etag, entry.last_modified)
+        return entry.value
+
+    def invalidate(self, prefix):
+        """
+            Drop every entry whose route pattern starts with prefix
+        :param prefix: string, route pattern prefix such as /endpoints
+        :return: None
+        """
+        with self.__lock:
+            for key in [key for key, entry in self.__entries.items() if entry.pattern.startswith(prefix)]:
+                del self.__entries[key]
+                self.invalidations += 1
+
+    def invalidate_write(self, pattern):
+        """
+            Drop the entries a POST, PATCH or DELETE on a route may have changed
+        :param pattern: string, route pattern of the write
+        :return: None
+        """
+        root = '/' + pattern.strip('/').split('/', 1)[0]
+        self.invalidate(root)
+        for related in RELATED_ROUTES.get(root, ()):
+            self.invalidate(related)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """
+        :return: dict, entry count and hit, miss, stale, revalidation, invalidation and refresh counters
+        """
+        return {'entries': len(self.__entries), 'hits': self.hits, 'misses': self.misses,
+                'stale_hits': self.stale_hits, 'revalidations': self.revalidations,
+                'invalidations': self.invalidations, 'refreshes': self.__refresher.refreshes,
+                'refresh_errors': self.__refresher.errors}
@@ -0,0 +1,120 @@
+import threading
+import typing
+from collections.abc import Sequence
+from dataclasses import fields, is_dataclass, make_dataclass, field, MISSING
+
+_twins = {}
+_originals = {}
+_lock = threading.RLock()
+
+
+def _twin_hint(hint):
+    if is_dataclass(hint):
+        return slotted(hint)
+    if typing.get_origin(hint) is list:
+        args = typing.get_args(hint)
+        if args and is_dataclass(args[0]):
+            return typing.List[slotted(args[0])]
+    return hint
+
+
+def _restore(cls, values):
+    return slotted(cls)(*values)
+
+
+def _reduce(self):
+    # Twins share their original's name, so pickle has to rebuild them through slotted()
+    return _restore, (original(type(self)), tuple(getattr(self, f.name) for f in fields(self)))
+
+
+def _with_slots(cls):
+    # What dataclass(slots=True) does on Python 3.10 and newer: rebuild the class with __slots__ for its fields,
+    # dropping the class-level defaults that would shadow the slot descriptors
+    namespace = dict(cls.__dict__)
+    names = tuple(f.name for f in fields(cls))
+    namespace['__slots__'] = names
+    for name in names + ('__dict__', '__weakref__'):
+        namespace.pop(name, None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
+def slotted(cls):
+    """
+        Get the __slots__ twin of a responses dataclass. The twin has the same name, fields, frozenness and repr, but
+        no per-instance __dict__; nested dataclass fields refer to their own twins. Twins are created once and cached.
+    :param cls: dataclass type from skyetel.responses
+    :return: dataclass type
+    """
+    if cls in _originals:
+        return cls
+    twin = _twins.get(cls)
+    if twin is not None:
+        return twin
+
+    with _lock:
+        twin = _twins.get(cls)
+        if twin is None:
+            hints = typing.get_type_hints(cls)
+            spec = []
+            for f in fields(cls):
+                if f.default is not MISSING:
+                    spec.append((f.name, _twin_hint(hints[f.name]), field(default=f.default)))
+                else:
+                    spec.append((f.name, _twin_hint(hints[f.name])))
+            frozen = cls.__dataclass_params__.frozen
+            twin = _with_slots(make_dataclass(cls.__name__, spec, frozen=frozen,
+                                              namespace={'__module__': cls.__module__, '__doc__': cls.__doc__,
+                                                         '__qualname__': cls.__qualname__, '__reduce__': _reduce}))
+            _originals[twin] = cls
+            _twins[cls] = twin
+    return twin
+
+
+def original(cls):
+    """
+        Get the responses dataclass a twin was made from
+    :param cls: dataclass type, a twin from slotted() or a responses dataclass
+    :return: dataclass type from skyetel.responses
+    """
+    return _originals.get(cls, cls)
+
+
+class Records(Sequence):
+    """
+        Immutable sequence of compact records, returned by list methods in compact mode
+    """
+    __slots__ = ('__rows',)
+
+    def __init__(self, rows):
+        self.__rows = tuple(rows)
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Records(self.__rows[index])
+        return self.__rows[index]
+
+    def __iter__(self):
+        return iter(self.__rows)
+
+    def __eq__(self, other):
+        if isinstance(other, Records):
+            return self.__rows == other.__rows
+        if isinstance(other, (list, tuple)):
+            return self.__rows == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return 'Records({!r})'.format(list(self.__rows))
+
+    def column(self, name):
+        """
+            Get one field of every record
+        :param name: string, field name
+        :return: list, values in record order
+        """
+        return [getattr(row, name) for row in self.__rows]
@@ -0,0 +1,268 @@
+import typing
+from dataclasses import fields, is_dataclass, MISSING
+from datetime import datetime
+
+from . import errors, responses, interning, compact
+
+SKYETEL_DATESTRING = '%Y-%m-%dT%H:%M:%S+00:00'
+SKYETEL_TIMESTRING = SKYETEL_DATESTRING[9:]
+
+
+def parse_datetime(value):
+    """
+        Parse a SKYETEL_DATESTRING timestamp. The fixed UTC layout is handed to fromisoformat, which is several times
+        faster than strptime; anything else falls back to strptime.
+    :param value: string, timestamp in SKYETEL_DATESTRING format
+    :return: datetime, naive datetime in UTC
+    """
+    if not value or isinstance(value, datetime):
+        return value
+    if len(value) == 25 and value[10] == 'T' and value.endswith('+00:00'):
+        return datetime.fromisoformat(value[:19])
+    return datetime.strptime(value, SKYETEL_DATESTRING)
+
+
+def parse_time(value):
+    """
+        Parse a SKYETEL_TIMESTRING time of day
+    :param value: string, time in SKYETEL_TIMESTRING format
+    :return: datetime, time of day on 1900-01-01
+    """
+    if not value or isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, SKYETEL_TIMESTRING)
+
+
+def _to_int(value):
+    # Integers may arrive as numeric strings; a fractional one such as "12.5" is kept as a float rather than cut
+    if value.__class__ is not str or not value:
+        return value
+    if value.lstrip('-').isdigit():
+        return int(value)
+    try:
+        number = float(value)
+    except ValueError:
+        raise errors.APIError('Expected an integer, got {!r}'.format(value)) from None
+    return int(number) if number.is_integer() else number
+
+
+def _to_float(value):
+    if value is None or value == '' or isinstance(value, (float, bool)):
+        return value
+    return float(value)
+
+
+# Wire names that differ from the dataclass field, tried in order. Tuples are paths into nested objects.
+_SOURCES = {
+    responses.Organization: {'org_id': ('org_id', 'id'), 'org_name': ('org_name', 'name')},
+    responses.BillingStatement: {'statement': (('statement', 'totals'), 'statement')},
+    responses.TenantStatement: {'totals': ('totals', ('fields', 'totals'))},
+}
+
+# Fields whose wire format does not follow their type hint. None leaves the value untouched.
+_CONVERTERS = {
+    responses.CallCount: {'date': parse_time},
+    responses.TenantInvoice: {'scheduled_date': parse_time},
+    responses.E911Address: {'postal_code': None},
+}
+
+_plans = {}
+
+# Default of fields without one in their dataclass: a row missing such a field is malformed
+_REQUIRED = object()
+
+
+def _missing(name, cls=None):
+    raise errors.APIError('{} response is missing the {} field'.format(cls.__name__ if cls else 'A', name))
+
+
+def _lookup(row, sources, default):
+    for source in sources:
+        if isinstance(source, tuple):
+            value = row
+            for key in source:
+                if not isinstance(value, dict) or key not in value:
+                    break
+                value = value[key]
+            else:
+                return value
+        elif source in row:
+            return row[source]
+    return default
+
+
+def _nested_list(decode_item):
+    def convert(value):
+        return [decode_item(item) for item in value]
+    return convert
+
+
+def _interned(cls, decode_item, interner):
+    def convert(value):
+        if value.__class__ is not dict:
+            return decode_item(value)
+        return interner.intern(cls, value, decode_item)
+    return convert
+
+
+def _converter(hint, interner):
+    if hint is datetime:
+        return parse_datetime
+    if hint is int:
+        return _to_int
+    if hint is float:
+        return _to_float
+    if is_dataclass(hint):
+        if interner is not None and compact.original(hint) in interning.INTERNED:
+            return _interned(hint, plan(hint), interner)
+        return plan(hint, interner)
+    if typing.get_origin(hint) is list:
+        args = typing.get_args(hint)
+        if args and is_dataclass(args[0]):
+            return _nested_list(plan(args[0], interner))
+        # Copied, the response may be shared with the cache and with coalesced callers
+        return list
+    return None
+
+
+def field_specs(cls, interner=None):
+    """
+        Describe how each field of a responses dataclass is read from the wire
+    :param cls: dataclass type from skyetel.responses
+    :param interner: Interner, shares repeated nested objects between rows, None builds every object
+    :return: list[tuple], (name, sources, convert, default) per field, where sources is None when the wire key is the
+        field name, convert is None when the value is used as-is, and a row missing a field without a default fails
+        with APIError
+    """
+    hints = typing.get_type_hints(cls)
+    sources = _SOURCES.get(compact.original(cls), {})
+    overrides = _CONVERTERS.get(compact.original(cls), {})
+    specs = []
+    for f in fields(cls):
+        convert = overrides[f.name] if f.name in overrides else _converter(hints[f.name], interner)
+        if f.default is not MISSING:
+            default = f.default
+        else:
+            default = None if f.default_factory is not MISSING else _REQUIRED
+        specs.append((f.name, sources.get(f.name), convert, default))
+    return specs
+
+
+def field_getter(spec):
+    """
+        Build a function reading one field from a raw JSON object, with the same conversions as the compiled plan
+    :param spec: tuple, one entry of field_specs()
+    :return: callable, getter(row) returning the converted value
+    """
+    name, sources, convert, default = spec
+
+    def getter(row):
+        value = row.get(name, default) if sources is None else _lookup(row, sources, default)
+        if value is _REQUIRED:
+            _missing(name)
+        if convert is None:
+            return value
+        if convert is _to_int:
+            return _to_int(value) if value.__class__ is str else value
+        if convert is _to_float:
+            return _to_float(value)
+        return convert(value) if value else value
+    return getter
+
+
+def _compile(cls, interner):
+    """
+        Generate a decode function specialised for cls, in the same way dataclasses generates __init__. Every field
+        becomes one inline expression, so the common cases (values already of the right type) cost no function call.
+    """
+    namespace = {'cls': cls, 'new': object.__new__, 'setattr': object.__setattr__, 'lookup': _lookup,
+                 'to_int': _to_int, 'to_float': _to_float, 'R': _REQUIRED, 'missing': _missing}
+
+    items = []
+    for index, (name, sources, convert, default) in enumerate(field_specs(cls, interner)):
+        namespace['d{}'.format(index)] = default
+        if sources is not None:
+            namespace['s{}'.format(index)] = sources
+            value = 'lookup(row, s{0}, d{0})'.format(index)
+        else:
+            value = 'get({!r}, d{})'.format(name, index)
+        if default is _REQUIRED:
+            value = '(m if (m := {}) is not R else missing({!r}, cls))'.format(value, name)
+
+        if convert is None:
+            expression = value
+        elif convert is _to_int:
+            expression = 'to_int(v) if (v := {}).__class__ is str else v'.format(value)
+        elif convert is _to_float:
+            expression = 'v if (v := {}) is None or v.__class__ is float else to_float(v)'.format(value)
+        else:
+            # Dates and nested objects leave empty values untouched
+            namespace['c{}'.format(index)] = convert
+            expression = 'c{}(v) if (v := {}) else v'.format(index, value)
+        items.append((name, expression))
+
+    lines = [
+        'def decode(row):',
+        '    if row is None or row.__class__ is cls:',
+        '        return row',
+        '    get = row.get',
+        '    obj = new(cls)',
+    ]
+    if '__slots__' in cls.__dict__:
+        lines.extend('    setattr(obj, {!r}, {})'.format(name, expression) for name, expression in items)
+    else:
+        # Frozen dataclasses assign every field through object.__setattr__ in __init__; installing the finished
+        # __dict__ in one step is equivalent and much cheaper
+        lines.append("    setattr(obj, '__dict__', {")
+        lines.extend('        {!r}: ({}),'.format(name, expression) for name, expression in items)
+        lines.append('    })')
+    lines.append('    return obj')
+    source = '\n'.join(lines)
+    exec(compile(source, '<decoder {}>'.format(cls.__qualname__), 'exec'), namespace)
+    return namespace['decode']
+
+
+def plan(cls, interner=None):
+    """
+        Get the compiled decoder for a responses dataclass. Plans are built once from the type hints and cached.
+    :param cls: dataclass type from skyetel.responses
+    :param interner: Interner, shares repeated nested objects between rows, None builds every object
+    :return: callable, decode(row) returning an instance of cls
+    """
+    key = (cls, interner)
+    decode = _plans.get(key)
+    if decode is None:
+        decode = _plans.setdefault(key, _compile(cls, interner))
+    return decode
+
+
+def decode(cls, response, interner=None, compact_records=False):
+    """
+        Decode a single JSON object into a responses dataclass
+    :param cls: dataclass type from skyetel.responses
+    :param response: dict, decoded JSON body
+    :param interner: Interner, shares repeated nested objects between rows, None builds every object
+    :param compact_records: bool, build the __slots__ twin of cls instead
+    :return: instance of cls, or the response unchanged if it is empty
+    """
+    if not response:
+        return response
+    if compact_records:
+        cls = compact.slotted(cls)
+    return plan(cls, interner)(response)
+
+
+def decode_page(cls, response, interner=None, compact_records=False):
+    """
+        Decode a JSON array into a list of responses dataclasses in one pass
+    :param cls: dataclass type from skyetel.responses
+    :param response: list[dict], decoded JSON body
+    :param interner: Interner, shares repeated nested objects between rows, None builds every object
+    :param compact_records: bool, build __slots__ twins of cls and return them as compact.Records
+    :return: list of cls, or the response unchanged if it is empty
+    """
+    if not response:
+        return response
+    if compact_records:
+        return compact.Records(map(plan(compact.slotted(cls), interner), response))
+    return list(map(plan(cls, interner), response))
@@ -0,0 +1,176 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import errors, responses
+
+DOWNLOADED = 'downloaded'
+RESUMED = 'resumed'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+@dataclass
+class DownloadReport:
+    recording_id: int
+    path: str
+    status: str
+    bytes: int = 0
+    error: Exception = None
+
+
+def _recording_id(recording):
+    return recording.id if isinstance(recording, responses.AudioRecording) else recording
+
+
+class RecordingDownloader:
+    """
+        Downloads call recording audio files to a directory. Download URLs are resolved through the client, and so
+        within its rate budget; the files themselves are streamed in fixed-size chunks over a separate pooled
+        session, so memory use does not depend on file size. An interrupted file is left as a .part file and resumed
+        with an HTTP Range request on the next run, and files already on disk are skipped without any request.
+    """
+    def __init__(self, client, directory, max_workers=4, chunk_size=64 * 1024, timeout=(10, 60),
+                 name_template='{id}'):
+        """
+        :param client: Skyetel, or any object with get_audio_recording_url(recording_id); AsyncSkyetel for adownload()
+        :param directory: string, destination directory, created if missing
+        :param max_workers: integer, concurrent downloads
+        :param chunk_size: integer, bytes read and written at a time
+        :param timeout: float or (connect, read) tuple, seconds per file request
+        :param name_template: string, file name for a recording, formatted with id
+        """
+        self.__client = client
+        self.__directory = directory
+        self.__max_workers = max_workers
+        self.__chunk_size = chunk_size
+        self.__timeout = timeout
+        self.__name_template = name_template
+
+        # Download URLs point at file storage, not the API, so the API credentials are never sent there
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+
+    def path(self, recording_id):
+        return os.path.join(self.__directory, self.__name_template.format(id=recording_id))
+
+    def download(self, recordings):
+        """
+            Download recordings concurrently. A recording listed twice is downloaded once, so two workers never
+            write the same partial file.
+        :param recordings: iterable of AudioRecording or integer recording ids; ids cannot be size-verified
+        :return: list[DownloadReport], one per recording in input order, repeats sharing one report
+        """
+        recordings = list(recordings)
+        unique = self.__unique(recordings)
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            reports = dict(zip(unique, executor.map(self.download_one, unique.values())))
+        return [reports[_recording_id(recording)] for recording in recordings]
+
+    async def adownload(self, recordings):
+        """
+            Download recordings concurrently from an event loop, for a client whose get_audio_recording_url is a
+            coroutine. URLs are resolved on the loop and files are written by worker threads, so the loop never
+            blocks on file storage or disk.
+        :param recordings: iterable of AudioRecording or integer recording ids; ids cannot be size-verified
+        :return: list[DownloadReport], one per recording in input order, repeats sharing one report
+        """
+        recordings = list(recordings)
+        unique = self.__unique(recordings)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.__max_workers)
+        executor = ThreadPoolExecutor(max_workers=self.__max_workers)
+
+        async def download_one(recording):
+            async with semaphore:
+                report = self.__on_disk(recording)
+                if report is not None:
+                    return report
+                try:
+                    # '' rather than None, so a missing URL is reported instead of resolved again
+                    url = await self.__client.get_audio_recording_url(_recording_id(recording)) or ''
+                except errors.Error as e:
+                    return DownloadReport(_recording_id(recording), self.path(_recording_id(recording)), FAILED,
+                                          error=e)
+                return await loop.run_in_executor(executor, self.download_one, recording, url)
+
+        with executor:
+            reports = dict(zip(unique, await asyncio.gather(*map(download_one, unique.values()))))
+        return [reports[_recording_id(recording)] for recording in recordings]
+
+    def __unique(self, recordings):
+        unique = {}
+        for recording in recordings:
+            unique.setdefault(_recording_id(recording), recording)
+        os.makedirs(self.__directory, exist_ok=True)
+        return unique
+
+    def __on_disk(self, recording):
+        size = recording.size if isinstance(recording, responses.AudioRecording) else None
+        path = self.path(_recording_id(recording))
+        if os.path.exists(path) and (size is None or os.path.getsize(path) == size):
+            return DownloadReport(_recording_id(recording), path, SKIPPED, os.path.getsize(path))
+        return None
+
+    def download_one(self, recording, url=None):
+        """
+            Download one recording unless it is already on disk
+        :param recording: AudioRecording or integer recording id
+        :param url: string, download URL already resolved, looked up through the client if None
+        :return: DownloadReport
+        """
+        report = self.__on_disk(recording)
+        if report is not None:
+            return report
+        recording_id = _recording_id(recording)
+        size = recording.size if isinstance(recording, responses.AudioRecording) else None
+        path = self.path(recording_id)
+
+        try:
+            if url is None:
+                url = self.__client.get_audio_recording_url(recording_id)
+            if not url:
+                raise errors.APIError('No download URL for recording {}'.format(recording_id))
+            status, written = self.__fetch(url, path + '.part', size)
+            os.replace(path + '.part', path)
+        except (errors.Error, requests.RequestException, OSError) as e:
+            return DownloadReport(recording_id, path, FAILED, error=e)
+        return DownloadReport(recording_id, path, status, written)
+
+    def __fetch(self, url, partial, size):
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if size is not None and offset > size:
+            offset = 0
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else {}
+
+        with self.__session.get(url, headers=headers, stream=True, timeout=self.__timeout) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left past the offset: the previous run wrote the whole file but stopped before renaming
+                total = offset
+                status = RESUMED
+            else:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # The server ignored the Range header and is sending the whole file
+                    offset = 0
+                status = RESUMED if offset else DOWNLOADED
+                total = offset
+                with open(partial, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(self.__chunk_size):
+                        f.write(chunk)
+                        total += len(chunk)
+
+        if size is not None and total != size:
+            if total > size:
+                os.remove(partial)
+            raise errors.ValidationError('Recording is {} bytes, expected {}'.format(total, size))
+        return status, total
+
+    def close(self):
+        self.__session.close()
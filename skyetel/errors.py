@@ -12,3 +12,11 @@ class APIError(Error):
 
 class ValidationError(Error):
     pass
+
+
+class RateLimited(Error):
+    pass
+
+
+class OffsetShift(Error):
+    pass
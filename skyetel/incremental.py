@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from . import errors, responses
+
+
+@dataclass
+class Checkpoint:
+    last_id: int = None
+    last_time: datetime = None
+    # Id to time of the rows already delivered inside the overlap window, so re-read rows are not delivered twice
+    seen: Dict[int, datetime] = field(default_factory=dict)
+    # Ids of delivered rows that had no time, which no cutoff can ever exclude
+    untimed: List[int] = field(default_factory=list)
+
+    def as_dict(self):
+        return {'last_id': self.last_id, 'last_time': self.last_time.isoformat() if self.last_time else None,
+                'seen': {str(key): value.isoformat() for key, value in self.seen.items()}, 'untimed': self.untimed}
+
+    @classmethod
+    def from_dict(cls, data):
+        last_time = data.get('last_time')
+        return cls(data.get('last_id'), datetime.fromisoformat(last_time) if last_time else None,
+                   {int(key): datetime.fromisoformat(value) for key, value in data.get('seen', {}).items()},
+                   list(data.get('untimed', [])))
+
+
+class CheckpointStore:
+    """
+        Base class for checkpoint persistence. Subclasses implement load() and save(); both receive a name so one
+        store can hold checkpoints for several feeds.
+    """
+    def load(self, name):
+        """
+        :param name: string, feed name
+        :return: Checkpoint, or None if the feed has never been synced
+        """
+        raise NotImplementedError
+
+    def save(self, name, checkpoint):
+        """
+        :param name: string, feed name
+        :param checkpoint: Checkpoint
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self.__checkpoints = {}
+
+    def load(self, name):
+        data = self.__checkpoints.get(name)
+        return None if data is None else Checkpoint.from_dict(data)
+
+    def save(self, name, checkpoint):
+        self.__checkpoints[name] = checkpoint.as_dict()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+        Checkpoints in a JSON file, replaced atomically on every save so a crash never leaves a partial file
+    """
+    def __init__(self, path):
+        self.__path = path
+        self.__lock = threading.Lock()
+
+    def __read(self):
+        try:
+            with open(self.__path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, name):
+        data = self.__read().get(name)
+        return None if data is None else Checkpoint.from_dict(data)
+
+    def save(self, name, checkpoint):
+        with self.__lock:
+            checkpoints = self.__read()
+            checkpoints[name] = checkpoint.as_dict()
+            temporary = self.__path + '.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(checkpoints, f)
+            os.replace(temporary, self.__path)
+
+
+class SMSReceiptSync:
+    """
+        Delivers each received SMS/MMS message once across polls. Receipts are read newest first and reading stops at
+        the checkpoint, so a poll with few new messages costs one or two requests. Rows up to overlap older than the
+        checkpoint are re-read to catch late arrivals and deduplicated by id. Rows without a time are delivered once,
+        after the timed ones, and remembered by id without moving the checkpoint.
+    """
+    SORT = ['-time', '-id']
+
+    def __init__(self, store: CheckpointStore, name='sms_receipts', overlap=timedelta(minutes=10),
+                 items_per_page=100, since: datetime = None):
+        """
+        :param store: CheckpointStore, where the checkpoint is kept between polls
+        :param name: string, checkpoint name in the store
+        :param overlap: timedelta, how far before the checkpoint late-arriving rows are looked for
+        :param items_per_page: integer, records fetched per request
+        :param since: datetime, where the first poll starts, None reads the whole history
+        """
+        if overlap < timedelta(0):
+            raise errors.ValidationError('Overlap must not be negative')
+        self.__store = store
+        self.__name = name
+        self.__overlap = overlap
+        self.__items_per_page = items_per_page
+        self.__since = since
+
+    def __cutoff(self, checkpoint):
+        if checkpoint is None or checkpoint.last_time is None:
+            return self.__since
+        return checkpoint.last_time - self.__overlap
+
+    def __collect(self, page, cutoff, seen, received):
+        # Returns False once the page reaches rows older than the cutoff, or the history ends
+        for message in page:
+            if not message.time:
+                if message.id not in seen:
+                    seen.add(message.id)
+                    received.append(message)
+                continue
+            if cutoff is not None and message.time < cutoff:
+                return False
+            if message.id not in seen:
+                seen.add(message.id)
+                received.append(message)
+        return bool(page)
+
+    def __commit(self, checkpoint, received):
+        if not received:
+            return received
+        checkpoint = checkpoint or Checkpoint()
+        timed = sorted((message for message in received if message.time),
+                       key=lambda message: (message.time, message.id))
+        untimed = [message for message in received if not message.time]
+        seen = dict(checkpoint.seen)
+        seen.update((message.id, message.time) for message in timed)
+        last_id, last_time = checkpoint.last_id, checkpoint.last_time
+        if seen:
+            last_id, last_time = max(seen.items(), key=lambda item: (item[1], item[0]))
+            # Ids older than the next poll's cutoff can never be re-read
+            window = last_time - self.__overlap
+            seen = {key: value for key, value in seen.items() if value >= window}
+        self.__store.save(self.__name, Checkpoint(last_id, last_time, seen,
+                                                  checkpoint.untimed + [message.id for message in untimed]))
+        return timed + untimed
+
+    def poll(self, client) -> List[responses.SMSMessage]:
+        """
+            Fetch the messages received since the last poll and advance the checkpoint
+        :param client: Skyetel
+        :return: list[SMSMessage], new messages, oldest first
+        """
+        checkpoint = self.__store.load(self.__name)
+        cutoff = self.__cutoff(checkpoint)
+        seen = set(checkpoint.seen).union(checkpoint.untimed) if checkpoint else set()
+        received = []
+        offset = 0
+        while True:
+            page = client.get_sms_receipts(self.__items_per_page, offset, sort=self.SORT)
+            if not self.__collect(page, cutoff, seen, received):
+                break
+            offset += len(page)
+        return self.__commit(checkpoint, received)
+
+    async def poll_async(self, client) -> List[responses.SMSMessage]:
+        """
+            poll() for AsyncSkyetel
+        """
+        checkpoint = self.__store.load(self.__name)
+        cutoff = self.__cutoff(checkpoint)
+        seen = set(checkpoint.seen).union(checkpoint.untimed) if checkpoint else set()
+        received = []
+        offset = 0
+        while True:
+            page = await client.get_sms_receipts(self.__items_per_page, offset, sort=self.SORT)
+            if not self.__collect(page, cutoff, seen, received):
+                break
+            offset += len(page)
+        return self.__commit(checkpoint, received)
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+from . import responses, compact
+
+# Frozen dataclasses repeated across result rows, and the wire keys identifying them, tried in order
+INTERNED = {
+    responses.ExtendedOrganization: ('id',),
+    responses.Organization: ('org_id', 'id'),
+    responses.EndpointGroup: ('id',),
+    responses.Tenant: ('id',),
+}
+
+
+class Interner:
+    """
+        Bounded LRU of shared instances for the nested objects every row repeats (the organization, endpoint groups,
+        tenants). A cached instance is reused only while the raw JSON it was built from is unchanged, so a changed
+        balance or renamed tenant is never masked.
+    """
+    def __init__(self, maxsize=1024):
+        """
+        :param maxsize: integer, maximum number of distinct instances kept
+        """
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def intern(self, cls, row, build):
+        """
+            Get the shared instance for a raw JSON object, building and caching it on a miss
+        :param cls: dataclass type, one of the INTERNED types or its compact twin
+        :param row: dict, raw JSON object
+        :param build: callable, build(row) returning a new instance of cls
+        :return: instance of cls
+        """
+        for identity in INTERNED[compact.original(cls)]:
+            if identity in row:
+                break
+        key = (cls, row.get(identity))
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] == row:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        instance = build(row)
+        with self.__lock:
+            self.__entries[key] = (dict(row), instance)
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+        return instance
+
+    def clear(self):
+        """
+            Drop every cached instance. Objects already handed out are unaffected.
+        :return: None
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_shared_interner = Interner()
+
+
+def shared_interner():
+    """
+        Get the process-wide Interner that clients use by default
+    :return: Interner
+    """
+    return _shared_interner
@@ -0,0 +1,246 @@
+import asyncio
+import collections
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+API_CALLS = 120
+API_PERIOD = 60
+# Requests reach the server a little after they are granted. Counting each one this many seconds longer keeps a
+# request that was slow to arrive from pushing the server's window over budget.
+LATENCY_MARGIN = 0.25
+# Times a request answered with 429 is retried after waiting out Retry-After
+RATE_LIMIT_RETRIES = 3
+
+
+def retry_after(headers, default=1.0):
+    """
+        Seconds to wait before retrying a throttled request
+    :param headers: response headers
+    :param default: float, seconds to wait when the header is missing or unreadable
+    :return: float, the Retry-After delay, given in seconds or as an HTTP date
+    """
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """
+        Base class for request budgets. Subclasses implement _take(), which either consumes a token and returns 0 or
+        returns the number of seconds until one becomes available. Subclasses whose _take() may block on I/O set
+        blocking, so acquire_async() and pause_async() run it off the event loop.
+    """
+    _paused_until = 0.0
+    blocking = False
+
+    def _take(self):
+        raise NotImplementedError
+
+    def __wait(self):
+        paused = self._paused_until - time.monotonic()
+        return paused if paused > 0 else self._take()
+
+    def pause(self, seconds):
+        """
+            Hold back every acquire for a while, e.g. after the server answered 429 with Retry-After
+        :param seconds: float, how long no token is handed out
+        :return: None
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def pause_async(self, seconds):
+        """
+            pause() without blocking the event loop
+        :param seconds: float, how long no token is handed out
+        :return: None
+        """
+        if self.blocking:
+            await asyncio.get_running_loop().run_in_executor(None, self.pause, seconds)
+        else:
+            self.pause(seconds)
+
+    def try_acquire(self):
+        """
+            Consume a token without waiting
+        :return: bool, True if a token was available
+        """
+        return self.__wait() == 0
+
+    def acquire(self, timeout=None):
+        """
+            Block until a token is available
+        :param timeout: float, maximum seconds to wait, None waits indefinitely and 0 behaves like try_acquire
+        :return: bool, True if a token was consumed before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.__wait()
+            if wait == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout=None):
+        """
+            Wait without blocking the event loop until a token is available
+        :param timeout: float, maximum seconds to wait, None waits indefinitely and 0 behaves like try_acquire
+        :return: bool, True if a token was consumed before the timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            wait = await loop.run_in_executor(None, self.__wait) if self.blocking else self.__wait()
+            if wait == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+
+class SlidingWindow(RateLimiter):
+    """
+        In-process limiter that grants at most calls requests in any period, the way the API counts them. Up to calls
+        requests may go out at once; each then holds its place in the window for period plus margin seconds.
+    """
+    def __init__(self, calls=API_CALLS, period=API_PERIOD, margin=LATENCY_MARGIN):
+        self.__calls = calls
+        self.__span = period + margin
+        self.__granted = collections.deque()
+        self.__lock = threading.Lock()
+
+    def _take(self):
+        with self.__lock:
+            now = time.monotonic()
+            while self.__granted and self.__granted[0] <= now - self.__span:
+                self.__granted.popleft()
+            if len(self.__granted) < self.__calls:
+                self.__granted.append(now)
+                return 0
+            return self.__granted[0] + self.__span - now
+
+
+class TokenBucket(RateLimiter):
+    """
+        In-process token bucket refilled at calls per period plus margin, holding at most burst tokens. The default
+        burst of 1 spaces requests evenly and never exceeds calls in any period; a larger burst lets up to burst extra
+        requests through in the first period.
+    """
+    def __init__(self, calls=API_CALLS, period=API_PERIOD, burst=1, margin=LATENCY_MARGIN):
+        self.__rate = calls / (period + margin)
+        self.__capacity = burst
+        self.__tokens = float(self.__capacity)
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def _take(self):
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return 0
+            return (1 - self.__tokens) / self.__rate
+
+
+class SQLiteTokenBucket(RateLimiter):
+    """
+        Token bucket stored in a SQLite file, so every process on the host that opens the same file draws from one
+        budget. State is updated inside an IMMEDIATE transaction, which serializes concurrent writers, so async
+        clients take tokens in an executor. A pause() after a 429 is stored with the bucket and holds back every
+        process. Burst and margin work as in TokenBucket.
+    """
+    blocking = True
+
+    def __init__(self, path, calls=API_CALLS, period=API_PERIOD, burst=1, name='skyetel', margin=LATENCY_MARGIN):
+        self.__path = path
+        self.__name = name
+        self.__rate = calls / (period + margin)
+        self.__capacity = burst
+        self.__local = threading.local()
+
+        connection = self.__connection()
+        connection.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL, '
+                           'paused_until REAL NOT NULL DEFAULT 0)')
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(buckets)')]
+        if 'paused_until' not in columns:
+            # Bucket files created before pauses were shared
+            connection.execute('ALTER TABLE buckets ADD COLUMN paused_until REAL NOT NULL DEFAULT 0')
+        connection.execute('INSERT OR IGNORE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                           (name, self.__capacity, time.time()))
+
+    def __connection(self):
+        # sqlite3 connections may not be shared between threads
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.__path, timeout=30, isolation_level=None)
+            self.__local.connection = connection
+        return connection
+
+    def _take(self):
+        connection = self.__connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            tokens, updated, paused_until = connection.execute(
+                'SELECT tokens, updated, paused_until FROM buckets WHERE name = ?', (self.__name,)).fetchone()
+            now = time.time()
+            tokens = min(self.__capacity, tokens + max(0.0, now - updated) * self.__rate)
+            wait = 0
+            if paused_until > now:
+                wait = paused_until - now
+            elif tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.__rate
+            connection.execute('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?', (tokens, now, self.__name))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+    def pause(self, seconds):
+        """
+            Hold back every acquire on this bucket, in any process, for a while
+        :param seconds: float, how long no token is handed out
+        :return: None
+        """
+        super().pause(seconds)
+        self.__connection().execute('UPDATE buckets SET paused_until = MAX(paused_until, ?) WHERE name = ?',
+                                    (time.time() + seconds, self.__name))
+
+
+_shared_buckets = {}
+_shared_buckets_lock = threading.Lock()
+
+
+def shared_bucket(key):
+    """
+        Get the process-wide SlidingWindow for a key, creating it on first use. Clients default to the window for
+        their X-AUTH-SID, so every client on the same account shares one budget.
+    :param key: string, budget identifier
+    :return: SlidingWindow
+    """
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get(key)
+        if bucket is None:
+            bucket = _shared_buckets[key] = SlidingWindow()
+        return bucket
@@ -0,0 +1,191 @@
+import bisect
+import threading
+from collections import defaultdict
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_STALE = 'stale'
+CACHE_REVALIDATED = 'revalidated'
+
+
+class Observer:
+    """
+        Receives timings from a client. Every hook does nothing by default, so subclasses override only what they
+        need. Clients without an observer skip the timing entirely. Hooks run on the calling thread and should be
+        cheap.
+    """
+    def on_request(self, pattern, request_type, status, seconds, bytes_received, retries):
+        """
+            One HTTP round trip to the API
+        :param pattern: string, route pattern, e.g. /phonenumbers/{id}
+        :param request_type: string, HTTP method
+        :param status: integer, HTTP status code
+        :param seconds: float, time from sending the request to reading the whole body
+        :param bytes_received: integer, response body size
+        :param retries: integer, connection retries the transport made
+        """
+
+    def on_rate_limit_wait(self, pattern, seconds):
+        """
+            Time spent waiting for the rate budget before a request
+        """
+
+    def on_parse(self, pattern, seconds):
+        """
+            Time spent parsing a response body as JSON
+        """
+
+    def on_cache(self, pattern, event):
+        """
+            Outcome of a response cache lookup, one of CACHE_HIT, CACHE_MISS, CACHE_STALE or CACHE_REVALIDATED
+        """
+
+    def on_decode(self, record_type, rows, seconds):
+        """
+            Conversion of a JSON body into response objects
+        :param record_type: string, name of the responses dataclass
+        :param rows: integer, records decoded
+        :param seconds: float, decode time
+        """
+
+
+class _Histogram:
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsAggregator(Observer):
+    """
+        In-memory Observer keeping per route latency histograms and totals. Read it with snapshot() or export it with
+        prometheus_text().
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.latency = defaultdict(_Histogram)
+        self.requests = defaultdict(int)
+        self.bytes_received = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.rate_limit_wait = defaultdict(float)
+        self.parse_seconds = defaultdict(float)
+        self.cache_events = defaultdict(int)
+        self.rows_decoded = defaultdict(int)
+        self.decode_seconds = defaultdict(float)
+
+    def on_request(self, pattern, request_type, status, seconds, bytes_received, retries):
+        with self.__lock:
+            self.latency[pattern].observe(seconds)
+            self.requests[(pattern, request_type, status)] += 1
+            self.bytes_received[pattern] += bytes_received
+            if retries:
+                self.retries[pattern] += retries
+
+    def on_rate_limit_wait(self, pattern, seconds):
+        with self.__lock:
+            self.rate_limit_wait[pattern] += seconds
+
+    def on_parse(self, pattern, seconds):
+        with self.__lock:
+            self.parse_seconds[pattern] += seconds
+
+    def on_cache(self, pattern, event):
+        with self.__lock:
+            self.cache_events[(pattern, event)] += 1
+
+    def on_decode(self, record_type, rows, seconds):
+        with self.__lock:
+            self.rows_decoded[record_type] += rows
+            self.decode_seconds[record_type] += seconds
+
+    def tables(self):
+        """
+            Consistent copies of every table
+        :return: dict, table name to dict; latency maps route to (bucket counts, count, sum)
+        """
+        with self.__lock:
+            return {
+                'latency': {pattern: (list(h.counts), h.count, h.sum) for pattern, h in self.latency.items()},
+                'requests': dict(self.requests),
+                'bytes_received': dict(self.bytes_received),
+                'retries': dict(self.retries),
+                'rate_limit_wait': dict(self.rate_limit_wait),
+                'parse_seconds': dict(self.parse_seconds),
+                'cache_events': dict(self.cache_events),
+                'rows_decoded': dict(self.rows_decoded),
+                'decode_seconds': dict(self.decode_seconds),
+            }
+
+    def snapshot(self):
+        """
+        :return: dict, per route request count, latency sum, bytes, retries, rate limit wait and parse time, and per
+            record type rows and decode time
+        """
+        tables = self.tables()
+        routes = {pattern: {'requests': count, 'seconds': total,
+                            'bytes_received': tables['bytes_received'].get(pattern, 0),
+                            'retries': tables['retries'].get(pattern, 0),
+                            'rate_limit_wait': tables['rate_limit_wait'].get(pattern, 0.0),
+                            'parse_seconds': tables['parse_seconds'].get(pattern, 0.0)}
+                  for pattern, (counts, count, total) in tables['latency'].items()}
+        decoded = {record_type: {'rows': rows, 'seconds': tables['decode_seconds'][record_type]}
+                   for record_type, rows in tables['rows_decoded'].items()}
+        cache = {'{} {}'.format(*key): count for key, count in tables['cache_events'].items()}
+        return {'routes': routes, 'decoded': decoded, 'cache': cache}
+
+    def reset(self):
+        with self.__lock:
+            for table in (self.latency, self.requests, self.bytes_received, self.retries, self.rate_limit_wait,
+                          self.parse_seconds, self.cache_events, self.rows_decoded, self.decode_seconds):
+                table.clear()
+
+
+def _labels(**labels):
+    return '{' + ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                          for key, value in labels.items()) + '}'
+
+
+def prometheus_text(aggregator: MetricsAggregator, prefix='skyetel'):
+    """
+        Render an aggregator in the Prometheus text exposition format
+    :param aggregator: MetricsAggregator
+    :param prefix: string, metric name prefix
+    :return: string
+    """
+    tables = aggregator.tables()
+    lines = ['# TYPE {}_request_duration_seconds histogram'.format(prefix)]
+    for pattern, (counts, count, total) in sorted(tables['latency'].items()):
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+            cumulative += bucket
+            labels = _labels(route=pattern, le=bound)
+            lines.append('{}_request_duration_seconds_bucket{} {}'.format(prefix, labels, cumulative))
+        lines.append('{}_request_duration_seconds_sum{} {}'.format(prefix, _labels(route=pattern), total))
+        lines.append('{}_request_duration_seconds_count{} {}'.format(prefix, _labels(route=pattern), count))
+
+    counters = [
+        ('requests_total', 'requests', ('route', 'method', 'status')),
+        ('response_bytes_total', 'bytes_received', ('route',)),
+        ('retries_total', 'retries', ('route',)),
+        ('rate_limit_wait_seconds_total', 'rate_limit_wait', ('route',)),
+        ('parse_seconds_total', 'parse_seconds', ('route',)),
+        ('cache_events_total', 'cache_events', ('route', 'event')),
+        ('rows_decoded_total', 'rows_decoded', ('record_type',)),
+        ('decode_seconds_total', 'decode_seconds', ('record_type',)),
+    ]
+    for name, table, label_names in counters:
+        lines.append('# TYPE {}_{} counter'.format(prefix, name))
+        for key, value in sorted(tables[table].items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append('{}_{}{} {}'.format(prefix, name, _labels(**dict(zip(label_names, key))), value))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,221 @@
+import itertools
+import json
+import sqlite3
+import threading
+from dataclasses import asdict, fields
+
+from . import errors, responses, decoders, interning
+
+# Boolean PhoneNumber settings stored as indexed columns, usable as query() keyword arguments
+FLAGS = ('e911_enabled', 'cnam_enabled', 'spamblock_enabled', 'message_enabled', 'vfax_enabled', 'off_network',
+         'block_nocid', 'conference_bridge_enabled', 'record_calls')
+
+# Nested objects stored once in their own table, with their columns in dataclass order
+_NORMALIZED = {
+    'tenant': ('tenants', responses.Tenant),
+    'endpoint_group': ('endpoint_groups', responses.EndpointGroup),
+    'e911address': ('e911_addresses', responses.E911Address),
+}
+
+_SCHEMA = ['CREATE TABLE IF NOT EXISTS {} ({})'.format(
+    table, ', '.join('{} {}'.format(f.name, 'INTEGER PRIMARY KEY' if f.name == 'id' else '') for f in fields(cls)))
+    for table, cls in _NORMALIZED.values()] + [
+    'CREATE TABLE IF NOT EXISTS phonenumbers (id INTEGER PRIMARY KEY, number INTEGER, tenant_id INTEGER, '
+    'endpoint_group_id INTEGER, e911address_id INTEGER, lifecycle_state TEXT, {}, generation INTEGER, '
+    'row TEXT)'.format(', '.join('{} INTEGER'.format(flag) for flag in FLAGS)),
+    'CREATE TABLE IF NOT EXISTS mirror_state (name TEXT PRIMARY KEY, value INTEGER)',
+] + ['CREATE INDEX IF NOT EXISTS phonenumbers_{0} ON phonenumbers ({0})'.format(column)
+     for column in ('number', 'tenant_id', 'endpoint_group_id', 'lifecycle_state') + FLAGS]
+
+
+def _select():
+    columns = ['p.row']
+    joins = []
+    for alias, (name, (table, cls)) in enumerate(_NORMALIZED.items()):
+        columns += ['t{}.{}'.format(alias, f.name) for f in fields(cls)]
+        joins.append('LEFT JOIN {0} t{1} ON t{1}.id = p.{2}_id'.format(table, alias, name))
+    return 'SELECT {} FROM phonenumbers p {}'.format(', '.join(columns), ' '.join(joins))
+
+
+_SELECT = _select()
+
+
+def _where(number, tenant_id, endpoint_group_id, lifecycle_state, flags):
+    unknown = [flag for flag in flags if flag not in FLAGS]
+    if unknown:
+        raise errors.ValidationError('Unknown phone number flags: {}'.format(', '.join(unknown)))
+    criteria = {'number': number, 'tenant_id': tenant_id, 'endpoint_group_id': endpoint_group_id,
+                'lifecycle_state': lifecycle_state}
+    criteria.update(flags)
+    criteria = {column: value for column, value in criteria.items() if value is not None}
+    if not criteria:
+        return '', ()
+    return ' WHERE ' + ' AND '.join('p.{} = ?'.format(column) for column in criteria), tuple(criteria.values())
+
+
+class PhoneNumberMirror:
+    """
+        Local SQLite copy of the account's Phone Numbers, answering inventory queries without API calls. Tenants,
+        Endpoint Groups and E911 addresses are stored once in their own tables; each Phone Number keeps its number,
+        foreign keys and feature flags in indexed columns next to the rest of its fields.
+    """
+    def __init__(self, path, interner: interning.Interner = interning.shared_interner()):
+        """
+        :param path: string, SQLite database file, created if missing
+        :param interner: Interner, shares nested objects between returned Phone Numbers, None disables interning
+        """
+        self.__path = path
+        self.__interner = interner
+        self.__local = threading.local()
+
+        connection = self.__connection()
+        for statement in _SCHEMA:
+            connection.execute(statement)
+
+    def __connection(self):
+        # sqlite3 connections may not be shared between threads
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.__path, timeout=30, isolation_level=None)
+            self.__local.connection = connection
+        return connection
+
+    def __len__(self):
+        return self.__connection().execute('SELECT COUNT(*) FROM phonenumbers').fetchone()[0]
+
+    def __generation(self, connection):
+        row = connection.execute("SELECT value FROM mirror_state WHERE name = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def store(self, phonenumbers, generation=None, batch_size=100):
+        """
+            Insert or replace Phone Numbers, e.g. collected from AsyncSkyetel.iter_phonenumbers. Each batch is read
+            from the iterable before its transaction starts, so a lazy crawl never holds the write lock while it waits
+            on the API.
+        :param phonenumbers: iterable of PhoneNumber
+        :param generation: integer, refresh generation to tag the rows with, defaults to the current one
+        :param batch_size: integer, rows written per transaction
+        :return: integer, number of rows stored
+        """
+        connection = self.__connection()
+        if generation is None:
+            generation = self.__generation(connection)
+        phonenumbers = iter(phonenumbers)
+        count = 0
+        while True:
+            batch = list(itertools.islice(phonenumbers, batch_size))
+            if not batch:
+                return count
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                for phonenumber in batch:
+                    self.__store_one(connection, phonenumber, generation)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            count += len(batch)
+
+    def __store_one(self, connection, phonenumber, generation):
+        row = asdict(phonenumber)
+        keys = {}
+        for name, (table, cls) in _NORMALIZED.items():
+            nested = row.pop(name)
+            keys[name] = nested['id'] if nested else None
+            if nested:
+                connection.execute('INSERT OR REPLACE INTO {} VALUES ({})'.format(table, ', '.join('?' * len(nested))),
+                                   tuple(nested.values()))
+        connection.execute('INSERT OR REPLACE INTO phonenumbers VALUES ({})'.format(', '.join('?' * (len(FLAGS) + 8))),
+                           (phonenumber.id, phonenumber.number, keys['tenant'], keys['endpoint_group'],
+                            keys['e911address'], phonenumber.lifecycle_state)
+                           + tuple(getattr(phonenumber, flag) for flag in FLAGS) + (generation, json.dumps(row)))
+
+    def refresh(self, client, incremental=False, items_per_page=100):
+        """
+            Synchronize the mirror with the API. A full refresh stores every Phone Number page by page, tagged with a
+            new generation, then drops the ones that no longer exist in one short transaction. The API has no
+            modified-since filter, so an incremental refresh only adds numbers with ids above the newest one already
+            mirrored; settings changed elsewhere need a full refresh.
+        :param client: Skyetel
+        :param incremental: bool, fetch only newly added numbers, newest first, stopping at the first known id
+        :param items_per_page: integer, records fetched per request
+        :return: integer, number of rows stored
+        """
+        connection = self.__connection()
+        if incremental:
+            newest = connection.execute('SELECT MAX(id) FROM phonenumbers').fetchone()[0]
+            if newest is not None:
+                added = []
+                for phonenumber in client.iter_phonenumbers(items_per_page, sort=['-id']):
+                    if phonenumber.id <= newest:
+                        break
+                    added.append(phonenumber)
+                return self.store(added)
+
+        generation = self.__generation(connection) + 1
+        count = self.store(client.iter_phonenumbers(items_per_page), generation, items_per_page)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM phonenumbers WHERE generation != ?', (generation,))
+            connection.execute("INSERT OR REPLACE INTO mirror_state VALUES ('generation', ?)", (generation,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        # Lets the planner prefer the selective tenant and group indexes over the boolean flag ones
+        connection.execute('ANALYZE')
+        return count
+
+    def query(self, number: int = None, tenant_id: int = None, endpoint_group_id: int = None,
+              lifecycle_state: str = None, limit: int = None, **flags):
+        """
+            Find mirrored Phone Numbers. Every given criterion must match.
+        :param number: integer, exact Phone Number
+        :param tenant_id: integer, assigned Tenant ID
+        :param endpoint_group_id: integer, assigned Endpoint Group ID
+        :param lifecycle_state: string, e.g. 'active'
+        :param limit: integer, maximum rows returned
+        :param flags: bool, any of FLAGS, e.g. e911_enabled=False
+        :return: list[PhoneNumber], ordered by id
+        """
+        where, parameters = _where(number, tenant_id, endpoint_group_id, lifecycle_state, flags)
+        sql = _SELECT + where + ' ORDER BY p.id'
+        if limit is not None:
+            sql += ' LIMIT {:d}'.format(limit)
+        return self.__decode(self.__connection().execute(sql, parameters).fetchall())
+
+    def count(self, number: int = None, tenant_id: int = None, endpoint_group_id: int = None,
+              lifecycle_state: str = None, **flags):
+        """
+            Count mirrored Phone Numbers matching the same criteria as query(), without decoding them
+        :return: integer
+        """
+        where, parameters = _where(number, tenant_id, endpoint_group_id, lifecycle_state, flags)
+        return self.__connection().execute('SELECT COUNT(*) FROM phonenumbers p' + where, parameters).fetchone()[0]
+
+    def get(self, phonenumber_id: int):
+        """
+        :param phonenumber_id: integer, assigned Id for the Phone Number
+        :return: PhoneNumber, or None if it is not mirrored
+        """
+        rows = self.__connection().execute(_SELECT + ' WHERE p.id = ?', (phonenumber_id,)).fetchall()
+        return self.__decode(rows)[0] if rows else None
+
+    def __decode(self, rows):
+        response = []
+        for row in rows:
+            record = json.loads(row[0])
+            position = 1
+            for name, (table, cls) in _NORMALIZED.items():
+                width = len(fields(cls))
+                values = row[position:position + width]
+                position += width
+                record[name] = None if values[0] is None else dict(zip((f.name for f in fields(cls)), values))
+            response.append(record)
+        return decoders.decode_page(responses.PhoneNumber, response, self.__interner)
+
+    def close(self):
+        connection = getattr(self.__local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.__local.connection = None
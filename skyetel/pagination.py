@@ -0,0 +1,244 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from . import errors
+
+
+def iter_pages(fetch_page, items_per_page=100, page_offset=0):
+    """
+        Walk a paginated endpoint lazily. While the caller consumes a page, the next page is already being fetched in
+        the background. Iteration stops at the first empty page.
+    :param fetch_page: callable, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, records requested per page
+    :param page_offset: integer, offset of the first record to return
+    :return: generator[list], one list of records per non-empty page
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending = executor.submit(fetch_page, items_per_page, page_offset)
+    try:
+        while pending is not None:
+            page = pending.result()
+            pending = None
+            if not page:
+                break
+            # The server may cap page[limit], so advance by what was actually returned
+            page_offset += len(page)
+            pending = executor.submit(fetch_page, items_per_page, page_offset)
+            yield page
+    finally:
+        if pending is not None:
+            pending.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_records(fetch_page, items_per_page=100, page_offset=0):
+    """
+        Flatten iter_pages into a stream of individual records
+    :param fetch_page: callable, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, records requested per page
+    :param page_offset: integer, offset of the first record to return
+    :return: generator, records in server order
+    """
+    for page in iter_pages(fetch_page, items_per_page, page_offset):
+        yield from page
+
+
+async def aiter_pages(fetch_page, items_per_page=100, page_offset=0):
+    """
+        Asynchronous counterpart of iter_pages. The next page is requested as a task while the current one is consumed
+    :param fetch_page: coroutine function, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, records requested per page
+    :param page_offset: integer, offset of the first record to return
+    :return: async generator[list], one list of records per non-empty page
+    """
+    pending = asyncio.ensure_future(fetch_page(items_per_page, page_offset))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if not page:
+                break
+            page_offset += len(page)
+            pending = asyncio.ensure_future(fetch_page(items_per_page, page_offset))
+            yield page
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def aiter_records(fetch_page, items_per_page=100, page_offset=0):
+    """
+        Flatten aiter_pages into a stream of individual records
+    :param fetch_page: coroutine function, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, records requested per page
+    :param page_offset: integer, offset of the first record to return
+    :return: async generator, records in server order
+    """
+    async for page in aiter_pages(fetch_page, items_per_page, page_offset):
+        for record in page:
+            yield record
+
+
+def _probe(probes):
+    """
+        Search for the first empty page, assuming pages exist up to some index and none after it. Written as a
+        generator so the sync and async drivers can run each round's probes concurrently: it yields the page indexes
+        to test, is sent back whether each one has rows, and returns the index of the first empty page.
+    """
+    probes = max(2, probes)
+    candidates = [0] + [2 ** k for k in range(probes - 1)]
+    results = dict(zip(candidates, (yield candidates)))
+    if not results[0]:
+        return 0
+    low = 0
+    while True:
+        low = max([low] + [page for page, exists in results.items() if exists])
+        empty = [page for page, exists in results.items() if not exists and page > low]
+        if empty:
+            high = min(empty)
+            break
+        candidates = [low * 2 ** k for k in range(1, probes + 1)]
+        results = dict(zip(candidates, (yield candidates)))
+    while high - low > 1:
+        step = (high - low) / (probes + 1)
+        candidates = sorted({low + max(1, int(step * index)) for index in range(1, probes + 1)})
+        results = dict(zip(candidates, (yield candidates)))
+        low = max([low] + [page for page, exists in results.items() if exists])
+        high = min([high] + [page for page, exists in results.items() if not exists and page > low])
+    return high
+
+
+def probe_total(fetch_page, items_per_page=100, max_workers=8):
+    """
+        Estimate the size of a paginated result without reading it. Single rows are requested at page boundaries,
+        max_workers at a time, and a few such rounds find the first empty page.
+    :param fetch_page: callable, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, page size the estimate is rounded up to
+    :param max_workers: integer, concurrent probes per round
+    :return: integer, upper bound on the row count, exact to within one page
+    """
+    search = _probe(max_workers)
+    pages = next(search)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            results = list(executor.map(lambda page: bool(fetch_page(1, page * items_per_page)), pages))
+            try:
+                pages = search.send(results)
+            except StopIteration as stop:
+                return stop.value * items_per_page
+
+
+async def aprobe_total(fetch_page, items_per_page=100, concurrency=8):
+    """
+        Asynchronous counterpart of probe_total
+    :param fetch_page: coroutine function, fetch_page(items_per_page, page_offset) returning a list of records
+    :param items_per_page: integer, page size the estimate is rounded up to
+    :param concurrency: integer, concurrent probes per round
+    :return: integer, upper bound on the row count, exact to within one page
+    """
+    search = _probe(concurrency)
+    pages = next(search)
+    while True:
+        probes = await asyncio.gather(*(fetch_page(1, page * items_per_page) for page in pages))
+        results = [bool(probe) for probe in probes]
+        try:
+            pages = search.send(results)
+        except StopIteration as stop:
+            return stop.value * items_per_page
+
+
+def _ranges(total, items_per_page, page_offset):
+    # Every page also requests the first row of the next one, so the two can be checked against each other
+    return [(offset, items_per_page + 1) for offset in range(page_offset, page_offset + max(total, 1), items_per_page)]
+
+
+def _assemble(pages, items_per_page, key):
+    """
+        Join pages fetched with a one-row overlap, checking that each page's extra row is the next page's first row.
+        A mismatch means rows were inserted or deleted ahead of a page between the two fetches, moving every later
+        offset.
+    :return: tuple, (records in order, True if the last page was full and more rows may follow)
+    """
+    records = []
+    for index, page in enumerate(pages):
+        following = pages[index + 1] if index + 1 < len(pages) else None
+        if len(page) < items_per_page + 1:
+            # The end of the result: everything after it must be empty
+            if any(pages[index + 1:]):
+                raise errors.OffsetShift('Page at row {} ended early but later pages have rows'.format(
+                    index * items_per_page))
+            records.extend(page)
+            return records, False
+        if following is None:
+            records.extend(page)
+            return records, True
+        if not following or key(page[-1]) != key(following[0]):
+            raise errors.OffsetShift('Rows moved across the page boundary at row {}'.format(
+                (index + 1) * items_per_page))
+        records.extend(page[:-1])
+    return records, False
+
+
+def crawl(fetch_page, total, items_per_page=100, page_offset=0, max_workers=8, key=None, retries=2):
+    """
+        Read a whole paginated result by fetching every page concurrently instead of one after another. Pages are
+        computed from a known or probed total; each requests one extra row so a shift of the offsets during the
+        crawl is detected, in which case the crawl starts over. Rows past the total are read sequentially, so an
+        underestimate costs time but loses nothing. items_per_page + 1 must not exceed the server's page size cap.
+    :param fetch_page: callable, fetch_page(items_per_page, page_offset) returning a list of records
+    :param total: integer, number of records from page_offset on, or an upper bound such as probe_total() returns
+    :param items_per_page: integer, records per page
+    :param page_offset: integer, offset of the first record to return
+    :param max_workers: integer, concurrent page fetches, further limited by the caller's rate budget
+    :param key: callable, key(record) identifying a record, defaults to its id attribute
+    :param retries: integer, crawls restarted after a detected shift before giving up
+    :return: list, records in server order
+    """
+    key = key or (lambda record: record.id)
+    for attempt in range(retries + 1):
+        ranges = _ranges(total, items_per_page, page_offset)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = list(executor.map(lambda bounds: fetch_page(bounds[1], bounds[0]), ranges))
+        try:
+            records, more = _assemble(pages, items_per_page, key)
+        except errors.OffsetShift:
+            if attempt == retries:
+                raise
+            continue
+        if more:
+            records.extend(iter_records(fetch_page, items_per_page, ranges[-1][0] + items_per_page + 1))
+        return records
+
+
+async def acrawl(fetch_page, total, items_per_page=100, page_offset=0, concurrency=8, key=None, retries=2):
+    """
+        Asynchronous counterpart of crawl
+    :param fetch_page: coroutine function, fetch_page(items_per_page, page_offset) returning a list of records
+    :param total: integer, number of records from page_offset on, or an upper bound such as aprobe_total() returns
+    :param items_per_page: integer, records per page
+    :param page_offset: integer, offset of the first record to return
+    :param concurrency: integer, concurrent page fetches, further limited by the caller's rate budget
+    :param key: callable, key(record) identifying a record, defaults to its id attribute
+    :param retries: integer, crawls restarted after a detected shift before giving up
+    :return: list, records in server order
+    """
+    key = key or (lambda record: record.id)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(bounds):
+        async with semaphore:
+            return await fetch_page(bounds[1], bounds[0])
+
+    for attempt in range(retries + 1):
+        ranges = _ranges(total, items_per_page, page_offset)
+        pages = await asyncio.gather(*(fetch(bounds) for bounds in ranges))
+        try:
+            records, more = _assemble(pages, items_per_page, key)
+        except errors.OffsetShift:
+            if attempt == retries:
+                raise
+            continue
+        if more:
+            records.extend([record async for record in aiter_records(fetch_page, items_per_page,
+                                                                     ranges[-1][0] + items_per_page + 1)])
+        return records
@@ -0,0 +1,244 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List
+
+from . import errors, responses
+
+# Numbers returned by an order search are held server-side for this long
+HOLD_SECONDS = 600
+# A hold with less time left than this is given up rather than ordered, the order might not land in time
+MARGIN_SECONDS = 60
+# Longest a held number waits for its batch to fill before a partial batch is ordered
+MAX_WAIT_SECONDS = 120
+
+SEARCH = 'search'
+ORDER = 'order'
+_DONE = object()
+
+
+@dataclass
+class ProvisionReport:
+    # Numbers in successful orders and what the order returned for them
+    ordered: List[str] = field(default_factory=list)
+    results: List[responses.PhoneNumberUpdate] = field(default_factory=list)
+    # Numbers whose hold expired, or came too close to expiring, before they could be ordered
+    lost: List[str] = field(default_factory=list)
+    # (numbers, error) per failed order and (PhoneNumberFilter, error) per failed search
+    failed_orders: List[tuple] = field(default_factory=list)
+    failed_searches: List[tuple] = field(default_factory=list)
+    # Numbers returned by more than one search, ordered once
+    duplicates: int = 0
+
+
+class HoldTracker:
+    """
+        Bookkeeping for a provisioning run, without doing any I/O: which searched numbers are held and until when,
+        which are due to be ordered, and what became of them. A number's hold is timed from when its search was
+        sent, so expiry is never underestimated. Batches take the numbers closest to expiry first.
+    """
+    def __init__(self, mou, batch_size=100, hold=HOLD_SECONDS, margin=MARGIN_SECONDS, max_wait=MAX_WAIT_SECONDS,
+                 clock=time.monotonic):
+        """
+        :param mou: integer, MOU of every NumberPurchase
+        :param batch_size: integer, numbers per order
+        :param hold: float, seconds a search result is held server-side
+        :param margin: float, seconds of hold that must remain for a number to be ordered
+        :param max_wait: float, seconds a number waits for a full batch before a partial one is ordered
+        :param clock: callable, monotonic time in seconds
+        """
+        if batch_size < 1:
+            raise errors.ValidationError('Batch size must be at least 1')
+        if margin >= hold:
+            raise errors.ValidationError('Margin must be shorter than the hold')
+        self.mou = mou
+        self.batch_size = batch_size
+        self.hold = hold
+        self.margin = margin
+        self.max_wait = max_wait
+        self.clock = clock
+        self.report = ProvisionReport()
+        self.__held = []
+        self.__seen = set()
+        self.__sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.__held)
+
+    def add(self, numbers, searched_at):
+        """
+            Hold the numbers returned by one search, skipping numbers already returned by another
+        :param numbers: list[string], search result
+        :param searched_at: float, clock time the search was sent
+        :return: None
+        """
+        for number in numbers or []:
+            if number in self.__seen:
+                self.report.duplicates += 1
+                continue
+            self.__seen.add(number)
+            heapq.heappush(self.__held, (searched_at + self.hold, next(self.__sequence), number))
+
+    def expire(self, now=None):
+        """
+            Give up numbers whose hold ends within the margin
+        :param now: float, clock time, defaults to the current time
+        :return: list[string], numbers lost
+        """
+        now = self.clock() if now is None else now
+        lost = []
+        while self.__held and self.__held[0][0] - self.margin <= now:
+            lost.append(heapq.heappop(self.__held)[2])
+        self.report.lost.extend(lost)
+        return lost
+
+    def due(self, final=False, now=None):
+        """
+            Take the next batch to order: a full batch, a partial one once its oldest number has waited max_wait,
+            or whatever is held when no more searches will come
+        :param final: bool, no searches are pending
+        :param now: float, clock time, defaults to the current time
+        :return: list[NumberPurchase], empty if nothing is due yet
+        """
+        now = self.clock() if now is None else now
+        self.expire(now)
+        if not self.__held:
+            return []
+        waited = now - (self.__held[0][0] - self.hold)
+        if len(self.__held) < self.batch_size and not final and waited < self.max_wait:
+            return []
+        batch = [heapq.heappop(self.__held)[2] for _ in range(min(self.batch_size, len(self.__held)))]
+        return [responses.NumberPurchase(number, self.mou) for number in batch]
+
+    def next_deadline(self):
+        """
+        :return: float, clock time at which the oldest held number becomes due, None if nothing is held
+        """
+        if not self.__held:
+            return None
+        return min(self.__held[0][0] - self.hold + self.max_wait, self.__held[0][0] - self.margin)
+
+    def ordered(self, batch, results):
+        self.report.ordered.extend(purchase.number for purchase in batch)
+        self.report.results.extend(results or [])
+
+    def order_failed(self, batch, error):
+        self.report.failed_orders.append(([purchase.number for purchase in batch], error))
+
+    def search_failed(self, search_filter, error):
+        self.report.failed_searches.append((search_filter, error))
+
+
+def provision(search, order, filters, tracker: HoldTracker, max_workers=8):
+    """
+        Run order searches concurrently and order what they return in batches while the holds last. Due orders are
+        started before further searches, so held numbers do not queue behind new ones.
+    :param search: callable, Skyetel.get_available_phonenumbers
+    :param order: callable, Skyetel.order_phonenumbers
+    :param filters: iterable of PhoneNumberFilter
+    :param tracker: HoldTracker, batch size, MOU and timing of the run
+    :param max_workers: integer, concurrent requests, further limited by the rate budget
+    :return: ProvisionReport
+    """
+    pending = iter(filters)
+    searching = True
+    in_flight = {}
+
+    def run_search(search_filter):
+        searched_at = tracker.clock()
+        return searched_at, search(search_filter)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            while len(in_flight) < max_workers:
+                final = not searching and not any(kind == SEARCH for kind, _ in in_flight.values())
+                batch = tracker.due(final)
+                if batch:
+                    in_flight[executor.submit(order, batch)] = (ORDER, batch)
+                    continue
+                search_filter = next(pending, _DONE) if searching else _DONE
+                if search_filter is _DONE:
+                    if not searching:
+                        break
+                    # Out of filters: look again with final recomputed, so numbers still held are ordered
+                    searching = False
+                    continue
+                in_flight[executor.submit(run_search, search_filter)] = (SEARCH, search_filter)
+            if not in_flight:
+                break
+            # With a slot free, wake up when the oldest held number becomes due even if nothing completes
+            deadline = tracker.next_deadline() if len(in_flight) < max_workers else None
+            timeout = None if deadline is None else max(0.0, deadline - tracker.clock())
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, item = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except errors.Error as e:
+                    if kind == SEARCH:
+                        tracker.search_failed(item, e)
+                    else:
+                        tracker.order_failed(item, e)
+                    continue
+                if kind == SEARCH:
+                    tracker.add(result[1], result[0])
+                else:
+                    tracker.ordered(item, result)
+    return tracker.report
+
+
+async def aprovision(search, order, filters, tracker: HoldTracker, concurrency=8):
+    """
+        provision() for AsyncSkyetel.get_available_phonenumbers and AsyncSkyetel.order_phonenumbers
+    """
+    pending = iter(filters)
+    searching = True
+    in_flight = {}
+
+    async def run_search(search_filter):
+        searched_at = tracker.clock()
+        return searched_at, await search(search_filter)
+
+    try:
+        while True:
+            while len(in_flight) < concurrency:
+                final = not searching and not any(kind == SEARCH for kind, _ in in_flight.values())
+                batch = tracker.due(final)
+                if batch:
+                    in_flight[asyncio.ensure_future(order(batch))] = (ORDER, batch)
+                    continue
+                search_filter = next(pending, _DONE) if searching else _DONE
+                if search_filter is _DONE:
+                    if not searching:
+                        break
+                    # Out of filters: look again with final recomputed, so numbers still held are ordered
+                    searching = False
+                    continue
+                in_flight[asyncio.ensure_future(run_search(search_filter))] = (SEARCH, search_filter)
+            if not in_flight:
+                break
+            # With a slot free, wake up when the oldest held number becomes due even if nothing completes
+            deadline = tracker.next_deadline() if len(in_flight) < concurrency else None
+            timeout = None if deadline is None else max(0.0, deadline - tracker.clock())
+            done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                kind, item = in_flight.pop(task)
+                try:
+                    result = task.result()
+                except errors.Error as e:
+                    if kind == SEARCH:
+                        tracker.search_failed(item, e)
+                    else:
+                        tracker.order_failed(item, e)
+                    continue
+                if kind == SEARCH:
+                    tracker.add(result[1], result[0])
+                else:
+                    tracker.ordered(item, result)
+    finally:
+        for task in in_flight:
+            task.cancel()
+    return tracker.report
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from . import errors, responses
+
+CREATE = 'create'
+UPDATE = 'update'
+UNCHANGED = 'unchanged'
+
+
+@dataclass(frozen=True)
+class PlannedChange:
+    action: str
+    endpoint_group: responses.EndpointGroup
+    desired: responses.EndpointConfig
+    current: responses.Endpoint = None
+
+
+@dataclass
+class EndpointPlan:
+    creates: List[PlannedChange] = field(default_factory=list)
+    updates: List[PlannedChange] = field(default_factory=list)
+    unchanged: List[PlannedChange] = field(default_factory=list)
+    # Endpoints in a managed group that the desired state does not mention; reported, never deleted
+    unmanaged: List[responses.Endpoint] = field(default_factory=list)
+
+    @property
+    def writes(self):
+        return self.creates + self.updates
+
+
+@dataclass
+class ChangeReport:
+    change: PlannedChange
+    result: responses.Endpoint = None
+    error: errors.Error = None
+
+
+def endpoint_key(group_id, ip, port, transport):
+    return group_id, ip, int(port), transport.lower()
+
+
+def plan(desired: Dict[responses.EndpointGroup, List[responses.EndpointConfig]], current):
+    """
+        Compare the desired endpoints of each group with the account's current endpoints. Endpoints are matched on
+        ip, port and transport within a group; a match whose priority, description or group name differs is updated.
+    :param desired: dict, EndpointGroup to the list of EndpointConfig it should contain
+    :param current: iterable of Endpoint, every endpoint in the account
+    :return: EndpointPlan
+    """
+    existing = {}
+    for endpoint in current:
+        group = endpoint.endpoint_group or responses.EndpointGroup(None, None)
+        existing[endpoint_key(group.id, endpoint.ip, endpoint.port, endpoint.transport)] = endpoint
+
+    result = EndpointPlan()
+    wanted = set()
+    for group, configs in desired.items():
+        for config in configs:
+            key = endpoint_key(group.id, config.ip, config.port, config.transport)
+            if key in wanted:
+                raise errors.ValidationError('Duplicate endpoint {}:{}/{} in group {}'.format(
+                    config.ip, config.port, config.transport, group.id))
+            wanted.add(key)
+
+            endpoint = existing.get(key)
+            if endpoint is None:
+                result.creates.append(PlannedChange(CREATE, group, config))
+                continue
+            actual = (endpoint.priority, endpoint.description, endpoint.endpoint_group.name)
+            if actual != (config.priority, config.description, group.name):
+                result.updates.append(PlannedChange(UPDATE, group, config, endpoint))
+            else:
+                result.unchanged.append(PlannedChange(UNCHANGED, group, config, endpoint))
+
+    groups = {group.id for group in desired}
+    result.unmanaged = [endpoint for key, endpoint in existing.items() if key[0] in groups and key not in wanted]
+    return result
+
+
+def _arguments(change):
+    config, group = change.desired, change.endpoint_group
+    return config.ip, config.priority, config.description, group.id, group.name, config.port, config.transport
+
+
+def apply(client, change):
+    """
+        Issue the create or update for one planned change
+    :param client: Skyetel
+    :param change: PlannedChange, a create or an update
+    :return: ChangeReport
+    """
+    try:
+        if change.action == CREATE:
+            result = client.create_endpoint(*_arguments(change))
+        else:
+            result = client.update_endpoint(change.current.id, *_arguments(change))
+    except errors.Error as e:
+        return ChangeReport(change, error=e)
+    return ChangeReport(change, result)
+
+
+async def apply_async(client, change):
+    """
+        apply() for AsyncSkyetel
+    """
+    try:
+        if change.action == CREATE:
+            result = await client.create_endpoint(*_arguments(change))
+        else:
+            result = await client.update_endpoint(change.current.id, *_arguments(change))
+    except errors.Error as e:
+        return ChangeReport(change, error=e)
+    return ChangeReport(change, result)
@@ -153,6 +153,15 @@ class Endpoint:
     org: Organization
 
 
+@dataclass(frozen=True)
+class EndpointConfig:
+    ip: str
+    priority: int
+    description: str
+    port: int = 5060
+    transport: str = "udp"
+
+
 @dataclass(frozen=True)
 class E911Address:
     id: int
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Group:
+    """
+        Coalesces identical calls that are in flight at the same time: the first caller for a key runs the call and
+        every caller arriving before it finishes waits for, and receives, the same result or exception. Nothing is
+        remembered once the call returns, so this is not a cache.
+    """
+    def __init__(self):
+        self.__calls = {}
+        self.__tasks = {}
+        self.__lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, call):
+        """
+            Run call() once for all threads asking for key at the same time
+        :param key: hashable, identity of the call
+        :param call: callable, call() returning the result
+        :return: result of call()
+        """
+        with self.__lock:
+            pending = self.__calls.get(key)
+            if pending is None:
+                pending = self.__calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = call()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            pending.done.set()
+        return pending.value
+
+    async def do_async(self, key, call):
+        """
+            Await call() once for all tasks on the running event loop asking for key at the same time. A waiter being
+            cancelled does not cancel the shared call.
+        :param key: hashable, identity of the call
+        :param call: callable, call() returning an awaitable
+        :return: result of the awaitable
+        """
+        key = (asyncio.get_running_loop(), key)
+        with self.__lock:
+            task = self.__tasks.get(key)
+            if task is None:
+                task = self.__tasks[key] = asyncio.ensure_future(call())
+                task.add_done_callback(lambda done: self.__forget(key, done))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def __forget(self, key, task):
+        with self.__lock:
+            if self.__tasks.get(key) is task:
+                del self.__tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter was cancelled
+            task.exception()
+
+
+_shared_groups = {}
+_shared_groups_lock = threading.Lock()
+
+
+def shared_group(key):
+    """
+        Get the process-wide Group for a key, creating it on first use. Clients default to the group for their
+        X-AUTH-SID, so identical reads from any client on the same account are coalesced.
+    :param key: string, group identifier
+    :return: Group
+    """
+    with _shared_groups_lock:
+        group = _shared_groups.get(key)
+        if group is None:
+            group = _shared_groups[key] = Group()
+        return group
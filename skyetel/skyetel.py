@@ -1,52 +1,189 @@
-import requests
-from ratelimit import limits
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List, Dict
-from dataclasses import asdict
 
-from . import errors, urls, responses
-
-SKYETEL_DATESTRING = '%Y-%m-%dT%H:%M:%S+00:00'
-SKYETEL_TIMESTRING = SKYETEL_DATESTRING[9:]
+from . import errors, urls, responses, pagination, decoders, builders, limiter, interning, views, singleflight, bulk, \
+    reconcile, downloads, transcripts, metrics, statements, timeseries, provisioning
+from . import cache as cache_, transport as transport_
 
 
 class Skyetel:
-    def __init__(self, x_auth_sid, x_auth_secret):
+    def __init__(self, x_auth_sid, x_auth_secret, rate_limiter: limiter.RateLimiter = None, rate_limit_timeout=None,
+                 interner: interning.Interner = interning.shared_interner(), compact_records=False,
+                 cache: cache_.ResponseCache = None, coalesce_requests=True, download_timeout=60.0,
+                 transcript_cache: transcripts.TranscriptCache = None, transport: transport_.Transport = None,
+                 observer: metrics.Observer = None, base_url: str = urls.BASE_URL,
+                 statement_cache: statements.StatementCache = None):
+        """
+        :param x_auth_sid: string, API SID
+        :param x_auth_secret: string, API secret
+        :param rate_limiter: RateLimiter, request budget, defaults to a 120/min window shared per SID in this process
+        :param rate_limit_timeout: float, seconds to wait for budget before raising RateLimited, None waits forever
+        :param interner: Interner, shares repeated nested objects between result rows, None disables interning
+        :param compact_records: bool, return __slots__ records, and compact.Records instead of lists, to save memory
+        :param cache: ResponseCache, caches GET responses per route TTL and invalidates them on writes, None disables
+        :param coalesce_requests: bool, identical GETs in flight at the same time share one request and its result
+        :param download_timeout: float, seconds to wait for transcript file servers to connect and to send data
+        :param transcript_cache: TranscriptCache, keeps fetched transcripts on disk, None disables
+        :param transport: Transport, HTTP layer with its pool size and timeouts, defaults to a RequestsTransport
+        :param observer: Observer, receives request, rate limit, cache and decode timings, None disables them
+        :param base_url: string, API root, override to point the client at a proxy or emulator
+        :param statement_cache: StatementCache, keeps statements of closed months on disk, None disables
+        """
         self.__x_auth_sid = x_auth_sid
         self.__x_auth_secret = x_auth_secret
-        self.__url = urls.URLs()
+        self.__url = urls.URLs(base_url)
+        self.__rate_limiter = rate_limiter or limiter.shared_bucket(x_auth_sid)
+        self.__rate_limit_timeout = rate_limit_timeout
+        self.__interner = interner
+        self.__compact_records = compact_records
+        self.__cache = cache
+        self.__single_flight = singleflight.shared_group(x_auth_sid) if coalesce_requests else None
+        self.__observer = observer
+
+        # Credentials go with each API request only, never to the file storage behind download URLs
+        self.__headers = {'X-AUTH-SID': x_auth_sid, 'X-AUTH-SECRET': x_auth_secret}
+        self.__transport = transport or transport_.RequestsTransport()
+        self.__download_timeout = download_timeout
+        self.__transcript_cache = transcript_cache
+        self.__statement_cache = statement_cache
+
+    def warmup(self, connections: int = 1):
+        """
+            Open connections to the API ahead of the first call, so it does not pay the TCP and TLS handshakes. Sends
+            unauthenticated HEAD requests, which do not use the rate budget.
+        :param connections: integer, keep-alive connections to open
+        :return: None
+        """
+        self.__transport.warmup(self.__url.base_url(), connections)
 
-        self.__session = requests.Session()
-        self.__session.headers = {'X-AUTH-SID': x_auth_sid, 'X-AUTH-SECRET': x_auth_secret}
+    def close(self):
+        """
+            Close the pooled connections
+        :return: None
+        """
+        self.__transport.close()
 
-    @limits(calls=120, period=60)
     def __make_api_request(self, request_type, endpoint, data=None, json=None):
-        try:
-            if request_type == 'GET':
-                response = self.__session.get(endpoint, data=data, json=json)
-
-            elif request_type == 'POST':
-                response = self.__session.post(endpoint, data=data, json=json)
+        if request_type not in ('GET', 'POST', 'PATCH', 'DELETE'):
+            raise errors.ValidationError('Invalid Request Type')
+
+        if request_type != 'GET':
+            return self.__send_request(request_type, endpoint, data, json)
+
+        entry = None
+        if self.__cache is not None:
+            entry = self.__cache.get(endpoint, self.__x_auth_sid)
+            if entry is not None and entry.fresh:
+                self.__observe_cache(endpoint, metrics.CACHE_HIT)
+                return entry.value
+            if self.__cache.stale(entry, cache_.serving_stale.get()):
+                self.__observe_cache(endpoint, metrics.CACHE_STALE)
+                self.__cache.refresher.submit((self.__x_auth_sid, endpoint),
+                                              lambda: self.__send_request(request_type, endpoint, data, json, entry))
+                return entry.value
+            self.__observe_cache(endpoint, metrics.CACHE_MISS)
+
+        if self.__single_flight is not None:
+            return self.__single_flight.do((endpoint, repr(data), repr(json)),
+                                           lambda: self.__send_request(request_type, endpoint, data, json, entry))
+        return self.__send_request(request_type, endpoint, data, json, entry)
+
+    def __send_request(self, request_type, endpoint, data, json, entry=None):
+        headers = self.__headers
+        if entry is not None:
+            headers = dict(headers)
+            headers.update(entry.validators())
+
+        observer = self.__observer
+        pattern = self.__url.pattern(endpoint)
+        timeout = self.__transport.timeout(transport_.endpoint_class(request_type, pattern))
+        for _ in range(limiter.RATE_LIMIT_RETRIES + 1):
+            if observer is not None:
+                started = time.perf_counter()
+            if not self.__rate_limiter.acquire(self.__rate_limit_timeout):
+                raise errors.RateLimited('Rate limit budget exhausted')
+            if observer is not None:
+                sent = time.perf_counter()
+                observer.on_rate_limit_wait(pattern, sent - started)
+
+            response = self.__transport.request(request_type, endpoint, data=data, json=json, headers=headers,
+                                                timeout=timeout)
+            if observer is not None:
+                observer.on_request(pattern, request_type, response.status_code, time.perf_counter() - sent,
+                                    len(response.content), response.retries)
+            if response.status_code != 429:
+                break
+            # Over budget anyway, e.g. another host uses the same account: hold every caller back for Retry-After
+            self.__rate_limiter.pause(limiter.retry_after(response.headers))
+        else:
+            raise errors.RateLimited('API rate limit exceeded')
 
-            elif request_type == 'PATCH':
-                response = self.__session.patch(endpoint, data=data, json=json)
+        if response.status_code == 304 and entry is not None:
+            if observer is not None:
+                observer.on_cache(pattern, metrics.CACHE_REVALIDATED)
+            return self.__cache.revalidated(endpoint, entry, self.__x_auth_sid)
 
-            elif request_type == 'DELETE':
-                response = self.__session.delete(endpoint, data=data, json=json)
+        if observer is None:
+            content = response.json()
+        else:
+            parsing = time.perf_counter()
+            content = response.json()
+            observer.on_parse(pattern, time.perf_counter() - parsing)
+        if response.status_code != 200:
+            raise errors.APIError(content['ERROR'])
 
+        if self.__cache is not None:
+            if request_type == 'GET':
+                self.__cache.store(endpoint, pattern, content, response.headers, self.__x_auth_sid)
             else:
-                raise errors.ValidationError('Invalid Request Type')
-
-            if response.status_code != 200:
-                content = response.json()
-                raise errors.APIError(content['ERROR'])
+                self.__cache.invalidate_write(pattern)
+        return content
 
-        except (requests.ConnectionError, requests.Timeout) as e:
-            raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
-
-        return response.json()
+    @contextmanager
+    def serve_stale(self, max_stale=None):
+        """
+            Let reads inside the block return a cached response that is up to max_stale seconds past its TTL
+            immediately, while the cache's background refresher fetches a new one
+        :param max_stale: float, seconds, overrides the cache's max_stale for this block
+        :return: context manager yielding a cache.Staleness, whose stale flag is set if any read was served stale
+        """
+        if self.__cache is None:
+            raise errors.ValidationError('serve_stale requires a cache')
+        staleness = cache_.Staleness(max_stale)
+        token = cache_.serving_stale.set(staleness)
+        try:
+            yield staleness
+        finally:
+            cache_.serving_stale.reset(token)
+
+    def __observe_cache(self, endpoint, event):
+        if self.__observer is not None:
+            self.__observer.on_cache(self.__url.pattern(endpoint), event)
+
+    def __decode(self, cls, response):
+        if self.__observer is None:
+            return decoders.decode(cls, response, self.__interner, self.__compact_records)
+        started = time.perf_counter()
+        result = decoders.decode(cls, response, self.__interner, self.__compact_records)
+        self.__observer.on_decode(cls.__name__, 0 if result is None else 1, time.perf_counter() - started)
+        return result
+
+    def __decode_page(self, cls, response, lazy=False, fields=None):
+        if self.__observer is not None:
+            started = time.perf_counter()
+        if lazy or fields:
+            result = views.decode_page(cls, response, self.__interner, fields)
+        else:
+            result = decoders.decode_page(cls, response, self.__interner, self.__compact_records)
+        if self.__observer is not None:
+            self.__observer.on_decode(cls.__name__, len(result) if result else 0, time.perf_counter() - started)
+        return result
 
-    def get_audio_recordings_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None):
+    def get_audio_recordings_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None,
+                                  lazy: bool = False, fields: List[str] = None):
         """
             Get a list of the phone call recordings.
         :param items_per_page: integer, defaults to 10 records returned per request
@@ -54,27 +191,31 @@ class Skyetel:
         :param query: string, wildcard search on all string fields
         :param search: dict, format 'field':'query'
         :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
-        :return: list[AudioRecording], List of AudioRecording objects
-        """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if query:
-            parameters += '&filter[query]={}'.format(query)
-        if search:
-            for field in search:
-                parameters += '&filter[{}]={}'.format(field, search[field])
-        if sort:
-            parameters += '&sort={}'.format(sort[0])
-            for x in range(1, len(sort)):
-                parameters += ',{}'.format(sort[x])
-
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[AudioRecording], List of AudioRecording objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
         response = self.__make_api_request('GET', self.__url.audio_recordings_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['insert_time'] = datetime.strptime(response[x]['insert_time'], SKYETEL_DATESTRING)
-                response[x]['start_time'] = datetime.strptime(response[x]['start_time'], SKYETEL_DATESTRING)
-                response[x]['org'] = responses.Organization(**response[x]['org'])
-                response[x] = responses.AudioRecording(**response[x])
-        return response
+        return self.__decode_page(responses.AudioRecording, response, lazy, fields)
+
+    def iter_audio_recordings(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                              sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Iterate over all phone call recordings, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: generator[AudioRecording], AudioRecording objects in server order
+        """
+        def fetch_page(limit, offset):
+            return self.get_audio_recordings_list(limit, offset, query=query, search=search, sort=sort,
+                                                  lazy=lazy, fields=fields)
+        return pagination.iter_records(fetch_page, items_per_page, page_offset)
 
     def get_audio_recording_url(self, recording_id):
         """
@@ -85,7 +226,22 @@ class Skyetel:
         response = self.__make_api_request('GET', self.__url.audio_recording_download_url(recording_id))
         return response.get('download_url', None)
 
-    def get_audio_transcriptions_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None):
+    def download_audio_recordings(self, recordings, directory, max_workers: int = 4):
+        """
+            Download call recording audio files to a directory, resuming partial files and skipping finished ones
+        :param recordings: iterable of AudioRecording or integer recording ids; only AudioRecording sizes are verified
+        :param directory: string, destination directory, created if missing
+        :param max_workers: integer, concurrent downloads
+        :return: list[downloads.DownloadReport], one per recording in input order
+        """
+        downloader = downloads.RecordingDownloader(self, directory, max_workers)
+        try:
+            return downloader.download(recordings)
+        finally:
+            downloader.close()
+
+    def get_audio_transcriptions_list(self, items_per_page=10, page_offset=0, query=None, search=None, sort=None,
+                                      lazy: bool = False, fields: List[str] = None):
         """
             Get a list of all phone call transcriptions
         :param items_per_page: integer, defaults to 10 records returned per request
@@ -93,27 +249,31 @@ class Skyetel:
         :param query: string, wildcard search on all string fields
         :param search: dict, format 'field':'query'
         :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
-        :return: list[AudioTranscription], list of AudioTranscription objects
-        """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if query:
-            parameters += '&filter[query]={}'.format(query)
-        if search:
-            for field in search:
-                parameters += '&filter[{}]={}'.format(field, search[field])
-        if sort:
-            parameters += '&sort={}'.format(sort[0])
-            for x in range(1, len(sort)):
-                parameters += ',{}'.format(sort[x])
-
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[AudioTranscription], list of AudioTranscription objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
         response = self.__make_api_request('GET', self.__url.audio_transcriptions_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['insert_time'] = datetime.strptime(response[x]['insert_time'], SKYETEL_DATESTRING)
-                response[x]['start_time'] = datetime.strptime(response[x]['start_time'], SKYETEL_DATESTRING)
-                response[x]['org'] = responses.Organization(**response[x]['org'])
-                response[x] = responses.AudioTranscription(**response[x])
-        return response
+        return self.__decode_page(responses.AudioTranscription, response, lazy, fields)
+
+    def iter_audio_transcriptions(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                                  sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Iterate over all phone call transcriptions, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: generator[AudioTranscription], AudioTranscription objects in server order
+        """
+        def fetch_page(limit, offset):
+            return self.get_audio_transcriptions_list(limit, offset, query=query, search=search, sort=sort,
+                                                      lazy=lazy, fields=fields)
+        return pagination.iter_records(fetch_page, items_per_page, page_offset)
 
     def get_audio_transcription_url(self, transcription_id):
         """
@@ -130,14 +290,47 @@ class Skyetel:
         :param transcription_id: integer, ID of a call transcription from transcription list
         :return: dict, dictionary of both parties text and timestamps
         """
+        if self.__transcript_cache is not None:
+            transcript = self.__transcript_cache.get(transcription_id)
+            if transcript is not None:
+                return transcript
+
         response = self.__make_api_request('GET', self.__url.audio_transcription_download_url(transcription_id))
         url = response.get('download_url', '')
         if url:
-            transcript = requests.get(url).json()
+            timeout = (self.__download_timeout, self.__download_timeout)
+            download = self.__transport.request('GET', url, timeout=timeout)
+            transcript = transcripts.decode_download(download.status_code, download.content)
+            if self.__transcript_cache is not None:
+                self.__transcript_cache.put(transcription_id, transcript)
             return transcript
         else:
             return None
 
+    def fetch_transcripts(self, transcription_ids, max_workers: int = 8):
+        """
+            Get the text logs of many call transcriptions concurrently, reading cached ones from disk. A failing ID
+            does not stop the others; its error is returned with the batch.
+        :param transcription_ids: iterable of integer transcription IDs
+        :param max_workers: integer, concurrent fetches, API calls are further limited by the rate budget
+        :return: transcripts.TranscriptBatch, text logs by ID and the errors of the IDs that failed
+        """
+        def fetch(transcription_id):
+            try:
+                return self.get_audio_transcription_text(transcription_id), None
+            except errors.Error as e:
+                return None, e
+
+        transcription_ids = list(transcription_ids)
+        batch = transcripts.TranscriptBatch()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for transcription_id, (transcript, error) in zip(transcription_ids, executor.map(fetch, transcription_ids)):
+                if error is None:
+                    batch.transcripts[transcription_id] = transcript
+                else:
+                    batch.failed[transcription_id] = error
+        return batch
+
     def get_billing_balance(self):
         """
             Get the remaining balance on the account
@@ -153,28 +346,36 @@ class Skyetel:
         :param month: integer, single or double digit, with January corresponding to 1
         :return: BillingStatement
         """
-        parameters = '?'
-        if year:
-            parameters += 'year={}'.format(year)
-            if month:
-                parameters += '&'
-        if month:
-            parameters += 'month={}'.format(month)
-        response = self.__make_api_request('GET', self.__url.organization_statement_url() + parameters)
-        if response:
-            if response['transactions']:
-                for x in range(0, len(response['transactions'])):
-                    response['transactions'][x]['transaction_date'] = datetime.strptime(
-                        response['transactions'][x]['transaction_date'], SKYETEL_DATESTRING)
-                    response['transactions'][x] = responses.StatementTransaction(**response['transactions'][x])
-            if response['taxes']:
-                for x in range(0, len(response['taxes'])):
-                    response['taxes'][x] = responses.StatementTax(**response['taxes'][x])
-            if response['statement']:
-                response['statement']['totals']['phone_numbers'] = responses.PhoneNumberTotals(
-                    **response['statement']['totals']['phone_numbers'])
-                response['statement'] = responses.StatementTotals(**response['statement']['totals'])
-            response = responses.BillingStatement(**response)
+        if year and month:
+            response = self.__monthly(statements.ORGANIZATION, self.__url.organization_statement_url(), year, month)
+        else:
+            parameters = builders.month_parameters(year, month)
+            response = self.__make_api_request('GET', self.__url.organization_statement_url() + parameters)
+        return self.__decode(responses.BillingStatement, response)
+
+    def get_organization_statement_range(self, start, end, max_workers: int = 8):
+        """
+            Get the organization statements of every month in a range, fetched concurrently. With a statement cache,
+            closed months are requested once and read from disk afterwards.
+        :param start: (year, month) tuple, or a date, first month
+        :param end: (year, month) tuple, or a date, last month, included
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: dict, (year, month) to BillingStatement, in month order
+        """
+        month_list = statements.months(start, end)
+        url = self.__url.organization_statement_url()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = list(executor.map(lambda key: self.__monthly(statements.ORGANIZATION, url, *key), month_list))
+        return {key: self.__decode(responses.BillingStatement, response) for key, response in zip(month_list, fetched)}
+
+    def __monthly(self, kind, url, year, month):
+        # Raw response for one month's statements, read from the statement cache once the month has closed
+        cache = self.__statement_cache if statements.is_closed(year, month) else None
+        response = cache.get(self.__x_auth_sid, kind, year, month) if cache is not None else None
+        if response is None:
+            response = self.__make_api_request('GET', url + builders.month_parameters(year, month))
+            if cache is not None:
+                cache.put(self.__x_auth_sid, kind, year, month, response)
         return response
 
     def get_endpoints_list(self, items_per_page=10, page_offset=0):
@@ -184,15 +385,18 @@ class Skyetel:
         :param page_offset: integer, combines with items_per_page
         :return: list[Endpoint], list of Endpoint objects
         """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
+        parameters = builders.page_parameters(items_per_page, page_offset)
         response = self.__make_api_request('GET', self.__url.endpoints_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['endpoint_group'] = responses.EndpointGroup(**response[x]['endpoint_group'])
-                response[x]['org'] = responses.Organization(org_id=response[x]['org']['id'],
-                                                            org_name=response[x]['org']['name'])
-                response[x] = responses.Endpoint(**response[x])
-        return response
+        return self.__decode_page(responses.Endpoint, response)
+
+    def iter_endpoints(self, items_per_page: int = 100, page_offset: int = 0):
+        """
+            Iterate over all SIP Endpoints, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :return: generator[Endpoint], Endpoint objects in server order
+        """
+        return pagination.iter_records(self.get_endpoints_list, items_per_page, page_offset)
 
     def create_endpoint(self, ip, priority, description, endpoint_group_id, endpoint_group_name, port=5060,
                         transport="udp"):
@@ -207,15 +411,10 @@ class Skyetel:
         :param transport: string, SIP Transport method, UDP (default) or TCP
         :return: Endpoint, object representation of the created Endpoint
         """
-        parameters = {'ip': ip, 'port': port, 'transport': transport, 'priority': priority, 'description': description,
-                      'endpoint_group_id': endpoint_group_id, 'endpoint_group_name': endpoint_group_name}
+        parameters = builders.endpoint_data(ip, priority, description, endpoint_group_id, endpoint_group_name, port,
+                                            transport)
         response = self.__make_api_request('POST', self.__url.endpoints_url(), data=parameters)
-        if response:
-            response['endpoint_group'] = responses.EndpointGroup(**response['endpoint_group'])
-            response['org'] = responses.Organization(org_id=response['org']['id'],
-                                                     org_name=response['org']['name'])
-            response = responses.Endpoint(**response)
-        return response
+        return self.__decode(responses.Endpoint, response)
 
     def update_endpoint(self, endpoint_id, ip, priority, description, endpoint_group_id, endpoint_group_name, port=5060,
                         transport="udp"):
@@ -231,15 +430,33 @@ class Skyetel:
         :param transport: string, SIP Transport method, UDP (default) or TCP
         :return: Endpoint, object representation of the updated Endpoint
         """
-        parameters = {'ip': ip, 'port': port, 'transport': transport, 'priority': priority, 'description': description,
-                      'endpoint_group_id': endpoint_group_id, 'endpoint_group_name': endpoint_group_name}
+        parameters = builders.endpoint_data(ip, priority, description, endpoint_group_id, endpoint_group_name, port,
+                                            transport)
         response = self.__make_api_request('PATCH', self.__url.endpoint_url(endpoint_id), data=parameters)
-        if response:
-            response['endpoint_group'] = responses.EndpointGroup(**response['endpoint_group'])
-            response['org'] = responses.Organization(org_id=response['org']['id'],
-                                                     org_name=response['org']['name'])
-            response = responses.Endpoint(**response)
-        return response
+        return self.__decode(responses.Endpoint, response)
+
+    def plan_endpoints(self, desired: Dict[responses.EndpointGroup, List[responses.EndpointConfig]]):
+        """
+            Dry run of reconcile_endpoints: compare the desired endpoints with every current Endpoint
+        :param desired: dict, EndpointGroup to the list of EndpointConfig it should contain
+        :return: reconcile.EndpointPlan, creates, updates, unchanged and unmanaged endpoints
+        """
+        return reconcile.plan(desired, self.iter_endpoints())
+
+    def reconcile_endpoints(self, desired: Dict[responses.EndpointGroup, List[responses.EndpointConfig]],
+                            plan: reconcile.EndpointPlan = None, max_workers: int = 8):
+        """
+            Create and update Endpoints concurrently until each group matches the desired state. Only real changes
+            are written and nothing is deleted.
+        :param desired: dict, EndpointGroup to the list of EndpointConfig it should contain
+        :param plan: EndpointPlan, a reviewed result of plan_endpoints to apply instead of planning again
+        :param max_workers: integer, concurrent write requests, further limited by the rate budget
+        :return: list[reconcile.ChangeReport], one per create or update in plan order
+        """
+        if plan is None:
+            plan = self.plan_endpoints(desired)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda change: reconcile.apply(self, change), plan.writes))
 
     def get_phonenumber_e911(self, phonenumber_id):
         """
@@ -248,9 +465,7 @@ class Skyetel:
         :return: E911Address, object representation of the associated E911 Address
         """
         response = self.__make_api_request('GET', self.__url.phonenumber_e911address_url(phonenumber_id))
-        if response:
-            response = responses.E911Address(**response)
-        return response
+        return self.__decode(responses.E911Address, response)
 
     def create_phonenumber_e911(self, phonenumber_id, caller_name, address1, address2, community, state, postal_code):
         """
@@ -264,13 +479,10 @@ class Skyetel:
         :param postal_code: string, Postal Code for Emergency Response
         :return: E911Address, object representation of the associated E911 Address
         """
-        parameters = {'caller_name': caller_name, 'address1': address1, 'address2': address2, 'community': community,
-                      'state': state, 'postal_code': postal_code}
+        parameters = builders.e911_data(caller_name, address1, address2, community, state, postal_code)
         response = self.__make_api_request('POST', self.__url.phonenumber_e911address_url(phonenumber_id),
                                            data=parameters)
-        if response:
-            response = responses.E911Address(**response)
-        return response
+        return self.__decode(responses.E911Address, response)
 
     def update_phonenumber_e911(self, phonenumber_id: int, caller_name, address1, address2, community, state,
                                 postal_code):
@@ -285,16 +497,13 @@ class Skyetel:
         :param postal_code: string, Postal Code for Emergency Response
         :return: E911Address, object representation of the associated E911 Address
         """
-        parameters = {'caller_name': caller_name, 'address1': address1, 'address2': address2, 'community': community,
-                      'state': state, 'postal_code': postal_code}
+        parameters = builders.e911_data(caller_name, address1, address2, community, state, postal_code)
         response = self.__make_api_request('PATCH', self.__url.phonenumber_e911address_url(phonenumber_id),
                                            data=parameters)
-        if response:
-            response = responses.E911Address(**response)
-        return response
+        return self.__decode(responses.E911Address, response)
 
     def get_phonenumbers(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None,
-                         sort: List = None):
+                         sort: List = None, lazy: bool = False, fields: List[str] = None):
         """
             Get a list of all Phone Numbers associated with the organization account
         :param items_per_page: integer, defaults to 10 records returned per request
@@ -302,43 +511,61 @@ class Skyetel:
         :param query: string, wildcard search on all string fields
         :param search: dict, format 'field':'query'
         :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
-        :return: list[PhoneNumber], list of PhoneNumber objects
-        """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if query:
-            parameters += '&filter[query]={}'.format(query)
-        if search:
-            for field in search:
-                parameters += '&filter[{}]={}'.format(field, search[field])
-        if sort:
-            parameters += '&sort={}'.format(sort[0])
-            for x in range(1, len(sort)):
-                parameters += ',{}'.format(sort[x])
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[PhoneNumber], list of PhoneNumber objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
         response = self.__make_api_request('GET', self.__url.phonenumbers_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['number'] = int(response[x]['number'])
-                if response[x]['forward']:
-                    response[x]['forward'] = int(response[x]['forward'])
-                if response[x]['failover']:
-                    response[x]['failover'] = int(response[x]['failover'])
-                if response[x]['endpoint_group']:
-                    response[x]['endpoint_group'] = responses.EndpointGroup(**response[x]['endpoint_group'])
-                if response[x]['tenant']:
-                    response[x]['tenant'] = responses.Tenant(**response[x]['tenant'])
-                if response[x]['origination']:
-                    response[x]['origination'] = responses.Origination(**response[x]['origination'])
-                if response[x]['e911address']:
-                    response[x]['e911address'] = responses.E911Address(**response[x]['e911address'])
-                response[x]['intl_balance'] = float(response[x]['intl_balance'])
-                response[x]['intl_reserve'] = float(response[x]['intl_reserve'])
-                response[x]['org']['account_number'] = int(response[x]['org']['account_number'])
-                response[x]['org']['support_pin'] = int(response[x]['org']['support_pin'])
-                response[x]['org']['balance'] = float(response[x]['org']['balance'])
-                response[x]['org']['auto_recharge_reserve'] = float(response[x]['org']['auto_recharge_reserve'])
-                response[x]['org'] = responses.ExtendedOrganization(**response[x]['org'])
-                response[x] = responses.PhoneNumber(**response[x])
-        return response
+        return self.__decode_page(responses.PhoneNumber, response, lazy, fields)
+
+    def iter_phonenumbers(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                          sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Iterate over all Phone Numbers in the organization account, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: generator[PhoneNumber], PhoneNumber objects in server order
+        """
+        def fetch_page(limit, offset):
+            return self.get_phonenumbers(limit, offset, query=query, search=search, sort=sort,
+                                         lazy=lazy, fields=fields)
+        return pagination.iter_records(fetch_page, items_per_page, page_offset)
+
+    def crawl_phonenumbers(self, items_per_page=100, max_workers: int = 8, total: int = None, query: str = None,
+                           search: Dict = None, sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Get every Phone Number by fetching all pages concurrently, which takes a few round trips instead of one
+            per page. Raises OffsetShift if numbers keep moving between pages while they are read.
+        :param items_per_page: integer, records per request, at most one less than the server's page size cap
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :param total: integer, expected count; defaults to the local and toll-free counts, or is probed when
+            filtering
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], sort fields, defaults to ascending id so numbers added mid-crawl land at the end
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; id is always included
+        :return: list[PhoneNumber], PhoneNumber objects, or LazyRecord views of them, in server order
+        """
+        sort = sort or ['id']
+        if fields and 'id' not in fields:
+            fields = ['id'] + list(fields)
+
+        def fetch_page(limit, offset):
+            return self.get_phonenumbers(limit, offset, query=query, search=search, sort=sort,
+                                         lazy=lazy, fields=fields)
+        if total is None:
+            if query or search:
+                total = pagination.probe_total(fetch_page, items_per_page, max_workers)
+            else:
+                total = self.get_local_phonunumbers_count() + self.get_tollfree_phonenumbers_count()
+        return pagination.crawl(fetch_page, total, items_per_page, max_workers=max_workers)
 
     def create_off_network_phonenumber(self, number: str):
         """
@@ -348,9 +575,7 @@ class Skyetel:
         """
         parameters = {'number': str(number)}
         response = self.__make_api_request('POST', self.__url.phonenumbers_offnetwork_url(), json=parameters)
-        if response:
-            response = responses.OffNetworkPhoneNumber(**response)
-        return response
+        return self.__decode(responses.OffNetworkPhoneNumber, response)
 
     def update_phonenumber(self, phonenumber_id: int, update_data: responses.PhoneNumberUpdate):
         """
@@ -361,9 +586,49 @@ class Skyetel:
         """
         data = update_data.as_dict()
         response = self.__make_api_request('PATCH', self.__url.phonenumber_url(phonenumber_id), data=data)
-        if response:
-            response = responses.PhoneNumberUpdate(**response)
-        return response
+        return self.__decode(responses.PhoneNumberUpdate, response)
+
+    def update_phonenumbers(self, updates, current: List[responses.PhoneNumber] = None, max_workers: int = 8):
+        """
+            Apply many Phone Number updates concurrently, skipping those that would change nothing and sending only
+            the fields that differ from the current state
+        :param updates: iterable of (phonenumber_id, PhoneNumberUpdate) pairs
+        :param current: list[PhoneNumber], current state to diff against. If None, each Phone Number is fetched
+            with a search by id just before its update, one extra request per update; for large batches, pass the
+            result of crawl_phonenumbers instead, which costs one request per page of the inventory
+        :param max_workers: integer, concurrent PATCH requests, further limited by the rate budget
+        :return: list[bulk.UpdateReport], one per update in input order
+        """
+        updates = list(updates)
+        by_id = {phonenumber.id: phonenumber for phonenumber in current or []}
+        fetch_current = self.__current_phonenumber if current is None else None
+
+        def apply(item):
+            phonenumber_id, update = item
+            return bulk.apply(self.update_phonenumber, phonenumber_id, update, by_id.get(phonenumber_id),
+                              fetch_current)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(apply, updates))
+
+    def __current_phonenumber(self, phonenumber_id):
+        # Current state of one Phone Number, limited to the fields an update can change. A search may match other
+        # numbers, and diffing against one of those could skip a needed update, so anything else counts as unknown.
+        found = self.get_phonenumbers(1, 0, search={'id': phonenumber_id}, fields=bulk.CURRENT_FIELDS)
+        return next((phonenumber for phonenumber in found or () if phonenumber.id == phonenumber_id), None)
+
+    def apply_phonenumber_update(self, update: responses.PhoneNumberUpdate, phonenumbers: List[responses.PhoneNumber],
+                                 max_workers: int = 8):
+        """
+            Apply one update to every Phone Number in a result, e.g. from get_phonenumbers with a search
+        :param update: PhoneNumberUpdate, object containing changes to apply to each Phone Number
+        :param phonenumbers: list[PhoneNumber], numbers to update, also used as their current state
+        :param max_workers: integer, concurrent PATCH requests, further limited by the rate budget
+        :return: list[bulk.UpdateReport], one per Phone Number in input order
+        """
+        phonenumbers = list(phonenumbers)
+        return self.update_phonenumbers([(phonenumber.id, update) for phonenumber in phonenumbers], phonenumbers,
+                                        max_workers)
 
     def get_available_phonenumbers(self, search_filter: responses.PhoneNumberFilter = None):
         """
@@ -376,7 +641,8 @@ class Skyetel:
         if search_filter:
             params = search_filter.params()
         response = self.__make_api_request('GET', self.__url.phonenumbers_ordersearch_url() + params)
-        return response
+        # A copy, the response may be shared with the cache and with coalesced callers
+        return list(response)
 
     def get_rate_centers(self, state: str = None):
         """
@@ -388,10 +654,7 @@ class Skyetel:
         if state:
             params = '?state={}'.format(state)
         response = self.__make_api_request('GET', self.__url.phonenumbers_ratecenters_url() + params)
-        if response:
-            for x in range(0, len(response)):
-                response[x] = responses.RateCenter(**response[x])
-        return response
+        return self.__decode_page(responses.RateCenter, response)
 
     def order_phonenumbers(self, number_list: List[responses.NumberPurchase]):
         """
@@ -399,14 +662,28 @@ class Skyetel:
         :param number_list: list[NumberPurchase], List of NumberPurchase objects with associated MOU
         :return: list[PhoneNumberUpdate], List of PhoneNumberUpdate objects
         """
-        data = {}
-        for num in number_list:
-            data['numbers[{}][mou]'.format(num.number)] = num.mou
+        data = builders.order_data(number_list)
         response = self.__make_api_request('POST', self.__url.phonenumbers_order_url(), data=data)
-        if response:
-            for x in range(0, len(response)):
-                response[x] = responses.PhoneNumberUpdate(**response[x])
-        return response
+        return self.__decode_page(responses.PhoneNumberUpdate, response)
+
+    def provision_phonenumbers(self, filters: List[responses.PhoneNumberFilter], mou: int, batch_size: int = 100,
+                               max_workers: int = 8, margin: float = provisioning.MARGIN_SECONDS,
+                               max_wait: float = provisioning.MAX_WAIT_SECONDS):
+        """
+            Search with many filters concurrently and order the numbers found in batches before their 10 minute holds
+            expire, the numbers closest to expiry first. Orders that are due go out ahead of further searches.
+            Numbers found by several searches are ordered once.
+        :param filters: list[PhoneNumberFilter], one order search each
+        :param mou: integer, MOU of every NumberPurchase
+        :param batch_size: integer, numbers per order
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :param margin: float, seconds of hold that must remain for a number to be ordered, otherwise it is lost
+        :param max_wait: float, seconds a number waits for a full batch before a partial one is ordered
+        :return: provisioning.ProvisionReport, numbers ordered, numbers lost to expiry and failed requests
+        """
+        tracker = provisioning.HoldTracker(mou, batch_size, margin=margin, max_wait=max_wait)
+        return provisioning.provision(self.get_available_phonenumbers, self.order_phonenumbers, filters, tracker,
+                                      max_workers)
 
     def get_local_phonunumbers_count(self):
         """
@@ -425,7 +702,7 @@ class Skyetel:
         return int(response.get('TOTAL', 0))
 
     def get_sms_receipts(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None,
-                         sort: List = None):
+                         sort: List = None, lazy: bool = False, fields: List[str] = None):
         """
             Get a list of received SMS/MMS messages
         :param items_per_page: integer, defaults to 10 records returned per request
@@ -433,30 +710,31 @@ class Skyetel:
         :param query: string, wildcard search on all string fields
         :param search: dict, format 'field':'query'
         :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
-        :return: list[SMSMessage], list of SMSMessage objects
-        """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if query:
-            parameters += '&filter[query]={}'.format(query)
-        if search:
-            for field in search:
-                parameters += '&filter[{}]={}'.format(field, search[field])
-        if sort:
-            parameters += '&sort={}'.format(sort[0])
-            for x in range(1, len(sort)):
-                parameters += ',{}'.format(sort[x])
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[SMSMessage], list of SMSMessage objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
         response = self.__make_api_request('GET', self.__url.smsreceipts_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['time'] = datetime.strptime(response[x]['time'], SKYETEL_DATESTRING)
-                response[x]['cost'] = float(response[x]['cost'])
-                response[x]['org']['account_number'] = int(response[x]['org']['account_number'])
-                response[x]['org']['support_pin'] = int(response[x]['org']['support_pin'])
-                response[x]['org']['balance'] = float(response[x]['org']['balance'])
-                response[x]['org']['auto_recharge_reserve'] = float(response[x]['org']['auto_recharge_reserve'])
-                response[x]['org'] = responses.ExtendedOrganization(**response[x]['org'])
-                response[x] = responses.SMSMessage(**response[x])
-        return response
+        return self.__decode_page(responses.SMSMessage, response, lazy, fields)
+
+    def iter_sms_receipts(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                          sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Iterate over all received SMS/MMS messages, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: generator[SMSMessage], SMSMessage objects in server order
+        """
+        def fetch_page(limit, offset):
+            return self.get_sms_receipts(limit, offset, query=query, search=search, sort=sort,
+                                         lazy=lazy, fields=fields)
+        return pagination.iter_records(fetch_page, items_per_page, page_offset)
 
     def get_endpoint_health(self, items_per_page: int = 10, page_offset: int = 0):
         """
@@ -465,12 +743,18 @@ class Skyetel:
         :param page_offset: integer, combines with items_per_page
         :return: list[EndpointHealth], list of EndpointHealth objects
         """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
+        parameters = builders.page_parameters(items_per_page, page_offset)
         response = self.__make_api_request('GET', self.__url.endpoint_health_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x] = responses.EndpointHealth(**response[x])
-        return response
+        return self.__decode_page(responses.EndpointHealth, response)
+
+    def iter_endpoint_health(self, items_per_page: int = 100, page_offset: int = 0):
+        """
+            Iterate over all Endpoints and their associated health status, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :return: generator[EndpointHealth], EndpointHealth objects in server order
+        """
+        return pagination.iter_records(self.get_endpoint_health, items_per_page, page_offset)
 
     def get_daily_traffic_counts(self, items_per_page: int = 10, page_offset: int = 0, start_time_min: datetime = None,
                                  start_time_max: datetime = None, tz_string: str = None):
@@ -483,19 +767,9 @@ class Skyetel:
         :param tz_string: string, standard Time Zone string (ex. America/New_York)
         :return: list[TrafficCount], list of TrafficCount objects
         """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if start_time_min:
-            parameters += '&start_time_min={}'.format(start_time_min.strftime(SKYETEL_DATESTRING))
-        if start_time_max:
-            parameters += '&start_time_max={}'.format(start_time_max.strftime(SKYETEL_DATESTRING))
-        if tz_string:
-            parameters += '&tz={}'.format(tz_string)
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
         response = self.__make_api_request('GET', self.__url.traffic_count_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['date'] = datetime.strptime(response[x]['date'], SKYETEL_DATESTRING)
-                response[x] = responses.TrafficCount(**response[x])
-        return response
+        return self.__decode_page(responses.TrafficCount, response)
 
     def get_daily_traffic_channels(self, items_per_page: int = 10, page_offset: int = 0,
                                    start_time_min: datetime = None,
@@ -509,20 +783,9 @@ class Skyetel:
         :param tz_string: string, standard Time Zone string (ex. America/New_York)
         :return: list[ChannelCount], list of ChannelCount objects
         """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if start_time_min:
-            parameters += '&start_time_min={}'.format(start_time_min.strftime(SKYETEL_DATESTRING))
-        if start_time_max:
-            parameters += '&start_time_max={}'.format(start_time_max.strftime(SKYETEL_DATESTRING))
-        if tz_string:
-            parameters += '&tz={}'.format(tz_string)
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
         response = self.__make_api_request('GET', self.__url.channel_count_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['date'] = datetime.strptime(response[x]['date'], SKYETEL_DATESTRING)
-                response[x]['channel_count'] = int(response[x]['channel_count'])
-                response[x] = responses.ChannelCount(**response[x])
-        return response
+        return self.__decode_page(responses.ChannelCount, response)
 
     def get_hourly_call_count(self, items_per_page: int = 10, page_offset: int = 0,
                               start_time_min: datetime = None, start_time_max: datetime = None, tz_string: str = None):
@@ -535,20 +798,74 @@ class Skyetel:
         :param tz_string: string, standard Time Zone string (ex. America/New_York)
         :return: list[CallCount], list of CallCount objects
         """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if start_time_min:
-            parameters += '&start_time_min={}'.format(start_time_min.strftime(SKYETEL_DATESTRING))
-        if start_time_max:
-            parameters += '&start_time_max={}'.format(start_time_max.strftime(SKYETEL_DATESTRING))
-        if tz_string:
-            parameters += '&tz={}'.format(tz_string)
+        parameters = builders.traffic_parameters(items_per_page, page_offset, start_time_min, start_time_max, tz_string)
         response = self.__make_api_request('GET', self.__url.traffic_hourly_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['date'] = datetime.strptime(response[x]['date'], SKYETEL_TIMESTRING)
-                response[x]['call_count'] = int(response[x]['call_count'])
-                response[x] = responses.CallCount(**response[x])
-        return response
+        return self.__decode_page(responses.CallCount, response)
+
+    def get_daily_traffic_series(self, start_time_min: datetime, start_time_max: datetime,
+                                 chunk: timedelta = timedelta(days=31), tz_string: str = None, max_workers: int = 8):
+        """
+            Get per-day Traffic Counts over a long range as a compact array-backed series. The range is split into
+            day-aligned chunks fetched concurrently; rows repeated at chunk boundaries are kept once.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, columns inbound_minutes, outbound_minutes, inbound_count, outbound_count and
+            total_billing_cost
+        """
+        url = self.__url.traffic_count_url()
+        rows = self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.TrafficCount, rows)
+
+    def get_daily_channel_series(self, start_time_min: datetime, start_time_max: datetime,
+                                 chunk: timedelta = timedelta(days=31), tz_string: str = None, max_workers: int = 8):
+        """
+            Get per-day Channel usage over a long range as a compact array-backed series, fetched like
+            get_daily_traffic_series. Resampling keeps the peak, so series.resample('week').peaks(n=5) gives the
+            busiest weeks.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, column channel_count
+        """
+        url = self.__url.channel_count_url()
+        rows = self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.ChannelCount, rows)
+
+    def get_hourly_call_series(self, start_time_min: datetime, start_time_max: datetime,
+                               chunk: timedelta = timedelta(days=31), tz_string: str = None, max_workers: int = 8):
+        """
+            Get Calls placed per hour of day over a long range as a compact array-backed series. Each chunk reports
+            calls per hour of day, so the chunks' counts are added together.
+        :param start_time_min: datetime, start of the range
+        :param start_time_max: datetime, end of the range
+        :param chunk: timedelta, range covered by one request, rounded up to whole days
+        :param tz_string: string, standard Time Zone string (ex. America/New_York)
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: Series, column call_count, timestamps at the hours of 1900-01-01 like CallCount.date
+        """
+        url = self.__url.traffic_hourly_url()
+        rows = self.__traffic_rows(url, start_time_min, start_time_max, chunk, tz_string, max_workers)
+        return timeseries.Series.from_rows(responses.CallCount, rows, combine='sum')
+
+    def __traffic_rows(self, url, start, end, chunk, tz_string, max_workers, items_per_page=100):
+        # Raw rows of a traffic endpoint, one paginated walk per chunk with the chunks fetched concurrently. A daily
+        # chunk shorter than items_per_page days takes a single request.
+        def fetch(bounds):
+            rows = []
+            while True:
+                parameters = builders.traffic_parameters(items_per_page, len(rows), bounds[0], bounds[1], tz_string)
+                page = self.__make_api_request('GET', url + parameters) or []
+                rows.extend(page)
+                if len(page) < items_per_page:
+                    return rows
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(fetch, timeseries.chunk_ranges(start, end, chunk)))
+        return [row for rows in chunks for row in rows]
 
     def get_tenant_statements(self, year=None, month=None):
         """
@@ -557,27 +874,28 @@ class Skyetel:
         :param month: integer, single or double digit, with January corresponding to 1
         :return: list[TenantStatement], list of TenantStatement objects
         """
-        parameters = '?'
-        if year:
-            parameters += 'year={}'.format(year)
-            if month:
-                parameters += '&'
-        if month:
-            parameters += 'month={}'.format(month)
-        response = self.__make_api_request('GET', self.__url.tenant_statements_url() + parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['month'] = datetime.strptime(response[x]['month'], SKYETEL_DATESTRING)
-                response[x]['org'] = responses.Organization(org_id=response[x]['org']['id'],
-                                                            org_name=response[x]['org']['org_name'])
-                response[x]['tenant'] = responses.Tenant(**response[x]['tenant'])
-                response[x]['fields']['totals']['phone_numbers'] = \
-                    responses.TenantPhoneNumberTotals(**response[x]['fields']['totals']['phone_numbers'])
-                response[x]['fields']['totals'] = responses.TenantStatementTotals(**response[x]['fields']['totals'])
-                response[x] = responses.TenantStatement(id=response[x]['id'], month=response[x]['month'],
-                                                        org=response[x]['org'], tenant=response[x]['tenant'],
-                                                        totals=response[x]['fields']['totals'])
-        return response
+        if year and month:
+            response = self.__monthly(statements.TENANT, self.__url.tenant_statements_url(), year, month)
+        else:
+            parameters = builders.month_parameters(year, month)
+            response = self.__make_api_request('GET', self.__url.tenant_statements_url() + parameters)
+        return self.__decode_page(responses.TenantStatement, response)
+
+    def get_tenant_statement_range(self, start, end, max_workers: int = 8):
+        """
+            Get the Tenant Statements of every month in a range, fetched concurrently. With a statement cache, closed
+            months are requested once and read from disk afterwards.
+        :param start: (year, month) tuple, or a date, first month
+        :param end: (year, month) tuple, or a date, last month, included
+        :param max_workers: integer, concurrent requests, further limited by the rate budget
+        :return: dict, (year, month) to list[TenantStatement], in month order
+        """
+        month_list = statements.months(start, end)
+        url = self.__url.tenant_statements_url()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = list(executor.map(lambda key: self.__monthly(statements.TENANT, url, *key), month_list))
+        return {key: self.__decode_page(responses.TenantStatement, response)
+                for key, response in zip(month_list, fetched)}
 
     def get_tenant_invoices(self):
         """
@@ -585,11 +903,7 @@ class Skyetel:
         :return: list[TenantInvoice], list of TenantInvoice objects
         """
         response = self.__make_api_request('GET', self.__url.tenant_invoices_url())
-        if response:
-            for x in range(0, len(response)):
-                response[x]['scheduled_date'] = datetime.strptime(response[x]['scheduled_date'], SKYETEL_TIMESTRING)
-                response[x] = responses.TenantInvoice(**response[x])
-        return response
+        return self.__decode_page(responses.TenantInvoice, response)
 
     def create_onetime_tenant_invoice(self, tenant_id: int, billing: responses.TenantBillingProfile):
         """
@@ -598,9 +912,7 @@ class Skyetel:
         :param billing: TenantBillingProfile, a TenantBillingProfile object
         :return: string, Stripe Invoice ID
         """
-        data = asdict(billing)
-        for x in range(0, len(data.get('billing_products', []))):
-            data['billing_products'][x] = asdict(data['billing_products'][x])
+        data = builders.invoice_data(billing)
         response = self.__make_api_request('POST', self.__url.tenant_invoice_url(tenant_id), data=data)
         return response.get('stripe_invoice_id', None)
 
@@ -619,12 +931,10 @@ class Skyetel:
         :return: list[TenantBillingProduct], List of TenantBillingProduct objects
         """
         response = self.__make_api_request('GET', self.__url.tenant_products_url())
-        if response:
-            for x in range(0, len(response)):
-                response[x] = responses.TenantBillingProduct(**response[x])
-        return response
+        return self.__decode_page(responses.TenantBillingProduct, response)
 
-    def get_tenants(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None, sort: List = None):
+    def get_tenants(self, items_per_page=10, page_offset=0, query: str = None, search: Dict = None, sort: List = None,
+                    lazy: bool = False, fields: List[str] = None):
         """
             Get a list of Tenants
         :param items_per_page: integer, defaults to 10 records returned per request
@@ -632,30 +942,28 @@ class Skyetel:
         :param query: string, wildcard search on all string fields
         :param search: dict, format 'field':'query'
         :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
-        :return: list[ExtendedTenant], list of ExtendedTenant objects
-        """
-        parameters = '?page[limit]={}&page[offset]={}'.format(items_per_page, page_offset)
-        if query:
-            parameters += '&filter[query]={}'.format(query)
-        if search:
-            for field in search:
-                parameters += '&filter[{}]={}'.format(field, search[field])
-        if sort:
-            parameters += '&sort={}'.format(sort[0])
-            for x in range(1, len(sort)):
-                parameters += ',{}'.format(sort[x])
-        response = self.__make_api_request('GET', self.__url.tenants_url()+parameters)
-        if response:
-            for x in range(0, len(response)):
-                response[x]['phonenumber'] = int(response[x]['phonenumber'])
-                if response[x]['billing_profile']['billing_products']:
-                    for y in range(0, len(response[x]['billing_profile']['billing_products'])):
-                        response[x]['billing_profile']['billing_products'][x] = responses.TenantInvoiceProduct(
-                            **response[x]['billing_profile']['billing_products'][x])
-                response[x]['billing_profile'] = responses.TenantBillingProfile(**response[x]['billing_profile'])
-                response[x]['contact_phonenumber'] = int(response[x]['contact_phonenumber'])
-                response[x]['date_added'] = datetime.strptime(response[x]['date_added'], SKYETEL_DATESTRING)
-                response[x]['org'] = responses.Organization(org_id=response[x]['org']['id'],
-                                                            org_name=response[x]['org']['org_name'])
-                response[x] = responses.ExtendedTenant(**response[x])
-        return response
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: list[ExtendedTenant], list of ExtendedTenant objects, or LazyRecord views of them
+        """
+        parameters = builders.page_parameters(items_per_page, page_offset, query, search, sort)
+        response = self.__make_api_request('GET', self.__url.tenants_url() + parameters)
+        return self.__decode_page(responses.ExtendedTenant, response, lazy, fields)
+
+    def iter_tenants(self, items_per_page=100, page_offset=0, query: str = None, search: Dict = None,
+                     sort: List = None, lazy: bool = False, fields: List[str] = None):
+        """
+            Iterate over all Tenants, fetching the next page in the background
+        :param items_per_page: integer, defaults to 100 records fetched per request
+        :param page_offset: integer, offset of the first record to return
+        :param query: string, wildcard search on all string fields
+        :param search: dict, format 'field':'query'
+        :param sort: list[string], list of fields to sort, prefix a '-' for descending sort
+        :param lazy: bool, return LazyRecord views that convert each field on first access
+        :param fields: list[string], fields the views expose, implies lazy; other fields are never decoded
+        :return: generator[ExtendedTenant], ExtendedTenant objects in server order
+        """
+        def fetch_page(limit, offset):
+            return self.get_tenants(limit, offset, query=query, search=search, sort=sort,
+                                    lazy=lazy, fields=fields)
+        return pagination.iter_records(fetch_page, items_per_page, page_offset)
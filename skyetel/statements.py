@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from . import errors
+
+TENANT = 'tenant'
+ORGANIZATION = 'organization'
+
+# Days after a month ends before its statements count as final; late usage and adjustments are posted meanwhile
+GRACE_DAYS = 3
+
+
+def month_of(value):
+    """
+    :param value: (year, month) tuple, or a date or datetime
+    :return: tuple, (year, month)
+    """
+    if hasattr(value, 'year') and hasattr(value, 'month'):
+        return value.year, value.month
+    year, month = value
+    if not 1 <= month <= 12:
+        raise errors.ValidationError('Month must be between 1 and 12')
+    return int(year), int(month)
+
+
+def months(start, end):
+    """
+        Every month from start to end, both included
+    :param start: (year, month) tuple, or a date or datetime
+    :param end: (year, month) tuple, or a date or datetime
+    :return: list[tuple], (year, month) in order
+    """
+    (year, month), end = month_of(start), month_of(end)
+    if (year, month) > end:
+        raise errors.ValidationError('Start month is after end month')
+    result = []
+    while (year, month) <= end:
+        result.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return result
+
+
+def is_closed(year, month, now=None, grace_days=GRACE_DAYS):
+    """
+        A month is closed once it has ended in UTC and the grace period after it has passed; its statements never
+        change again
+    :param year: integer, four digit year
+    :param month: integer, January is 1
+    :param now: datetime, time to compare with, naive values taken as UTC, defaults to the current time
+    :param grace_days: integer, days after the end of the month before it counts as closed
+    :return: bool
+    """
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    if month == 12:
+        following = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        following = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+    return now >= following + timedelta(days=grace_days)
+
+
+class StatementCache:
+    """
+        On-disk cache of statements for closed months, one JSON file per account, statement type and month, so
+        clients of several accounts can share a directory. The raw API response is stored and decoded on read like
+        a fresh one. Entries never expire, because a closed month's statements are final.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: string, cache directory, created if missing
+        """
+        self.__directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, account, kind, year, month):
+        # The SID is hashed so any string makes a safe file name
+        account = hashlib.sha256(account.encode()).hexdigest()[:16]
+        return os.path.join(self.__directory, '{}-{}-{:04d}-{:02d}.json'.format(account, kind, int(year), int(month)))
+
+    def get(self, account, kind, year, month):
+        """
+        :param account: string, API SID the statements belong to
+        :param kind: string, TENANT or ORGANIZATION
+        :param year: integer, four digit year
+        :param month: integer, January is 1
+        :return: the cached JSON response, or None
+        """
+        try:
+            with open(self.path(account, kind, year, month)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, account, kind, year, month, response):
+        """
+            Store a closed month's response, replacing the file atomically so readers never see a partial one
+        :param account: string, API SID the statements belong to
+        :param kind: string, TENANT or ORGANIZATION
+        :param year: integer, four digit year
+        :param month: integer, January is 1
+        :param response: JSON response as returned by the API
+        :return: None
+        """
+        if not is_closed(year, month):
+            raise errors.ValidationError('Only statements of closed months can be cached')
+        path = self.path(account, kind, year, month)
+        temporary = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        with open(temporary, 'w') as f:
+            json.dump(response, f)
+        os.replace(temporary, path)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(*key))
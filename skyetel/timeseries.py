@@ -0,0 +1,174 @@
+import calendar
+import heapq
+import typing
+from array import array
+from datetime import datetime, timedelta
+
+from . import errors, decoders
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+PERIODS = {'hour': HOUR, 'day': DAY, 'week': WEEK}
+
+# Columns combined with max rather than sum when resampling: a peak of a peak, not a total
+PEAK_COLUMNS = {'channel_count'}
+
+# 1970-01-01 was a Thursday; weeks start on Monday
+_MONDAY = 4 * DAY
+
+
+def _epoch(value):
+    return calendar.timegm(value.timetuple())
+
+
+def _number(value):
+    # Integer fields can arrive as JSON floats or strings such as "12.5"; read those as floats rather than fail
+    if not value:
+        return 0
+    return float(value) if value.__class__ is str else value
+
+
+def _integral(values):
+    return all(value.__class__ is int or value.is_integer() for value in values)
+
+
+def chunk_ranges(start, end, chunk=timedelta(days=31)):
+    """
+        Split a time range into consecutive chunks aligned to whole days, so no day's row straddles two chunks
+    :param start: datetime, start of the range
+    :param end: datetime, end of the range
+    :param chunk: timedelta, chunk length, rounded up to whole days
+    :return: list[tuple], (start, end) per chunk, each ending one second before the next begins
+    """
+    if end < start:
+        raise errors.ValidationError('Range ends before it starts')
+    step = timedelta(days=max(1, -(-chunk // timedelta(days=1))))
+    ranges = []
+    lower = start
+    while lower <= end:
+        upper = min(datetime(lower.year, lower.month, lower.day) + step, end + timedelta(seconds=1))
+        ranges.append((lower, upper - timedelta(seconds=1)))
+        lower = upper
+    return ranges
+
+
+class Series:
+    """
+        Time series held in flat arrays: timestamps in epoch seconds and one array per value column. A year of
+        hourly points is a few hundred kilobytes instead of thousands of objects. Naive datetimes are taken as
+        wall-clock times in the zone the API was asked for.
+    """
+    __slots__ = ('timestamps', 'columns')
+
+    def __init__(self, timestamps, columns):
+        """
+        :param timestamps: array('q'), epoch seconds in ascending order
+        :param columns: dict, column name to an array of the same length
+        """
+        self.timestamps = timestamps
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, record_type, rows, combine='first'):
+        """
+            Build a series from raw JSON rows of TrafficCount, ChannelCount or CallCount, converting each field as
+            the decoder would but without creating a record per row. An integer column with fractional values, such
+            as minutes sent as "12.5", is kept as a float column.
+        :param record_type: dataclass type from skyetel.responses with a date field
+        :param rows: iterable of dict, rows in any order, possibly repeated across chunk boundaries
+        :param combine: string, 'first' keeps one row per timestamp, 'sum' adds rows with the same timestamp
+        :return: Series
+        """
+        specs = decoders.field_specs(record_type)
+        read_date = None
+        getters = {}
+        for spec in specs:
+            if spec[0] == 'date':
+                read_date = decoders.field_getter(spec)
+            else:
+                getters[spec[0]] = decoders.field_getter(spec)
+        if read_date is None:
+            raise errors.ValidationError('{} has no date field'.format(record_type.__name__))
+
+        points = {}
+        for row in rows:
+            date = read_date(row)
+            if not date:
+                continue
+            values = [_number(getter(row)) for getter in getters.values()]
+            timestamp = _epoch(date)
+            if timestamp not in points:
+                points[timestamp] = values
+            elif combine == 'sum':
+                points[timestamp] = [a + b for a, b in zip(points[timestamp], values)]
+
+        hints = typing.get_type_hints(record_type)
+        timestamps = array('q', sorted(points))
+        columns = {}
+        for index, name in enumerate(getters):
+            values = [points[timestamp][index] for timestamp in timestamps]
+            if hints[name] is not float and _integral(values):
+                columns[name] = array('q', (int(value) for value in values))
+            else:
+                columns[name] = array('d', values)
+        return cls(timestamps, columns)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __repr__(self):
+        return 'Series({} points, columns={})'.format(len(self), list(self.columns))
+
+    def datetimes(self):
+        """
+        :return: list[datetime], naive datetimes of the points
+        """
+        epoch = datetime(1970, 1, 1)
+        return [epoch + timedelta(seconds=timestamp) for timestamp in self.timestamps]
+
+    def resample(self, period, how=None):
+        """
+            Aggregate into coarser buckets, e.g. hour to day or day to week. Buckets without points are left out.
+        :param period: string, 'hour', 'day' or 'week' (starting on Monday)
+        :param how: dict, column name to 'sum' or 'max'; defaults to max for PEAK_COLUMNS and sum otherwise
+        :return: Series
+        """
+        if period not in PERIODS:
+            raise errors.ValidationError('Period must be one of {}'.format(', '.join(PERIODS)))
+        size = PERIODS[period]
+        offset = _MONDAY if period == 'week' else 0
+        how = dict(how or {})
+        reducers = {name: max if how.get(name, 'max' if name in PEAK_COLUMNS else 'sum') == 'max' else sum
+                    for name in self.columns}
+
+        buckets = []
+        bounds = []
+        for index, timestamp in enumerate(self.timestamps):
+            bucket = timestamp - (timestamp - offset) % size
+            if not buckets or buckets[-1] != bucket:
+                buckets.append(bucket)
+                bounds.append(index)
+        bounds.append(len(self.timestamps))
+
+        columns = {}
+        for name, values in self.columns.items():
+            reduce = reducers[name]
+            reduced = (reduce(values[bounds[index]:bounds[index + 1]]) for index in range(len(buckets)))
+            columns[name] = array(values.typecode, reduced)
+        return Series(array('q', buckets), columns)
+
+    def peaks(self, column='channel_count', n=1):
+        """
+            Points with the highest values of a column
+        :param column: string, column name
+        :param n: integer, number of points
+        :return: list[tuple], (datetime, value), highest first
+        """
+        values = self.columns[column]
+        best = heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+        epoch = datetime(1970, 1, 1)
+        return [(epoch + timedelta(seconds=self.timestamps[index]), values[index]) for index in best]
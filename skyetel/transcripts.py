@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict
+
+from . import errors
+
+
+@dataclass
+class TranscriptBatch:
+    # Transcription ID to text log, None where the transcription has no text log
+    transcripts: Dict = field(default_factory=dict)
+    # Transcription ID to the error that stopped its fetch
+    failed: Dict = field(default_factory=dict)
+
+
+def decode_download(status, body):
+    """
+        Check a transcript file response before it is used or cached. Storage servers answer errors with bodies of
+        their own, which must never be mistaken for a transcript.
+    :param status: integer, HTTP status of the file response
+    :param body: bytes, response body
+    :return: dict, transcript text log
+    """
+    if status >= 500:
+        raise errors.Unavailable('Transcript Unavailable: HTTP {}'.format(status))
+    if status != 200:
+        raise errors.APIError('Transcript download failed: HTTP {}'.format(status))
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise errors.APIError('Transcript download is not valid JSON') from None
+
+
+class TranscriptCache:
+    """
+        On-disk cache of transcript text logs, one JSON file per transcription id. Transcripts never change once they
+        are produced, so entries never expire.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: string, cache directory, created if missing
+        """
+        self.__directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, transcription_id):
+        return os.path.join(self.__directory, '{}.json'.format(int(transcription_id)))
+
+    def get(self, transcription_id):
+        """
+        :param transcription_id: integer, ID of a call transcription
+        :return: dict, the cached transcript, or None
+        """
+        try:
+            with open(self.path(transcription_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, transcription_id, transcript):
+        """
+            Store a transcript, replacing the file atomically so readers never see a partial one
+        :param transcription_id: integer, ID of a call transcription
+        :param transcript: dict, transcript text log
+        :return: None
+        """
+        path = self.path(transcription_id)
+        temporary = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        with open(temporary, 'w') as f:
+            json.dump(transcript, f)
+        os.replace(temporary, path)
+
+    def __contains__(self, transcription_id):
+        return os.path.exists(self.path(transcription_id))
@@ -0,0 +1,198 @@
+import json as json_
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from . import errors
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# (connect, read) seconds per endpoint class
+DEFAULT_TIMEOUTS = {
+    'read': (5, 30),
+    'write': (5, 60),
+    'search': (5, 60),
+    'stats': (5, 120),
+}
+
+# Route patterns, as produced by URLs.pattern, that are slower than ordinary reads
+_SLOW_ROUTES = {
+    '/phonenumbers/order/search': 'search',
+    '/phonenumbers/order/rate_centers': 'search',
+}
+
+
+def endpoint_class(request_type, pattern):
+    """
+        Classify a request for timeout purposes
+    :param request_type: string, HTTP method
+    :param pattern: string, route pattern of the URL
+    :return: string, a DEFAULT_TIMEOUTS key
+    """
+    if request_type != 'GET':
+        return 'write'
+    if pattern in _SLOW_ROUTES:
+        return _SLOW_ROUTES[pattern]
+    if pattern.startswith('/stats/'):
+        return 'stats'
+    return 'read'
+
+
+class Response:
+    """
+        Transport-neutral response: status code, case-insensitive headers, the raw body and the number of connection
+        retries it took
+    """
+    __slots__ = ('status_code', 'headers', 'content', 'retries')
+
+    def __init__(self, status_code, headers, content, retries=0):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.retries = retries
+
+    def json(self):
+        return json_.loads(self.content)
+
+
+class Transport:
+    """
+        Base class for the HTTP layer under the clients. Subclasses implement request() and close(), and raise
+        errors.Unavailable for connection failures and timeouts.
+    """
+    def __init__(self, pool_size=32, timeouts=None):
+        """
+        :param pool_size: integer, keep-alive connections kept per host
+        :param timeouts: dict, endpoint class to (connect, read) seconds, merged over DEFAULT_TIMEOUTS
+        """
+        self.pool_size = pool_size
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+
+    def timeout(self, endpoint_class_):
+        return self.timeouts.get(endpoint_class_, self.timeouts['read'])
+
+    def request(self, request_type, url, data=None, json=None, headers=None, timeout=None):
+        """
+        :param request_type: string, HTTP method
+        :param url: string, full URL
+        :param data: dict, form fields
+        :param json: JSON body
+        :param headers: dict, request headers
+        :param timeout: (connect, read) tuple in seconds
+        :return: Response
+        """
+        raise NotImplementedError
+
+    def warmup(self, url, connections=1):
+        """
+            Open keep-alive connections ahead of the first real request, so it skips the TCP and TLS handshakes
+        :param url: string, any URL on the host to connect to; the responses are discarded
+        :param connections: integer, connections to open concurrently, at most pool_size are kept
+        :return: None
+        """
+        connections = max(1, min(connections, self.pool_size))
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            for future in [executor.submit(self.request, 'HEAD', url, timeout=self.timeout('read'))
+                           for _ in range(connections)]:
+                future.result()
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    def __init__(self, pool_size=32, timeouts=None, max_retries=0):
+        """
+        :param pool_size: integer, keep-alive connections kept per host
+        :param timeouts: dict, endpoint class to (connect, read) seconds, merged over DEFAULT_TIMEOUTS
+        :param max_retries: integer, retries of failed connection attempts, handled by urllib3
+        """
+        super().__init__(pool_size, timeouts)
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+
+    def request(self, request_type, url, data=None, json=None, headers=None, timeout=None):
+        try:
+            response = self.__session.request(request_type, url, data=data, json=json, headers=headers,
+                                              timeout=timeout or self.timeout('read'))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
+        retries = getattr(response.raw, 'retries', None)
+        return Response(response.status_code, response.headers, response.content,
+                        len(retries.history) if retries else 0)
+
+    def close(self):
+        self.__session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+        Transport on a bare urllib3 PoolManager, skipping the requests layer
+    """
+    def __init__(self, pool_size=32, timeouts=None, max_retries=0):
+        """
+        :param pool_size: integer, keep-alive connections kept per host
+        :param timeouts: dict, endpoint class to (connect, read) seconds, merged over DEFAULT_TIMEOUTS
+        :param max_retries: integer, retries of failed connection attempts
+        """
+        super().__init__(pool_size, timeouts)
+        retries = urllib3.Retry(total=max_retries, redirect=False, raise_on_status=False) if max_retries else False
+        self.__pool = urllib3.PoolManager(num_pools=8, maxsize=pool_size, block=False, retries=retries)
+
+    def request(self, request_type, url, data=None, json=None, headers=None, timeout=None):
+        headers = dict(headers or {})
+        body = None
+        if json is not None:
+            body = json_.dumps(json).encode()
+            headers['Content-Type'] = 'application/json'
+        elif data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        connect, read = timeout or self.timeout('read')
+        try:
+            response = self.__pool.request(request_type, url, body=body, headers=headers,
+                                           timeout=urllib3.Timeout(connect=connect, read=read))
+        except urllib3.exceptions.HTTPError as e:
+            raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
+        return Response(response.status, response.headers, response.data,
+                        len(response.retries.history) if response.retries else 0)
+
+    def close(self):
+        self.__pool.clear()
+
+
+class HTTPXTransport(Transport):
+    """
+        Transport on httpx, multiplexing requests over HTTP/2 when the server supports it. Requires the optional
+        httpx package with its http2 extra.
+    """
+    def __init__(self, pool_size=32, timeouts=None, http2=True):
+        if httpx is None:
+            raise errors.ValidationError('HTTPXTransport requires the httpx package')
+        super().__init__(pool_size, timeouts)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        try:
+            self.__client = httpx.Client(http2=http2, limits=limits)
+        except ImportError:
+            raise errors.ValidationError('HTTP/2 requires the httpx[http2] extra') from None
+
+    def request(self, request_type, url, data=None, json=None, headers=None, timeout=None):
+        connect, read = timeout or self.timeout('read')
+        try:
+            response = self.__client.request(request_type, url, data=data, json=json, headers=headers,
+                                             timeout=httpx.Timeout(read, connect=connect))
+        except httpx.TransportError as e:
+            raise errors.Unavailable('API Unavailable: {}'.format(e)) from None
+        return Response(response.status_code, response.headers, response.content)
+
+    def close(self):
+        self.__client.close()
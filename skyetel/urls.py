@@ -1,6 +1,12 @@
+BASE_URL = "https://api.skyetel.com/v1"
+
+
 class URLs:
-    def __init__(self):
-        self.__base_url = "https://api.skyetel.com/v1"
+    def __init__(self, base_url=BASE_URL):
+        """
+        :param base_url: string, API root every route is appended to, e.g. an emulator's http://127.0.0.1:8080/v1
+        """
+        self.__base_url = base_url.rstrip('/')
 
         self.__audio_recordings = "/audio_recordings"
         self.__audio_recordings_download = "/audio_recordings/{id}/download"
@@ -50,6 +56,20 @@ class URLs:
         self.__faxes = "/vfaxes"
         self.__fax_download = "/vfaxes/{id}/download"
 
+    def base_url(self):
+        return self.__base_url
+
+    def pattern(self, url):
+        """
+            Reduce a request URL to its route, e.g. /phonenumbers/{id}, for caching and metrics
+        :param url: string, full request URL
+        :return: string, path relative to the API base with numeric segments replaced by {id}
+        """
+        path = url.split('?', 1)[0]
+        if path.startswith(self.__base_url):
+            path = path[len(self.__base_url):]
+        return '/'.join('{id}' if segment.isdigit() else segment for segment in path.split('/'))
+
     def audio_recordings_url(self):
         return self.__base_url + self.__audio_recordings
 
@@ -0,0 +1,87 @@
+from . import decoders, errors
+
+_view_classes = {}
+_MISSING = object()
+
+
+def _wire_keys(spec):
+    name, sources, convert, default = spec
+    if sources is None:
+        return name,
+    return tuple(source[0] if isinstance(source, tuple) else source for source in sources)
+
+
+def _field_property(name, getter):
+    def get(self):
+        values = self._values
+        value = values.get(name, _MISSING)
+        if value is _MISSING:
+            value = values[name] = getter(self._row)
+        return value
+    return property(get)
+
+
+def _view_class(cls, interner, fields):
+    key = (cls, interner, fields)
+    view = _view_classes.get(key)
+    if view is None:
+        specs = {spec[0]: spec for spec in decoders.field_specs(cls, interner)}
+        names = tuple(specs) if fields is None else fields
+        unknown = [name for name in names if name not in specs]
+        if unknown:
+            raise errors.ValidationError('Unknown {} fields: {}'.format(cls.__name__, ', '.join(unknown)))
+
+        namespace = {name: _field_property(name, decoders.field_getter(specs[name])) for name in names}
+        namespace.update({'__slots__': (), 'record_type': cls, 'fields': names,
+                          'wire_keys': frozenset(key for name in names for key in _wire_keys(specs[name]))})
+        view = _view_classes.setdefault(key, type('Lazy' + cls.__name__, (LazyRecord,), namespace))
+    return view
+
+
+class LazyRecord:
+    """
+        Read-only view over one raw JSON row. Each field is converted, with the same rules as the eager decoder, the
+        first time it is read and cached afterwards; fields that are never read are never converted. A subclass with
+        one property per field is generated for every record type and projection.
+    """
+    __slots__ = ('_row', '_values')
+    record_type = None
+    fields = ()
+    wire_keys = frozenset()
+
+    def __init__(self, row):
+        self._row = row
+        self._values = {}
+
+    def __eq__(self, other):
+        if isinstance(other, LazyRecord):
+            return self.record_type is other.record_type and self._row == other._row
+        return NotImplemented
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(self.fields))
+
+    def materialize(self):
+        """
+            Decode the whole row eagerly. Fields left out of a projection come back as None.
+        :return: instance of record_type
+        """
+        return decoders.plan(self.record_type)(self._row)
+
+
+def decode_page(cls, response, interner=None, fields=None):
+    """
+        Wrap a JSON array in LazyRecord views instead of decoding it
+    :param cls: dataclass type from skyetel.responses
+    :param response: list[dict], decoded JSON body
+    :param interner: Interner, shares repeated nested objects between rows, None builds every object
+    :param fields: list[string], field projection; other fields are unreadable and their raw data is dropped
+    :return: list[LazyRecord], or the response unchanged if it is empty
+    """
+    if not response:
+        return response
+    view = _view_class(cls, interner, None if fields is None else tuple(fields))
+    if fields is None:
+        return [view(row) for row in response]
+    keys = view.wire_keys
+    return [view({key: row[key] for key in keys if key in row}) for row in response]
@@ -0,0 +1,35 @@
+import unittest
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, bulk, limiter, responses
+
+
+class WrongMatchSkyetel(Skyetel):
+    """
+        A server whose id search returns some other number first
+    """
+    def get_phonenumbers(self, items_per_page=10, page_offset=0, search=None, **kwargs):
+        if search and 'id' in search:
+            search = {'id': search['id'] + 1}
+        return super().get_phonenumbers(items_per_page, page_offset, search=search, **kwargs)
+
+
+class UpdatePhonenumbersTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=10, calls=None).start()
+        self.options = {'rate_limiter': limiter.SlidingWindow(1000, 1), 'base_url': self.emulator.base_url,
+                        'coalesce_requests': False}
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_update_is_not_diffed_against_another_number(self):
+        client = WrongMatchSkyetel('sid', 'secret', **self.options)
+        try:
+            other = Skyetel.get_phonenumbers(client, 1, 0, search={'id': 2})[0]
+            update = responses.PhoneNumberUpdate(note=other.note)
+            report, = client.update_phonenumbers([(1, update)])
+            self.assertEqual(report.status, bulk.UPDATED)
+            self.assertEqual(report.changes, {'note': other.note})
+        finally:
+            client.close()
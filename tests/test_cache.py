@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, cache, limiter
+from skyetel.async_skyetel import AsyncSkyetel
+
+
+class StaleRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=10, calls=None).start()
+        self.cache = cache.ResponseCache(ttls={'/endpoints': 0.1}, max_stale=60)
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def options(self):
+        return {'rate_limiter': limiter.SlidingWindow(1000, 1), 'base_url': self.emulator.base_url,
+                'cache': self.cache}
+
+    def test_async_refresh_does_not_outlive_its_loop(self):
+        async def serve_stale_then_close():
+            client = AsyncSkyetel('sid', 'secret', **self.options())
+            await client.get_endpoints_list()
+            await asyncio.sleep(0.2)
+            # The refresh is still in flight when the loop stops
+            self.emulator.latency = 0.5
+            with client.serve_stale() as staleness:
+                await client.get_endpoints_list()
+            await asyncio.sleep(0.1)
+            self.emulator.latency = 0.0
+            return staleness
+
+        # A bare loop closed without cancelling leftover work, as run_until_complete() users do
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertTrue(loop.run_until_complete(serve_stale_then_close()).stale)
+        finally:
+            loop.close()
+
+        # The loop is gone; the refresher thread must still serve sync clients of the same cache
+        client = Skyetel('sid', 'secret', **self.options())
+        time.sleep(0.2)
+        with client.serve_stale() as staleness:
+            client.get_endpoints_list()
+        self.assertTrue(staleness.stale)
+        joined = threading.Thread(target=self.cache.refresher.join, daemon=True)
+        joined.start()
+        joined.join(5)
+        self.assertFalse(joined.is_alive())
+        self.assertGreaterEqual(self.cache.stats()['refreshes'], 1)
+        client.close()
+
+
+class SharedCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=10, calls=None).start()
+        self.cache = cache.ResponseCache(default_ttl=60)
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def client(self, sid):
+        return Skyetel(sid, 'secret', rate_limiter=limiter.SlidingWindow(1000, 1), base_url=self.emulator.base_url,
+                       cache=self.cache)
+
+    def test_accounts_do_not_share_entries(self):
+        first, second = self.client('first'), self.client('second')
+        first.get_endpoints_list()
+        second.get_endpoints_list()
+        first.get_endpoints_list()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        first.close()
+        second.close()
+
+    def test_callers_cannot_change_cached_bodies(self):
+        client = self.client('sid')
+        numbers = client.get_available_phonenumbers()
+        expected = list(numbers)
+        numbers.clear()
+        self.assertEqual(client.get_available_phonenumbers(), expected)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        client.close()
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from benchmarks.emulator import Emulator
+from skyetel import AsyncSkyetel, Skyetel, downloads, limiter
+
+
+def expected_content(size):
+    # The emulator's file server generates recording bodies from their size
+    return bytes(index % 251 for index in range(size))
+
+
+class RecordingDownloaderTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=20, calls=None).start()
+        self.client = Skyetel('sid', 'secret', rate_limiter=limiter.SlidingWindow(1000, 1),
+                              base_url=self.emulator.base_url)
+        self.recording = max(self.client.get_audio_recordings_list(20, 0), key=lambda recording: recording.size)
+        self.directory = tempfile.TemporaryDirectory()
+        self.downloader = downloads.RecordingDownloader(self.client, self.directory.name)
+
+    def tearDown(self):
+        self.downloader.close()
+        self.client.close()
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def assert_complete(self, report):
+        self.assertEqual(report.bytes, self.recording.size)
+        with open(report.path, 'rb') as f:
+            self.assertEqual(f.read(), expected_content(self.recording.size))
+        self.assertFalse(os.path.exists(report.path + '.part'))
+
+    def interrupt(self, cutoff):
+        self.emulator.file_cutoff = cutoff
+        report = self.downloader.download_one(self.recording)
+        self.emulator.file_cutoff = None
+        self.assertEqual(report.status, downloads.FAILED)
+        self.assertEqual(os.path.getsize(report.path + '.part'), cutoff)
+
+    def test_resumes_interrupted_transfer_with_range(self):
+        self.interrupt(self.recording.size // 2)
+        report = self.downloader.download_one(self.recording)
+        self.assertEqual(report.status, downloads.RESUMED)
+        self.assert_complete(report)
+        self.assertEqual(self.emulator.stats().get(206), 1)
+
+    def test_restarts_when_server_ignores_range(self):
+        self.interrupt(self.recording.size // 2)
+        self.emulator.ranges = False
+        report = self.downloader.download_one(self.recording)
+        self.assertEqual(report.status, downloads.DOWNLOADED)
+        self.assert_complete(report)
+        self.assertIsNone(self.emulator.stats().get(206))
+
+    def test_finished_part_file_is_renamed(self):
+        with open(self.downloader.path(self.recording.id) + '.part', 'wb') as f:
+            f.write(expected_content(self.recording.size))
+        report = self.downloader.download_one(self.recording)
+        self.assertEqual(report.status, downloads.RESUMED)
+        self.assert_complete(report)
+        self.assertEqual(self.emulator.stats().get(416), 1)
+
+    def test_skips_downloaded_file(self):
+        self.assert_complete(self.downloader.download_one(self.recording))
+        report = self.downloader.download_one(self.recording)
+        self.assertEqual(report.status, downloads.SKIPPED)
+
+    def test_repeated_recording_is_downloaded_once(self):
+        served = self.emulator.stats().get(200, 0)
+        reports = self.downloader.download([self.recording, self.recording.id, self.recording])
+        self.assertEqual(len(reports), 3)
+        self.assertTrue(reports[0] is reports[1] is reports[2])
+        self.assert_complete(reports[0])
+        # One download URL lookup and one file transfer
+        self.assertEqual(self.emulator.stats().get(200, 0), served + 2)
+
+    def test_async_client_downloads_and_skips(self):
+        async def download():
+            async with AsyncSkyetel('sid', 'secret', rate_limiter=limiter.SlidingWindow(1000, 1),
+                                    base_url=self.emulator.base_url) as client:
+                return await client.download_audio_recordings([self.recording, self.recording.id, self.recording],
+                                                              self.directory.name, max_workers=2)
+
+        reports = asyncio.run(download())
+        self.assertEqual([report.status for report in reports], [downloads.DOWNLOADED] * 3)
+        self.assert_complete(reports[0])
+        self.assertEqual([report.status for report in asyncio.run(download())], [downloads.SKIPPED] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
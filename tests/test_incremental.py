@@ -0,0 +1,40 @@
+import unittest
+
+from benchmarks import fixtures
+from skyetel import decoders, incremental, responses
+
+
+class FakeReceipts:
+    """
+        get_sms_receipts over a fixed inbox, newest first with rows lacking a time at the front
+    """
+    def __init__(self, rows):
+        self.rows = rows
+
+    def add(self, row):
+        self.rows.append(row)
+
+    def get_sms_receipts(self, items_per_page, page_offset, sort=None):
+        timed = sorted((row for row in self.rows if row['time']), key=lambda row: row['id'], reverse=True)
+        rows = [row for row in self.rows if not row['time']] + timed
+        return decoders.decode_page(responses.SMSMessage, rows[page_offset:page_offset + items_per_page])
+
+
+def untimed_row(i, time):
+    row = fixtures.sms_row(i)
+    row['time'] = time
+    return row
+
+
+class SMSReceiptSyncTest(unittest.TestCase):
+    def test_rows_without_time_are_delivered_once(self):
+        rows = [fixtures.sms_row(i) for i in range(1, 6)] + [untimed_row(6, None), untimed_row(7, '')]
+        client = FakeReceipts(rows)
+        sync = incremental.SMSReceiptSync(incremental.MemoryCheckpointStore(), items_per_page=3)
+        first = sync.poll(client)
+        self.assertEqual([message.id for message in first], [1, 2, 3, 4, 5, 6, 7])
+
+        client.add(fixtures.sms_row(8))
+        client.add(untimed_row(9, None))
+        self.assertEqual([message.id for message in sync.poll(client)], [8, 9])
+        self.assertEqual(sync.poll(client), [])
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, limiter
+
+
+class EmulatorThrottleTest(unittest.TestCase):
+    calls = 10
+    period = 2.0
+    duration = 4.0
+
+    def drive(self, rate_limiter):
+        with Emulator(rows=10, calls=self.calls, period=self.period) as emulator:
+            client = Skyetel('sid', 'secret', rate_limiter=rate_limiter, coalesce_requests=False,
+                             base_url=emulator.base_url)
+            deadline = time.monotonic() + self.duration
+
+            def worker(index):
+                while time.monotonic() < deadline:
+                    client.get_phonenumbers(1, index)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(worker, range(4)))
+            client.close()
+            stats = emulator.stats()
+            return stats.get(200, 0), stats
+
+    def assert_within_budget(self, completed, stats):
+        self.assertEqual(stats.get(429, 0), 0)
+        self.assertEqual(stats.get('throttled', 0), 0)
+        self.assertLessEqual(completed, self.calls * (self.duration / self.period + 1))
+
+    def test_sliding_window_stays_within_budget(self):
+        completed, stats = self.drive(limiter.SlidingWindow(self.calls, self.period))
+        self.assert_within_budget(completed, stats)
+        # Bursts are allowed, so the first window is used in full
+        self.assertGreaterEqual(completed, self.calls * 2)
+
+    def test_token_bucket_stays_within_budget(self):
+        completed, stats = self.drive(limiter.TokenBucket(self.calls, self.period))
+        self.assert_within_budget(completed, stats)
+
+    def test_retries_after_throttling(self):
+        with Emulator(rows=10, calls=3, period=1.0) as emulator:
+            client = Skyetel('sid', 'secret', rate_limiter=limiter.TokenBucket(1000, 1, burst=1000),
+                             coalesce_requests=False, base_url=emulator.base_url)
+            for index in range(5):
+                client.get_phonenumbers(1, index)
+            client.close()
+            stats = emulator.stats()
+        self.assertGreater(stats.get(429, 0), 0)
+        self.assertEqual(stats.get(200, 0), 5)
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(limiter.retry_after({'Retry-After': '3'}), 3.0)
+
+    def test_missing_or_invalid(self):
+        self.assertEqual(limiter.retry_after({}), 1.0)
+        self.assertEqual(limiter.retry_after({'Retry-After': 'soon'}, default=2.0), 2.0)
+
+    def test_pause_holds_back_acquire(self):
+        bucket = limiter.SlidingWindow(100, 1)
+        bucket.pause(0.2)
+        self.assertFalse(bucket.try_acquire())
+        started = time.monotonic()
+        self.assertTrue(bucket.acquire())
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class SQLiteTokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'bucket.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_pause_is_shared_through_the_file(self):
+        first = limiter.SQLiteTokenBucket(self.path, burst=5)
+        second = limiter.SQLiteTokenBucket(self.path, burst=5)
+        first.pause(0.3)
+        self.assertFalse(second.try_acquire())
+        self.assertTrue(second.acquire(timeout=1))
+
+    def test_acquire_async_runs_off_the_loop(self):
+        bucket = limiter.SQLiteTokenBucket(self.path, burst=2)
+
+        async def acquire_twice():
+            return await asyncio.gather(bucket.acquire_async(1), bucket.acquire_async(1))
+
+        self.assertEqual(asyncio.run(acquire_twice()), [True, True])
+
+    def test_bucket_file_without_pause_column(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute('CREATE TABLE buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+        connection.commit()
+        connection.close()
+        bucket = limiter.SQLiteTokenBucket(self.path)
+        self.assertTrue(bucket.try_acquire())
@@ -0,0 +1,55 @@
+import dataclasses
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, limiter, mirror
+
+
+class MirrorRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=25, calls=None).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mirror.db')
+        self.mirror = mirror.PhoneNumberMirror(self.path)
+        self.client = Skyetel('sid', 'secret', rate_limiter=limiter.SlidingWindow(1000, 1),
+                              base_url=self.emulator.base_url)
+
+    def tearDown(self):
+        self.mirror.close()
+        self.client.close()
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def test_crawl_does_not_hold_the_write_lock(self):
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        writes = []
+        iter_phonenumbers = self.client.iter_phonenumbers
+
+        def crawl(items_per_page=100, **kwargs):
+            for phonenumber in iter_phonenumbers(items_per_page, **kwargs):
+                # Another writer gets in while the crawl is between pages
+                other.execute('BEGIN IMMEDIATE')
+                other.execute("INSERT OR REPLACE INTO mirror_state VALUES ('probe', ?)", (phonenumber.id,))
+                other.execute('COMMIT')
+                writes.append(phonenumber.id)
+                yield phonenumber
+
+        self.client.iter_phonenumbers = crawl
+        try:
+            self.assertEqual(self.mirror.refresh(self.client, items_per_page=10), 25)
+        finally:
+            other.close()
+        self.assertEqual(len(writes), 25)
+        self.assertEqual(len(self.mirror), 25)
+
+    def test_full_refresh_drops_removed_numbers(self):
+        self.mirror.refresh(self.client, items_per_page=10)
+        stale = self.mirror.get(1)
+        self.mirror.store([dataclasses.replace(stale, id=10 ** 6)], generation=0)
+        self.assertEqual(len(self.mirror), 26)
+        self.mirror.refresh(self.client, items_per_page=10)
+        self.assertEqual(len(self.mirror), 25)
+        self.assertIsNone(self.mirror.get(10 ** 6))
@@ -0,0 +1,38 @@
+import asyncio
+import unittest
+
+from skyetel import pagination
+
+
+def pages_of(total):
+    def fetch_page(items_per_page, page_offset):
+        return list(range(page_offset, min(page_offset + items_per_page, total)))
+    return fetch_page
+
+
+def async_pages_of(total):
+    fetch_page = pages_of(total)
+
+    async def afetch_page(items_per_page, page_offset):
+        return fetch_page(items_per_page, page_offset)
+    return afetch_page
+
+
+class ProbeTotalTest(unittest.TestCase):
+    # Totals on, just before and just past the power-of-two page boundaries the first rounds probe
+    TOTALS = (0, 1, 99, 100, 101, 6399, 6400, 6401, 6405, 12800, 12801, 1000000)
+
+    def expected(self, total, items_per_page=100):
+        return -(-total // items_per_page) * items_per_page
+
+    def test_probe_total(self):
+        for total in self.TOTALS:
+            for probes in (2, 8):
+                with self.subTest(total=total, probes=probes):
+                    self.assertEqual(pagination.probe_total(pages_of(total), 100, probes), self.expected(total))
+
+    def test_aprobe_total(self):
+        for total in self.TOTALS:
+            with self.subTest(total=total):
+                estimate = asyncio.run(pagination.aprobe_total(async_pages_of(total), 100, 8))
+                self.assertEqual(estimate, self.expected(total))
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+
+from skyetel import provisioning
+
+RESULTS = {'f1': ['5550001', '5550002', '5550003', '5550004', '5550005'],
+           'f2': ['5550004', '5550005', '5550006']}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Fakes:
+    """
+        Search and order callables recording what was ordered; each search takes search_seconds of fake time
+    """
+    def __init__(self, clock, search_seconds=0.0):
+        self.clock = clock
+        self.search_seconds = search_seconds
+        self.batches = []
+
+    def search(self, search_filter):
+        self.clock.now += self.search_seconds
+        return list(RESULTS[search_filter])
+
+    def order(self, batch):
+        self.batches.append([purchase.number for purchase in batch])
+        return []
+
+    async def asearch(self, search_filter):
+        return self.search(search_filter)
+
+    async def aorder(self, batch):
+        return self.order(batch)
+
+
+class ProvisionTest(unittest.TestCase):
+    def run_both(self, filters, search_seconds=0.0, workers=1, **kwargs):
+        reports = []
+        for driver in ('sync', 'async'):
+            clock = FakeClock()
+            fakes = Fakes(clock, search_seconds)
+            tracker = provisioning.HoldTracker(mou=1, clock=clock, **kwargs)
+            if driver == 'sync':
+                report = provisioning.provision(fakes.search, fakes.order, filters, tracker, max_workers=workers)
+            else:
+                report = asyncio.run(provisioning.aprovision(fakes.asearch, fakes.aorder, filters, tracker,
+                                                             concurrency=workers))
+            self.assertEqual(len(tracker), 0, driver)
+            reports.append(report)
+        return reports
+
+    def test_last_partial_batch_is_ordered(self):
+        for workers in (1, 4):
+            for report in self.run_both(['f1'], workers=workers):
+                self.assertEqual(sorted(report.ordered), RESULTS['f1'])
+                self.assertEqual(report.lost, [])
+
+    def test_duplicates_are_ordered_once(self):
+        for report in self.run_both(['f1', 'f2'], batch_size=4):
+            self.assertEqual(sorted(report.ordered), sorted(set(RESULTS['f1'] + RESULTS['f2'])))
+            self.assertEqual(report.duplicates, 2)
+
+    def test_expired_holds_are_reported_lost(self):
+        for report in self.run_both(['f1'], search_seconds=20, hold=10, margin=1):
+            self.assertEqual(report.ordered, [])
+            self.assertEqual(sorted(report.lost), RESULTS['f1'])
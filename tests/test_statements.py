@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, limiter, statements
+
+
+class IsClosedTest(unittest.TestCase):
+    def test_grace_period(self):
+        self.assertFalse(statements.is_closed(2026, 9, now=datetime(2026, 9, 30, 23)))
+        self.assertFalse(statements.is_closed(2026, 9, now=datetime(2026, 10, 1, 1)))
+        self.assertFalse(statements.is_closed(2026, 9, now=datetime(2026, 10, 3, 23)))
+        self.assertTrue(statements.is_closed(2026, 9, now=datetime(2026, 10, 4)))
+        self.assertTrue(statements.is_closed(2026, 12, now=datetime(2027, 1, 4)))
+        self.assertTrue(statements.is_closed(2026, 9, now=datetime(2026, 10, 1), grace_days=0))
+
+    def test_aware_times(self):
+        self.assertTrue(statements.is_closed(2026, 9, now=datetime(2026, 10, 4, tzinfo=timezone.utc)))
+        # 23:00 on October 3rd in UTC-2 is already October 4th in UTC
+        local = timezone(timedelta(hours=-2))
+        self.assertTrue(statements.is_closed(2026, 9, now=datetime(2026, 10, 3, 23, tzinfo=local)))
+        self.assertFalse(statements.is_closed(2026, 9, now=datetime(2026, 10, 3, 21, tzinfo=local)))
+        self.assertTrue(statements.is_closed(2000, 1))
+
+
+class StatementCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=5, calls=None).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = statements.StatementCache(self.directory.name)
+
+    def tearDown(self):
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def client(self, sid):
+        return Skyetel(sid, 'secret', rate_limiter=limiter.SlidingWindow(1000, 1), base_url=self.emulator.base_url,
+                       statement_cache=self.cache, coalesce_requests=False)
+
+    def test_accounts_do_not_share_entries(self):
+        first, second = self.client('first'), self.client('second')
+        try:
+            first.get_organization_statement(2020, 1)
+            self.assertIn(('first', statements.ORGANIZATION, 2020, 1), self.cache)
+            self.assertNotIn(('second', statements.ORGANIZATION, 2020, 1), self.cache)
+            served = self.emulator.stats().get(200, 0)
+            second.get_organization_statement(2020, 1)
+            self.assertEqual(self.emulator.stats().get(200, 0), served + 1)
+            first.get_organization_statement(2020, 1)
+            self.assertEqual(self.emulator.stats().get(200, 0), served + 1)
+        finally:
+            first.close()
+            second.close()
@@ -0,0 +1,26 @@
+import unittest
+
+from skyetel import responses, timeseries
+
+
+class FromRowsTest(unittest.TestCase):
+    def test_integer_columns(self):
+        rows = [{'date': '2026-10-02T00:00:00+00:00', 'channel_count': '7'},
+                {'date': '2026-10-01T00:00:00+00:00', 'channel_count': 3.0}]
+        series = timeseries.Series.from_rows(responses.ChannelCount, rows)
+        self.assertEqual(series['channel_count'].typecode, 'q')
+        self.assertEqual(list(series['channel_count']), [3, 7])
+
+    def test_fractional_values_in_integer_columns(self):
+        rows = [{'date': '2026-10-01T00:00:00+00:00', 'inbound_minutes': '12.5', 'outbound_minutes': 4.25,
+                 'inbound_count': 2, 'outbound_count': '1', 'total_billing_cost': '0.5'},
+                {'date': '2026-10-01T00:00:00+00:00', 'inbound_minutes': 1, 'outbound_minutes': None,
+                 'inbound_count': 1, 'outbound_count': 1, 'total_billing_cost': 0.25}]
+        series = timeseries.Series.from_rows(responses.TrafficCount, rows, combine='sum')
+        self.assertEqual(series['inbound_minutes'].typecode, 'd')
+        self.assertEqual(list(series['inbound_minutes']), [13.5])
+        self.assertEqual(list(series['outbound_minutes']), [4.25])
+        self.assertEqual(series['inbound_count'].typecode, 'q')
+        self.assertEqual(list(series['outbound_count']), [2])
+        self.assertEqual(list(series['total_billing_cost']), [0.75])
+        self.assertEqual(list(series.resample('week')['inbound_minutes']), [13.5])
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+
+from benchmarks.emulator import Emulator
+from skyetel import Skyetel, errors, limiter, transcripts, transport
+
+
+class DenyingTransport(transport.RequestsTransport):
+    """
+        Answers one transcript file with a storage error body, as an expired signed URL would
+    """
+    def __init__(self, denied):
+        super().__init__()
+        self.denied = denied
+
+    def request(self, request_type, url, **kwargs):
+        if url.endswith('/files/audio_transcriptions/{}'.format(self.denied)):
+            return transport.Response(403, {}, b'{"ERROR": "Forbidden"}')
+        return super().request(request_type, url, **kwargs)
+
+
+class FetchTranscriptsTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(rows=10, calls=None).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = transcripts.TranscriptCache(self.directory.name)
+        self.client = Skyetel('sid', 'secret', rate_limiter=limiter.SlidingWindow(1000, 1),
+                              base_url=self.emulator.base_url, transcript_cache=self.cache,
+                              transport=DenyingTransport(3))
+
+    def tearDown(self):
+        self.client.close()
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def test_failed_download_is_reported_and_not_cached(self):
+        batch = self.client.fetch_transcripts([1, 2, 3])
+        self.assertEqual(sorted(batch.transcripts), [1, 2])
+        self.assertIsInstance(batch.failed[3], errors.APIError)
+        self.assertIn(1, self.cache)
+        self.assertNotIn(3, self.cache)
+
+    def test_decode_download_checks_status(self):
+        self.assertEqual(transcripts.decode_download(200, b'{"left": []}'), {'left': []})
+        with self.assertRaises(errors.Unavailable):
+            transcripts.decode_download(503, b'')
+        with self.assertRaises(errors.APIError):
+            transcripts.decode_download(200, b'<html>')